@@ -2,6 +2,7 @@
 AutoRigger provides procedural approach for maya rigging
 """
 
+import logging
 import os
 
 import maya.cmds as cmds
@@ -9,7 +10,7 @@ from Qt import QtCore, QtGui, QtWidgets
 from Qt import _loadUi
 
 from . import util, constant
-from .base import base
+from .base import base, session
 from .chain import finger, tail, chainFK, chainIK, chainEP, chainFKIK
 from .chain.limb import limbFKIK
 from .chain.limb.arm import arm
@@ -21,6 +22,8 @@ from .template import biped, quadruped
 from .utility.common import setup
 
 
+logger = logging.getLogger(__name__)
+
 TAB_RIG_MAPPING = {
     RigType.BIPED: [
         biped.BipedItem,
@@ -70,6 +73,7 @@ class AutoRiggerWindow(QtWidgets.QMainWindow):
         self.setWindowFlags(QtCore.Qt.Window)
 
         self.item = None
+        self._built = list()
         # reset tab position and populate list
         self.connect_signals()
         self.refresh_tab(0)
@@ -133,27 +137,37 @@ class AutoRiggerWindow(QtWidgets.QMainWindow):
             ex_args = self.item.parse_extra()
             args.extend(ex_args)
 
-        self.item.build_guide(*args)
+        label = '{} guide'.format(self.item.text())
+        with session.Session(label) as build:
+            self.item.build_guide(*args)
+        self._built.append(self.item.obj)
+        logger.info(build.report())
 
     def create_rig(self):
         """
         Build the Rig based on the to_build list and guide
         """
-        self.item.build_rig()
+        label = '{} rig'.format(self.item.text())
+        with session.Session(label) as build:
+            self.item.build_rig()
+        logger.info(build.report())
 
     def empty_scene(self):
         """
-        Delete all master groups
+        Delete every node recorded by the rig objects built from the
+        window, then all master groups
         """
-        for grp in [
+        for obj in self._built:
+            obj.rollback()
+        self._built = list()
+
+        grps = cmds.ls([
             util.G_LOC_GRP,
             util.G_JNT_GRP,
             util.G_CTRL_GRP,
-            util.G_MESH_GRP]:
-            try:
-                cmds.delete(grp)
-            except:
-                pass
+            util.G_MESH_GRP])
+        if grps:
+            cmds.delete(grps)
 
 
 def show():
@@ -0,0 +1,129 @@
+"""
+Pluggable scene backends standing in for maya.cmds
+
+Every autoRigger module talks to the scene through the module-level
+``cmds`` name bound by ``import maya.cmds as cmds``; a backend is any object
+exposing the same command functions. Binding a backend re-points that name
+in every loaded autoRigger module (including the utility package), so the
+Bone phase methods run unchanged against it.
+
+Headless usage, before any rig module is imported:
+
+    from autoRigger import backend
+    scene = backend.use_memory()
+
+    from autoRigger.template import biped
+    rig = biped.Biped(Side.MIDDLE, 'hero')
+    rig.build_guide()
+    rig.build_rig()
+
+Note: the rig modules still import Qt for their list items, so a Qt
+binding has to be importable even when no window is ever shown.
+"""
+
+import sys
+import types
+from contextlib import contextmanager
+
+
+PACKAGE = __name__.rsplit('.', 1)[0]
+
+
+def current():
+    """
+    Get the command object currently bound to the autoRigger modules
+
+    :return: module or object. the bound maya.cmds or backend
+    """
+    for module in _package_modules():
+        commands = getattr(module, 'cmds', None)
+        if commands is not None:
+            return commands
+    return sys.modules.get('maya.cmds')
+
+
+def bind(commands):
+    """
+    Re-bind the ``cmds`` name in every loaded autoRigger module
+
+    :param commands: module or object. backend implementing maya.cmds calls
+    :return: module or object. the previously bound command object
+    """
+    previous = current()
+    for module in _package_modules():
+        if previous is not None and getattr(module, 'cmds', None) is previous:
+            module.cmds = commands
+    return previous
+
+
+def install(commands):
+    """
+    Register a backend as the ``maya.cmds`` module itself, so modules
+    imported afterwards pick it up, then bind it to the loaded ones
+
+    :param commands: module or object. backend implementing maya.cmds calls
+    :return: module or object. the previously bound command object
+    """
+    maya = sys.modules.get('maya')
+    if maya is None:
+        maya = types.ModuleType('maya')
+        maya.__path__ = list()
+        sys.modules['maya'] = maya
+
+    previous = bind(commands)
+    maya.cmds = commands
+    sys.modules['maya.cmds'] = commands
+    return previous
+
+
+def is_maya(commands):
+    """
+    Whether a command object is maya's own cmds module, the scene then
+    being readable through the maya API as well
+
+    :param commands: module or object. bound command object
+    :return: bool. True for maya.cmds
+    """
+    return isinstance(commands, types.ModuleType) and \
+        commands.__name__ == 'maya.cmds'
+
+
+@contextmanager
+def using(commands):
+    """
+    Temporarily bind a backend to the loaded autoRigger modules
+
+    :param commands: module or object. backend implementing maya.cmds calls
+    """
+    previous = bind(commands)
+    try:
+        yield commands
+    finally:
+        bind(previous)
+
+
+def use_memory():
+    """
+    Install a fresh in-memory scene as the maya.cmds backend
+
+    :return: memory.Scene. the installed scene
+    """
+    from . import memory
+
+    scene = memory.Scene()
+    install(scene)
+    return scene
+
+
+def _package_modules():
+    """
+    Yield all loaded modules belonging to the autoRigger package
+
+    :return: generator. module objects
+    """
+    prefix = PACKAGE + '.'
+    for name, module in list(sys.modules.items()):
+        if module is None:
+            continue
+        if name == PACKAGE or name.startswith(prefix):
+            yield module
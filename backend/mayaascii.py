@@ -0,0 +1,619 @@
+"""
+Maya ASCII writer for the in-memory scene
+
+A rig built against the memory backend is written straight to a .ma file:
+one createNode per node, parents ahead of their children, followed by its
+addAttr and setAttr statements, then every connection. The wiring maya
+adds by itself when running a command, like the target inputs of a
+constraint, the deformer graph of a cluster or the solver of an ikHandle,
+is filled in from the recorded graph, so the file opens as if the rig had
+been built inside maya.
+
+Rigs get generated without launching maya, in as many worker processes as
+wanted:
+
+    from autoRigger import backend
+    backend.use_memory()
+
+    from autoRigger.backend import mayaascii
+    from autoRigger.template import biped
+
+    rig = biped.Biped(Side.MIDDLE, 'hero')
+    mayaascii.build(rig, 'hero.ma', guides='hero_guides.npz')
+"""
+
+from . import memory
+from .. import backend, util
+
+
+MAYA_VERSION = '2020'
+
+# memory bookkeeping, written through their own statements or not at all
+INTERNAL = {
+    'targets',
+    'components',
+    'keys',
+    'solver',
+    'cvs',
+    'degree',
+    'knots',
+    'form',
+    'distance',
+}
+
+# constraint target inputs fed by the target transform, per constraint
+TARGET_INPUTS = {
+    'pointConstraint': ('translate', 'rotatePivot', 'rotatePivotTranslate'),
+    'orientConstraint': ('rotate', 'rotateOrder'),
+    'parentConstraint': ('translate', 'rotatePivot', 'rotatePivotTranslate',
+                         'rotate', 'rotateOrder', 'scale'),
+    'aimConstraint': ('translate', 'rotatePivot', 'rotatePivotTranslate'),
+    'scaleConstraint': ('scale',),
+    'poleVectorConstraint': ('translate', 'rotatePivot',
+                             'rotatePivotTranslate'),
+}
+
+# constraint inputs fed by the constrained transform, per constraint
+DRIVEN_INPUTS = {
+    'pointConstraint': ('rotatePivot', 'rotatePivotTranslate'),
+    'orientConstraint': ('rotateOrder',),
+    'parentConstraint': ('rotatePivot', 'rotatePivotTranslate',
+                         'rotateOrder'),
+    'aimConstraint': ('translate', 'rotatePivot', 'rotatePivotTranslate',
+                      'rotateOrder'),
+    'scaleConstraint': (),
+}
+
+# addAttr flags written as they are, long flag name first
+ADD_FLAGS = (
+    (('longName', 'ln'), 'ln'),
+    (('shortName', 'sn'), 'sn'),
+    (('defaultValue', 'dv'), 'dv'),
+    (('minValue', 'min'), 'min'),
+    (('maxValue', 'max'), 'max'),
+    (('enumName', 'en'), 'en'),
+    (('attributeType', 'at'), 'at'),
+    (('dataType', 'dt'), 'dt'),
+)
+
+TOLERANCE = 1e-9
+
+
+class Writer(object):
+    """
+    Maya ASCII statements describing an in-memory scene
+    """
+
+    def __init__(self, scene):
+        """
+        Initialization
+
+        :param scene: memory.Scene. scene to write
+        """
+        self.scene = scene
+        self.statements = list()
+        self.links = list()
+        self.solvers = list()
+
+    def dag(self):
+        """
+        DAG nodes with parents ahead of their children, in creation order
+
+        :return: list. memory.Node objects
+        """
+        result = list()
+        stack = [node for node in reversed(list(self.scene.nodes.values()))
+                 if node.is_dag and node.parent is None]
+        while stack:
+            node = stack.pop()
+            result.append(node)
+            stack.extend(reversed(node.children))
+        return result
+
+    def lines(self):
+        """
+        Get the scene as Maya ASCII
+
+        :return: list. file lines
+        """
+        self.statements = [
+            '//Maya ASCII {} scene'.format(MAYA_VERSION),
+            'requires maya "{}";'.format(MAYA_VERSION),
+            'currentUnit -l centimeter -a degree -t film;',
+            'fileInfo "application" "maya";',
+        ]
+        self.links = list()
+        self.solvers = list()
+        self.add_scene()
+        return self.statements + self.links
+
+    def add_scene(self):
+        """
+        Create every node of the scene, then connect them
+        """
+        dag = self.dag()
+        for node in dag + [n for n in self.scene.nodes.values()
+                           if not n.is_dag]:
+            self.add_node(node)
+
+        for (dst, dst_attr), (src, src_attr) in \
+                self.scene.connections.items():
+            self.connect(src, src_attr, dst, dst_attr)
+
+        for node in list(self.scene.nodes.values()):
+            self.add_wiring(node)
+        self.add_deformers()
+
+    def write(self, path):
+        """
+        Write the scene to a file
+
+        :param path: str. .ma file path
+        :return: str. the file path
+        """
+        with open(path, 'w') as f:
+            f.write('\n'.join(self.lines()))
+            f.write('\n// End of {}\n'.format(path.replace('\\', '/')))
+        return path
+
+    # ------------------------------------------------------------------
+    # nodes
+    # ------------------------------------------------------------------
+
+    def add_node(self, node):
+        """
+        Create a node and set its attributes
+
+        :param node: memory.Node. node to write
+        """
+        self.create(node.type, node.name,
+                    node.parent.name if node.parent is not None else None)
+        for attr, flags in node.added.items():
+            self.add_attr(attr, flags)
+        weights = set()
+        if node.type.endswith('Constraint'):
+            weights = set(self.add_weights(node))
+
+        for attr in sorted(node.attrs):
+            if attr in INTERNAL or attr in node.added or attr in weights:
+                continue
+            value = node.attrs[attr]
+            if node.is_dag and _same(value, memory.DEFAULT_ATTRS.get(attr)):
+                continue
+            if node.type == 'joint' and (
+                    attr == 'jointOrient' and _same(value, [0, 0, 0]) or
+                    attr == 'radius' and _same(value, 1.0)):
+                continue
+            self.set_attr(attr, value)
+
+        for attr in node.added:
+            self.set_attr(attr, node.attrs[attr])
+        if node.type == 'nurbsCurve':
+            self.set_curve(node)
+        if node.type.startswith('animCurve'):
+            self.set_keys(node)
+        for attr in sorted(node.locked):
+            self.lock(attr)
+
+    def create(self, ntype, name, parent=None):
+        """
+        Create a node, the next attributes get set on it
+
+        :param ntype: str. node type
+        :param name: str. node name
+        :param parent: str. parent transform, None for a root or a DG node
+        """
+        tokens = ['createNode', ntype, '-n', _string(name)]
+        if parent is not None:
+            tokens += ['-p', _string(parent)]
+        self.statements.append(' '.join(tokens) + ';')
+
+    def select(self, name):
+        """
+        Make an already created node the one the next attributes get set on
+
+        :param name: str. node name
+        """
+        self.statements.append('select -ne {};'.format(_string(name)))
+
+    def add_attr(self, attr, flags):
+        """
+        :param attr: str. long attribute name
+        :param flags: dict. addAttr flags
+        """
+        tokens = ['\taddAttr', '-ci', 'true']
+        if flags.get('keyable') or flags.get('k'):
+            tokens += ['-k', 'true']
+        for names, flag in ADD_FLAGS:
+            value = next((flags[n] for n in names if n in flags), None)
+            if flag == 'ln':
+                value = attr
+            if value is None:
+                continue
+            tokens += ['-' + flag, _value(value)]
+        if not any(n in flags for n in ('attributeType', 'at', 'dataType',
+                                        'dt')):
+            tokens += ['-at', '"double"']
+        self.statements.append(' '.join(tokens) + ';')
+
+    def add_weights(self, cons):
+        """
+        Dynamic target weight attributes of a constraint
+
+        :param cons: memory.Node. constraint node
+        :return: list. weight attribute names
+        """
+        attrs = list()
+        for index, target in enumerate(cons.attrs.get('targets', list())):
+            attr = '{}W{}'.format(target, index)
+            self.add_attr(attr, {'sn': 'w{}'.format(index), 'dv': 1,
+                                 'min': 0, 'k': 1})
+            self.set_attr(attr, cons.attrs[attr])
+            attrs.append(attr)
+        return attrs
+
+    def set_attr(self, attr, value):
+        """
+        :param attr: str. attribute name on the current node
+        :param value: object. memory attribute value
+        """
+        if isinstance(value, (list, tuple)) and len(value) == 16:
+            self.statements.append('\tsetAttr ".{}" -type "matrix" {};'.format(
+                attr, _value(value)))
+        elif isinstance(value, (list, tuple)) and value and \
+                isinstance(value[0], str):
+            return
+        elif isinstance(value, str):
+            self.statements.append('\tsetAttr ".{}" -type "string" {};'.format(
+                attr, _value(value)))
+        else:
+            self.statements.append('\tsetAttr ".{}" {};'.format(
+                attr, _value(value)))
+
+    def set_curve(self, shape):
+        """
+        :param shape: memory.Node. nurbsCurve shape
+        """
+        self.statements.append('\tsetAttr ".cc" -type "nurbsCurve" {};'.format(
+            _curve(shape)))
+
+    def set_components(self, attr, components):
+        """
+        :param attr: str. componentList attribute name on the current node
+        :param components: list. components, like cv[0]
+        """
+        self.statements.append(
+            '\tsetAttr ".{}" -type "componentList" {} {};'.format(
+                attr, len(components),
+                ' '.join(_string(c) for c in components)))
+
+    def lock(self, attr):
+        """
+        :param attr: str. attribute name on the current node
+        """
+        self.statements.append('\tsetAttr -l on ".{}";'.format(attr))
+
+    def set_keys(self, curve):
+        """
+        :param curve: memory.Node. animCurve node
+        """
+        keys = curve.attrs.get('keys', list())
+        if not keys:
+            return
+        self.statements.append('\tsetAttr -s {} ".ktv[0:{}]" {};'.format(
+            len(keys), len(keys) - 1,
+            ' '.join('{} {}'.format(_value(k), _value(v)) for k, v in keys)))
+
+    # ------------------------------------------------------------------
+    # connections
+    # ------------------------------------------------------------------
+
+    def connect(self, src, src_attr, dst, dst_attr, append=False):
+        """
+        :param src: memory.Node or str. source node
+        :param src_attr: str. source attribute
+        :param dst: memory.Node or str. destination node
+        :param dst_attr: str. destination attribute
+        :param append: bool. connect to the next free element
+        """
+        self.links.append('connectAttr "{}.{}" "{}.{}"{};'.format(
+            _name(src), src_attr, _name(dst), dst_attr,
+            ' -na' if append else ''))
+
+    def add_wiring(self, node):
+        """
+        Connections maya makes on its own when creating the node
+
+        :param node: memory.Node. node to wire
+        """
+        if node.type == 'joint' and node.parent is not None and \
+                node.parent.type == 'joint':
+            self.connect(node.parent, 'scale', node, 'inverseScale')
+        elif node.type.endswith('Constraint'):
+            self.wire_constraint(node)
+        elif node.type == 'ikHandle':
+            self.wire_handle(node)
+
+    def wire_constraint(self, cons):
+        """
+        :param cons: memory.Node. constraint node
+        """
+        nodes = self.scene.nodes
+        driven = cons.parent
+        targets = [nodes[name] for name in cons.attrs.get('targets', list())
+                   if name in nodes]
+
+        for index, target in enumerate(targets):
+            plug = 'target[{}].target'.format(index)
+            for attr in TARGET_INPUTS[cons.type]:
+                self.connect(target, attr, cons, plug + _upper(attr))
+            if target.type == 'joint' and cons.type in (
+                    'orientConstraint', 'parentConstraint'):
+                self.connect(target, 'jointOrient', cons,
+                             plug + 'JointOrient')
+                if cons.type == 'parentConstraint':
+                    self.connect(target, 'segmentScaleCompensate', cons,
+                                 plug + 'ScaleCompensate')
+                    self.connect(target, 'inverseScale', cons,
+                                 plug + 'InverseScale')
+
+        if cons.type == 'poleVectorConstraint':
+            source = self.scene.connections.get((driven, 'startJoint'))
+            if source:
+                start = source[0]
+                self.connect(start, 'parentMatrix', cons,
+                             'constraintParentInverseMatrix')
+                self.connect(start, 'translate', cons, 'constraintRotatePivot')
+                self.connect(start, 'rotatePivotTranslate', cons,
+                             'constraintRotateTranslate')
+            return
+
+        self.connect(driven, 'parentInverseMatrix', cons,
+                     'constraintParentInverseMatrix')
+        for attr in DRIVEN_INPUTS[cons.type]:
+            self.connect(driven, attr, cons, 'constraint' + _upper(attr))
+        if driven.type == 'joint' and cons.type in (
+                'orientConstraint', 'parentConstraint'):
+            self.connect(driven, 'jointOrient', cons, 'constraintJointOrient')
+
+        self.set_offsets(cons, driven, targets)
+
+    def set_offsets(self, cons, driven, targets):
+        """
+        Offsets keeping the constrained transform where the scene has it,
+        zero for a constraint snapping its transform
+
+        :param cons: memory.Node. constraint node
+        :param driven: memory.Node. constrained transform
+        :param targets: list. target transforms
+        """
+        if not targets:
+            return
+        scene = self.scene
+        world = scene._world(driven)
+        statements = list()
+
+        if cons.type == 'parentConstraint':
+            for index, target in enumerate(targets):
+                offset = memory._mult(world, memory._inverse(
+                    scene._world(target)))
+                translate, rotate, _ = memory._decompose(offset)
+                for attr, value in (('OffsetTranslate', translate),
+                                    ('OffsetRotate', rotate)):
+                    if not _same(value, [0, 0, 0]):
+                        statements.append((
+                            'target[{}].target{}'.format(index, attr), value))
+
+        elif cons.type == 'pointConstraint':
+            weights = _weights(cons, targets)
+            center = [0.0, 0.0, 0.0]
+            for target, weight in zip(targets, weights):
+                center = memory._add(center, [
+                    v * weight for v in scene._world(target)[12:15]])
+            local = memory._transform_point(
+                center + [1.0], memory._inverse(scene._parent_world(driven)))
+            offset = memory._sub(driven.attrs['translate'], local[:3])
+            if not _same(offset, [0, 0, 0]):
+                statements.append(('offset', offset))
+
+        elif cons.type == 'orientConstraint':
+            weights = _weights(cons, targets)
+            heaviest = targets[weights.index(max(weights))]
+            offset = memory._euler(memory._mult(
+                memory._rotation_of(world),
+                memory._inverse(memory._rotation_of(scene._world(heaviest)))))
+            if not _same(offset, [0, 0, 0]):
+                statements.append(('offset', offset))
+
+        if statements:
+            self.select(cons.name)
+            for attr, value in statements:
+                self.set_attr(attr, value)
+
+    def wire_handle(self, handle):
+        """
+        Solver and end joint of an ikHandle
+
+        :param handle: memory.Node. ikHandle node
+        """
+        solver = handle.attrs.get('solver', 'ikRPsolver')
+        if solver not in self.solvers:
+            self.solvers.append(solver)
+            self.create(solver, solver)
+            self.connect(solver, 'message', ':ikSystem', 'sol', append=True)
+        self.connect(solver, 'message', handle, 'ikSolver')
+
+        source = self.scene.connections.get((handle, 'endEffector'))
+        if not source:
+            return
+        effector = source[0]
+        position = self.scene._world(effector)[12:15]
+        ends = [child for child in effector.parent.children
+                if child.type == 'joint']
+        if ends:
+            end = min(ends, key=lambda jnt: memory._length(memory._sub(
+                self.scene._world(jnt)[12:15], position)))
+            self.connect(end, 'translate', effector, 'translate')
+
+    # ------------------------------------------------------------------
+    # deformers
+    # ------------------------------------------------------------------
+
+    def add_deformers(self):
+        """
+        Deformer chains of the clustered curves, each cluster reading the
+        output of the previous one, the first the original shape
+        """
+        chains = dict()
+        order = list()
+        for node in self.scene.nodes.values():
+            if node.type != 'cluster' or not node.attrs.get('components'):
+                continue
+            name = node.attrs['components'][0].split('.')[0]
+            shape = self.scene._curve_shape(self.scene._node(name))
+            if shape.name not in chains:
+                chains[shape.name] = list()
+                order.append(shape)
+            chains[shape.name].append(node)
+
+        for shape in order:
+            self.add_chain(shape, chains[shape.name])
+
+    def add_chain(self, shape, clusters):
+        """
+        :param shape: memory.Node. deformed nurbsCurve shape
+        :param clusters: list. cluster nodes, in creation order
+        """
+        orig = '{}Orig'.format(shape.name)
+        self.create('nurbsCurve', orig, shape.parent.name)
+        self.set_attr('io', True)
+        self.set_curve(shape)
+        source = (orig, 'worldSpace')
+        geometry = self.scene._world(shape.parent)
+
+        for index, cluster in enumerate(clusters):
+            group = '{}GroupId'.format(cluster.name)
+            parts = '{}GroupParts'.format(cluster.name)
+            members = '{}Set'.format(cluster.name)
+            components = [c.split('.', 1)[1] for c in
+                          cluster.attrs['components']]
+            handle = self.scene.connections.get((cluster, 'matrix'))
+
+            self.select(cluster.name)
+            self.set_attr('gm[0]', geometry)
+            self.create('groupId', group)
+            self.set_attr('ihi', 0)
+            self.create('groupParts', parts)
+            self.set_attr('ihi', 0)
+            self.set_components('ic', components)
+            self.create('objectSet', members)
+            self.set_attr('ihi', 0)
+            self.set_attr('vo', True)
+            if handle:
+                center = handle[0].attrs.get('rotatePivot', [0, 0, 0])
+                for child in handle[0].shapes:
+                    self.select(child.name)
+                    self.set_attr('or', center)
+
+            instance = 'instObjGroups[0].objectGroups[{}]'.format(index)
+            self.connect(source[0], source[1], parts, 'inputGeometry')
+            self.connect(group, 'groupId', parts, 'groupId')
+            self.connect(parts, 'outputGeometry', cluster,
+                         'input[0].inputGeometry')
+            self.connect(group, 'groupId', cluster, 'input[0].groupId')
+            self.connect(cluster, 'message', members, 'usedBy[0]')
+            self.connect(group, 'message', members, 'groupNodes', append=True)
+            self.connect(shape, instance, members, 'dagSetMembers',
+                         append=True)
+            self.connect(group, 'groupId', shape, instance + '.objectGroupId')
+            self.connect(members, 'memberWireframeColor', shape,
+                         instance + '.objectGrpColor')
+            source = (cluster, 'outputGeometry[0]')
+
+        self.connect(source[0], source[1], shape, 'create')
+
+
+def write(scene, path):
+    """
+    Write an in-memory scene as a Maya ASCII file
+
+    :param scene: memory.Scene. built scene
+    :param path: str. .ma file path
+    :return: str. the file path
+    """
+    return Writer(scene).write(path)
+
+
+def build(bone, path, guides=None):
+    """
+    Build a rig object in a fresh in-memory scene and write it out
+
+    :param bone: bone.Bone. rig object, not built yet
+    :param path: str. .ma file path
+    :param guides: str. guide preset to start from, the template layout
+                   if None
+    :return: memory.Scene. the built scene
+    """
+    scene = memory.Scene()
+    with backend.using(scene):
+        util.create_outliner_grp()
+        if guides:
+            bone.load_guide(guides)
+        else:
+            bone.build_guide()
+        bone.build_rig()
+    write(scene, path)
+    return scene
+
+
+def _name(node):
+    return node.name if isinstance(node, memory.Node) else node
+
+
+def _same(value, default):
+    if default is None:
+        return False
+    if isinstance(value, (list, tuple)) and isinstance(default, (list, tuple)):
+        return len(value) == len(default) and all(
+            abs(a - b) < TOLERANCE for a, b in zip(value, default))
+    if isinstance(value, bool) or isinstance(default, bool):
+        return bool(value) == bool(default)
+    try:
+        return abs(value - default) < TOLERANCE
+    except TypeError:
+        return value == default
+
+
+def _weights(cons, targets):
+    weights = [cons.attrs['{}W{}'.format(t.name, i)]
+               for i, t in enumerate(targets)]
+    total = sum(weights) or 1.0
+    return [w / total for w in weights]
+
+
+def _upper(attr):
+    return attr[0].upper() + attr[1:]
+
+
+def _curve(shape):
+    # degree spans form rational dimension, knots, then the cvs
+    attrs = shape.attrs
+    cvs, degree = attrs['cvs'], attrs['degree']
+    return '{} {} {} no 3 {} {} {} {}'.format(
+        degree, len(cvs) - degree, memory.FORMS[attrs['form']],
+        len(attrs['knots']), _value(attrs['knots']),
+        len(cvs), ' '.join(_value(cv) for cv in cvs))
+
+
+def _string(text):
+    return '"{}"'.format(str(text).replace('\\', '\\\\').replace('"', '\\"'))
+
+
+def _value(value):
+    if isinstance(value, bool):
+        return 'yes' if value else 'no'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return ' '.join(_value(v) for v in value)
+    return _string(value)
@@ -0,0 +1,1748 @@
+"""
+Pure-Python in-memory scene graph implementing the subset of maya.cmds
+used by the rig builders
+
+Nodes live in a flat name table (short names are kept unique), DAG nodes
+carry their local transform channels and world matrices are composed on
+demand. Constraints snap their target on creation like Maya does, but
+nothing is evaluated afterwards: the scene records the graph, it doesn't
+play it back. Commands and flags it doesn't implement raise Unsupported.
+"""
+
+import copy
+import fnmatch
+import math
+import re
+from collections import OrderedDict
+
+
+# transform-like node types, the rest of the DAG types are shapes
+TRANSFORM_TYPES = {
+    'transform',
+    'joint',
+    'ikHandle',
+    'ikEffector',
+    'pointConstraint',
+    'orientConstraint',
+    'parentConstraint',
+    'aimConstraint',
+    'scaleConstraint',
+    'poleVectorConstraint',
+}
+SHAPE_TYPES = {'locator', 'nurbsCurve', 'distanceDimShape', 'clusterHandle'}
+
+# long attribute names and the channel index of their children
+ALIASES = {
+    't': 'translate',
+    'r': 'rotate',
+    's': 'scale',
+    'v': 'visibility',
+    'jo': 'jointOrient',
+    'rp': 'rotatePivot',
+    'sp': 'scalePivot',
+    'it': 'inheritsTransform',
+    'ro': 'rotateOrder',
+    'wm': 'worldMatrix',
+    'm': 'matrix',
+    'pm': 'parentMatrix',
+    'wim': 'worldInverseMatrix',
+    'opm': 'offsetParentMatrix',
+    'rad': 'radius',
+}
+COMPOUNDS = {
+    'translate': 't',
+    'rotate': 'r',
+    'scale': 's',
+    'jointOrient': 'jo',
+    'rotatePivot': 'rp',
+    'scalePivot': 'sp',
+}
+AXES = 'XYZ'
+
+# nurbsCurve form attribute values
+FORMS = {'open': 0, 'closed': 1, 'periodic': 2}
+
+DEFAULT_ATTRS = {
+    'translate': [0.0, 0.0, 0.0],
+    'rotate': [0.0, 0.0, 0.0],
+    'scale': [1.0, 1.0, 1.0],
+    'rotatePivot': [0.0, 0.0, 0.0],
+    'scalePivot': [0.0, 0.0, 0.0],
+    'visibility': True,
+    'inheritsTransform': True,
+    'rotateOrder': 0,
+}
+CONSTRAINT_CHANNELS = {
+    'pointConstraint': ('translate',),
+    'orientConstraint': ('rotate',),
+    'parentConstraint': ('translate', 'rotate'),
+    'aimConstraint': ('rotate',),
+    'scaleConstraint': ('scale',),
+    'poleVectorConstraint': (),
+}
+SECONDARY_AXES = {
+    'xup': [1, 0, 0], 'xdown': [-1, 0, 0],
+    'yup': [0, 1, 0], 'ydown': [0, -1, 0],
+    'zup': [0, 0, 1], 'zdown': [0, 0, -1],
+}
+
+IDENTITY = [1.0, 0.0, 0.0, 0.0,
+            0.0, 1.0, 0.0, 0.0,
+            0.0, 0.0, 1.0, 0.0,
+            0.0, 0.0, 0.0, 1.0]
+
+# xform rotateOrder query values, by rotateOrder attribute value
+ROTATE_ORDERS = ('xyz', 'yzx', 'zxy', 'xzy', 'yxz', 'zyx')
+
+# attributes a local matrix is composed from
+LOCAL_ATTRS = {
+    'translate',
+    'rotate',
+    'scale',
+    'jointOrient',
+    'offsetParentMatrix',
+    'inheritsTransform',
+}
+
+PLUG_PATTERN = re.compile(r'^([^.]+)\.(.+)$')
+COMPONENT_PATTERN = re.compile(r'^(\w+)\[(\*|\d*)(?::(\d*))?\]$')
+
+
+class Unsupported(Exception):
+    """
+    A command or flag the memory backend doesn't implement, raised instead
+    of guessing so a build never silently diverges from maya, not a
+    RuntimeError so the handlers for maya's own errors don't swallow it
+    """
+
+
+class Attrs(dict):
+    """
+    Attribute values of a node, dropping the world matrices cached below
+    it whenever one of its local attributes gets set
+    """
+
+    def __init__(self, node, *args, **kwargs):
+        """
+        Initialization
+
+        :param node: Node. node owning the values
+        """
+        super(Attrs, self).__init__(*args, **kwargs)
+        self.node = node
+
+    def __setitem__(self, key, value):
+        super(Attrs, self).__setitem__(key, value)
+        if key in LOCAL_ATTRS:
+            self.node.invalidate()
+
+    def __delitem__(self, key):
+        super(Attrs, self).__delitem__(key)
+        if key in LOCAL_ATTRS:
+            self.node.invalidate()
+
+    def update(self, *args, **kwargs):
+        values = dict(*args, **kwargs)
+        super(Attrs, self).update(values)
+        if LOCAL_ATTRS.intersection(values):
+            self.node.invalidate()
+
+    def pop(self, key, *default):
+        value = super(Attrs, self).pop(key, *default)
+        if key in LOCAL_ATTRS:
+            self.node.invalidate()
+        return value
+
+    def __deepcopy__(self, memo):
+        # a copy is plain data, not tied to the node
+        return copy.deepcopy(dict(self), memo)
+
+
+class Connections(OrderedDict):
+    """
+    Source plugs by destination plug, indexed by the nodes at both ends so
+    that the connections of one node are found without scanning them all
+    """
+
+    def __init__(self):
+        """
+        Initialization
+        """
+        # node -> its connection keys, key -> position in connection order
+        self.index = dict()
+        self.order = dict()
+        self.count = 0
+        super(Connections, self).__init__()
+
+    def __setitem__(self, key, value):
+        if key in self:
+            self._unindex(key, self[key])
+        else:
+            self.order[key] = self.count
+            self.count += 1
+        super(Connections, self).__setitem__(key, value)
+        for node in (key[0], value[0]):
+            self.index.setdefault(node, dict())[key] = None
+
+    def __delitem__(self, key):
+        value = self[key]
+        super(Connections, self).__delitem__(key)
+        self._unindex(key, value)
+        del self.order[key]
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self, last=True):
+        key = next(reversed(self) if last else iter(self))
+        return key, self.pop(key)
+
+    def clear(self):
+        super(Connections, self).clear()
+        self.index.clear()
+        self.order.clear()
+
+    def of(self, node):
+        """
+        :param node: Node. node at either end
+        :return: list. keys of the node's connections, in connection order
+        """
+        return sorted(self.index.get(node, ()), key=self.order.get)
+
+    def _unindex(self, key, value):
+        for node in (key[0], value[0]):
+            keys = self.index.get(node)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self.index[node]
+
+
+class Node(object):
+    """
+    A dependency node in the in-memory scene
+    """
+
+    def __init__(self, name, ntype):
+        """
+        Initialization
+
+        :param name: str. unique short name of the node
+        :param ntype: str. maya node type
+        """
+        self.name = name
+        self.type = ntype
+        self.parent = None
+        self.children = list()
+        # world matrix, cached by Scene._world until invalidated
+        self.world = None
+        self.attrs = dict()
+        self.aliases = dict()
+        self.locked = set()
+        # addAttr flags of the dynamic attributes, by long name
+        self.added = OrderedDict()
+
+        if self.is_dag:
+            self.attrs.update(copy.deepcopy(DEFAULT_ATTRS))
+        if ntype == 'joint':
+            self.attrs['jointOrient'] = [0.0, 0.0, 0.0]
+            self.attrs['radius'] = 1.0
+
+    def __repr__(self):
+        return '<{} {}>'.format(self.type, self.name)
+
+    @property
+    def attrs(self):
+        return self._attrs
+
+    @attrs.setter
+    def attrs(self, values):
+        self._attrs = Attrs(self, values)
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Drop the cached world matrix of the node and of its descendants;
+        a transform caches its world only once its parent did, so the walk
+        stops at the nodes without one
+        """
+        self.world = None
+        stack = list(self.children)
+        while stack:
+            node = stack.pop()
+            if node.world is not None:
+                node.world = None
+                stack.extend(node.children)
+
+    @property
+    def is_dag(self):
+        return self.type in TRANSFORM_TYPES or self.type in SHAPE_TYPES
+
+    @property
+    def is_transform(self):
+        return self.type in TRANSFORM_TYPES
+
+    @property
+    def shapes(self):
+        return [c for c in self.children if not c.is_transform]
+
+    def resolve(self, attr):
+        """
+        Resolve an attribute alias or short name into its long name
+
+        :param attr: str. attribute name
+        :return: str. long attribute name
+        """
+        attr = self.aliases.get(attr, attr)
+        return ALIASES.get(attr, attr)
+
+
+class Scene(object):
+    """
+    In-memory stand-in for the maya.cmds module
+
+    Install it with backend.install() or backend.use_memory(), the builders
+    then call its methods exactly as they would call maya.cmds
+    """
+
+    def __init__(self):
+        """
+        Initialization
+        """
+        self.nodes = OrderedDict()
+        # destination (node, attr) -> source (node, attr)
+        self.connections = Connections()
+        self.selection = list()
+        self._counters = dict()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        raise Unsupported(
+            'maya.cmds.{} is not supported by the memory backend'.format(name))
+
+    # ------------------------------------------------------------------
+    # node table helpers
+    # ------------------------------------------------------------------
+
+    def _taken(self, name):
+        return name in self.nodes
+
+    def _unique(self, name):
+        if not self._taken(name):
+            return name
+        match = re.match(r'^(.*?)(\d*)$', name)
+        base, digits = match.group(1), match.group(2)
+        index = int(digits) + 1 if digits else 1
+        while self._taken('{}{}'.format(base, index)):
+            index += 1
+        return '{}{}'.format(base, index)
+
+    def _auto_name(self, base):
+        index = self._counters.get(base, 0) + 1
+        while self._taken('{}{}'.format(base, index)):
+            index += 1
+        self._counters[base] = index
+        return '{}{}'.format(base, index)
+
+    def _new(self, ntype, name=None, parent=None, auto=None):
+        name = self._unique(name) if name else self._auto_name(auto or ntype)
+        node = Node(name, ntype)
+        self.nodes[name] = node
+        if parent is not None:
+            self._set_parent(node, parent)
+        return node
+
+    def _new_shape(self, ntype, transform, base=None):
+        if base:
+            name = self._auto_name(base)
+        else:
+            name = self._unique('{}Shape'.format(transform.name))
+        return self._new(ntype, name, parent=transform)
+
+    def _node(self, name):
+        if isinstance(name, Node):
+            return name
+        name = name.split('|')[-1]
+        try:
+            return self.nodes[name]
+        except KeyError:
+            raise ValueError('No object matches name: {}'.format(name))
+
+    def _nodes(self, args):
+        nodes = list()
+        for arg in self._flatten(args):
+            nodes.append(self._node(arg))
+        return nodes
+
+    @staticmethod
+    def _flatten(args):
+        items = list()
+        for arg in args:
+            if isinstance(arg, (list, tuple)):
+                items.extend(Scene._flatten(arg))
+            elif arg is not None:
+                items.append(arg)
+        return items
+
+    def _targets(self, args):
+        items = self._flatten(args)
+        return items if items else list(self.selection)
+
+    def _set_parent(self, node, parent):
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        node.parent = parent
+        if parent is not None:
+            parent.children.append(node)
+        node.invalidate()
+
+    def _descendants(self, node):
+        # depth first, parents ahead of their children
+        stack = list(reversed(node.children))
+        while stack:
+            child = stack.pop()
+            yield child
+            stack.extend(reversed(child.children))
+
+    def _transform_of(self, node):
+        return node if node.is_transform or node.parent is None else node.parent
+
+    # ------------------------------------------------------------------
+    # attribute helpers
+    # ------------------------------------------------------------------
+
+    def _plug(self, plug):
+        match = PLUG_PATTERN.match(plug)
+        if not match:
+            raise ValueError('Invalid plug: {}'.format(plug))
+        node = self._node(match.group(1))
+        return node, node.resolve(match.group(2))
+
+    def _channel(self, attr):
+        # translateX / tx -> ('translate', 0)
+        for long_name, short in COMPOUNDS.items():
+            for index, axis in enumerate(AXES):
+                if attr in (long_name + axis, short + axis.lower()):
+                    return long_name, index
+        return attr, None
+
+    def _get(self, node, attr):
+        attr, index = self._channel(node.resolve(attr))
+        base = re.sub(r'\[\d+\]$', '', attr)
+        if base in ('worldMatrix', 'matrix', 'parentMatrix',
+                    'worldInverseMatrix', 'parentInverseMatrix'):
+            return self._matrix_attr(node, base)
+        if base == 'arcLength' and node.type == 'curveInfo':
+            return self._info_length(node)
+        if node.type == 'nurbsCurve' or node.is_transform and any(
+                shape.type == 'nurbsCurve' for shape in node.shapes):
+            component = COMPONENT_PATTERN.match(attr)
+            if component and component.group(1) in ('cv', 'controlPoints'):
+                cvs = self._curve_shape(node).attrs['cvs']
+                return [tuple(cvs[i]) for i in self._indices(component, cvs)]
+            if attr == 'form':
+                return FORMS[self._curve_shape(node).attrs['form']]
+        if attr not in node.attrs:
+            raise ValueError(
+                "'{}.{}' is not a valid attribute".format(node.name, attr))
+        value = node.attrs[attr]
+        return value[index] if index is not None else value
+
+    def _set(self, node, attr, value):
+        attr, index = self._channel(node.resolve(attr))
+        if index is not None:
+            node.attrs[attr] = list(node.attrs[attr])
+            node.attrs[attr][index] = float(value)
+        else:
+            node.attrs[attr] = value
+
+    def _matrix_attr(self, node, attr):
+        node = self._transform_of(node)
+        if attr == 'worldMatrix':
+            return self._world(node)
+        if attr == 'matrix':
+            return self._local(node)
+        if attr == 'worldInverseMatrix':
+            return _inverse(self._world(node))
+        parent = self._parent_world(node)
+        return parent if attr == 'parentMatrix' else _inverse(parent)
+
+    # ------------------------------------------------------------------
+    # transform math
+    # ------------------------------------------------------------------
+
+    def _local(self, node):
+        attrs = node.attrs
+        jo = attrs.get('jointOrient') if node.type == 'joint' else None
+        local = _compose(
+            attrs['translate'], attrs['rotate'], attrs['scale'], jo)
+        if 'offsetParentMatrix' in attrs:
+            local = _mult(local, attrs['offsetParentMatrix'])
+        return local
+
+    def _parent_world(self, node):
+        parent = node.parent
+        if parent is None or not node.attrs.get('inheritsTransform', True):
+            return list(IDENTITY)
+        return self._world(self._transform_of(parent))
+
+    def _world(self, node):
+        # up to the first cached, root or not inheriting transform, then
+        # back down caching every world matrix on the way; a loop, so deep
+        # hierarchies don't hit the recursion limit
+        node = self._transform_of(node)
+        missing = list()
+        world = node.world
+        while world is None:
+            missing.append(node)
+            if node.parent is None or \
+                    not node.attrs.get('inheritsTransform', True):
+                world = IDENTITY
+                break
+            node = self._transform_of(node.parent)
+            world = node.world
+
+        for item in reversed(missing):
+            world = item.world = _mult(self._local(item), world)
+        return list(world)
+
+    def _set_world(self, node, matrix):
+        local = _mult(matrix, _inverse(self._parent_world(node)))
+        if 'offsetParentMatrix' in node.attrs:
+            local = _mult(local, _inverse(node.attrs['offsetParentMatrix']))
+        t, r, s = _decompose(local)
+        if node.type == 'joint':
+            jo = node.attrs['jointOrient']
+            r = _euler(_mult(_rotation(r), _inverse(_rotation(jo))))
+        node.attrs['translate'], node.attrs['scale'] = t, s
+        node.attrs['rotate'] = r
+
+    def _set_world_translation(self, node, position):
+        matrix = self._world(node)
+        matrix[12:15] = [float(p) for p in position]
+        self._set_world(node, matrix)
+
+    def _set_world_rotation(self, node, rotation):
+        world = self._world(node)
+        t, _, s = _decompose(world)
+        self._set_world(node, _compose(t, rotation, s))
+
+    def _point(self, plug_or_node):
+        # world position of a node, a pivot or a curve cv
+        if isinstance(plug_or_node, Node):
+            return self._world(plug_or_node)[12:15]
+        match = PLUG_PATTERN.match(plug_or_node)
+        if not match:
+            return self._world(self._node(plug_or_node))[12:15]
+
+        node = self._node(match.group(1))
+        component = COMPONENT_PATTERN.match(match.group(2))
+        if component and component.group(1) in ('cv', 'ep'):
+            cvs = self._curve_shape(node).attrs['cvs']
+            world = self._world(node)
+            points = list()
+            for index in self._indices(component, cvs):
+                points.extend(_transform_point(cvs[index] + [1.0], world))
+            return points
+        attr = node.resolve(match.group(2))
+        if attr in ('rotatePivot', 'scalePivot'):
+            point = list(node.attrs[attr]) + [1.0]
+            return _transform_point(point, self._world(node))
+        raise ValueError('Cannot query position of {}'.format(plug_or_node))
+
+    @staticmethod
+    def _indices(component, items):
+        # cv[3], cv[1:4] and cv[*] style component ranges
+        if component.group(2) == '*':
+            return range(len(items))
+        start = int(component.group(2) or 0)
+        end = component.group(3)
+        if end is None:
+            return [start] if component.group(2) else range(len(items))
+        return range(start, int(end or len(items) - 1) + 1)
+
+    # ------------------------------------------------------------------
+    # creation commands
+    # ------------------------------------------------------------------
+
+    def createNode(self, ntype, name=None, n=None, parent=None, p=None,
+                   skipSelect=False, ss=False):
+        parent = parent or p
+        parent = self._node(parent) if parent else None
+        node = self._new(ntype, name or n, parent, auto=ntype)
+        if ntype == 'transform' and not (skipSelect or ss):
+            self.selection = [node.name]
+        return node.name
+
+    def shadingNode(self, ntype, asUtility=False, asShader=False,
+                    name=None, n=None, **kwargs):
+        return self.createNode(ntype, name=name or n, ss=True)
+
+    def spaceLocator(self, name=None, n=None, position=None, p=None,
+                     **kwargs):
+        name = name or n
+        transform = self._new('transform', name, auto='locator')
+        if name:
+            self._new_shape('locator', transform)
+        else:
+            self._new_shape('locator', transform, base='locatorShape')
+        position = position or p
+        if position:
+            transform.shapes[0].attrs['localPosition'] = [
+                float(v) for v in position]
+        self.selection = [transform.name]
+        return [transform.name]
+
+    def group(self, *objs, **kwargs):
+        name = kwargs.get('name') or kwargs.get('n')
+        parent = kwargs.get('parent') or kwargs.get('p')
+        empty = kwargs.get('empty') or kwargs.get('em')
+        grp = self._new('transform', name, auto='null' if empty else 'group')
+
+        if parent:
+            self._set_parent(grp, self._node(parent))
+        if not empty:
+            for node in self._nodes(self._targets(objs)):
+                world = self._world(node)
+                self._set_parent(node, grp)
+                self._set_world(node, world)
+
+        self.selection = [grp.name]
+        return grp.name
+
+    def joint(self, *objs, **kwargs):
+        if kwargs.get('edit') or kwargs.get('e'):
+            return self._edit_joint(objs, kwargs)
+        if kwargs.get('query') or kwargs.get('q'):
+            node = self._node(self._targets(objs)[0])
+            if kwargs.get('position') or kwargs.get('p'):
+                if kwargs.get('relative') or kwargs.get('r'):
+                    return list(node.attrs['translate'])
+                return self._point(node)
+            if kwargs.get('orientation') or kwargs.get('o'):
+                return list(node.attrs['jointOrient'])
+            if kwargs.get('radius') or kwargs.get('rad'):
+                return [node.attrs['radius']]
+            raise Unsupported('joint query flags: {}'.format(kwargs))
+
+        name = kwargs.get('name') or kwargs.get('n')
+        position = kwargs.get('position') or kwargs.get('p') or [0, 0, 0]
+
+        parent = None
+        if self.selection:
+            selected = self.nodes.get(self.selection[-1])
+            if selected is not None and selected.type == 'joint':
+                parent = selected
+
+        jnt = self._new('joint', name, parent)
+        orientation = kwargs.get('orientation') or kwargs.get('o')
+        if orientation:
+            jnt.attrs['jointOrient'] = [float(v) for v in orientation]
+        self._set_world_translation(jnt, position)
+        if kwargs.get('radius') or kwargs.get('rad'):
+            jnt.attrs['radius'] = float(kwargs.get('radius') or kwargs['rad'])
+
+        self.selection = [jnt.name]
+        return jnt.name
+
+    def _edit_joint(self, objs, kwargs):
+        orient = kwargs.get('orientJoint') or kwargs.get('oj')
+        if not orient:
+            return None
+        up = SECONDARY_AXES.get(
+            kwargs.get('secondaryAxisOrient') or kwargs.get('sao') or 'yup')
+        recursive = kwargs.get('children') or kwargs.get('ch')
+
+        roots = self._nodes(self._targets(objs))
+        jnts = list()
+        for root in roots:
+            jnts.append(root)
+            if recursive:
+                jnts.extend(d for d in self._descendants(root)
+                            if d.type == 'joint')
+
+        for jnt in jnts:
+            self._orient_joint(jnt, orient, up)
+
+    def _orient_joint(self, jnt, orient, up):
+        children = [c for c in jnt.children if c.type == 'joint']
+        child_worlds = [(c, self._world(c)) for c in jnt.children
+                        if c.is_transform]
+
+        position = self._world(jnt)[12:15]
+        if orient == 'none' or not children:
+            # end joints align with their parent
+            rotation = _rotation_of(self._parent_world(jnt))
+        else:
+            aim = _sub(self._world(children[0])[12:15], position)
+            rotation = _frame(aim, up, orient)
+
+        parent_rotation = _rotation_of(self._parent_world(jnt))
+        jnt.attrs['rotate'] = [0.0, 0.0, 0.0]
+        jnt.attrs['jointOrient'] = _euler(
+            _mult(rotation, _inverse(parent_rotation)))
+        self._set_world_translation(jnt, position)
+
+        for child, world in child_worlds:
+            self._set_world(child, world)
+
+    def circle(self, normal=None, nr=None, center=None, c=None, radius=1.0,
+               r=None, sections=8, s=None, degree=3, d=None,
+               name=None, n=None, **kwargs):
+        normal = normal or nr or (0, 0, 1)
+        center = center or c or (0, 0, 0)
+        radius = r if r is not None else radius
+        sections = s or sections
+
+        # periodic cubic circle passing through the radius at each knot
+        cv_radius = radius * 6.0 / (4.0 + 2.0 * math.cos(2*math.pi/sections))
+        u_axis, v_axis = _plane(normal)
+        points = list()
+        for i in range(sections):
+            angle = 2 * math.pi * i / sections
+            point = [center[k] + cv_radius * (
+                math.cos(angle) * u_axis[k] + math.sin(angle) * v_axis[k])
+                for k in range(3)]
+            points.append(point)
+        points.extend(copy.deepcopy(points[:3]))
+        knots = [float(k) for k in range(-2, sections + 3)]
+
+        transform = self._new('transform', name or n, auto='nurbsCircle')
+        self._make_curve_shape(transform, points, 3, knots, 'periodic')
+        maker = self._new('makeNurbCircle', auto='makeNurbCircle')
+        self.selection = [transform.name]
+        return [transform.name, maker.name]
+
+    def curve(self, *args, **kwargs):
+        if kwargs.get('query') or kwargs.get('q'):
+            # maya has no curve queries either, shapes are read with getAttr
+            raise Unsupported('curve query flags: {}'.format(kwargs))
+
+        points = kwargs.get('point') or kwargs.get('p') or list()
+        points = [[float(v) for v in p] for p in points]
+        degree = kwargs.get('degree') or kwargs.get('d') or 3
+        periodic = kwargs.get('periodic') or kwargs.get('per')
+        knots = kwargs.get('knot') or kwargs.get('k')
+        degree = min(degree, max(len(points)-1, 1))
+        if not knots:
+            knots = _open_knots(len(points), degree)
+
+        name = kwargs.get('name') or kwargs.get('n')
+        transform = self._new('transform', name, auto='curve')
+        form = 'periodic' if periodic else 'open'
+        self._make_curve_shape(transform, points, degree, knots, form)
+        self.selection = [transform.name]
+        return transform.name
+
+    def _make_curve_shape(self, transform, points, degree, knots, form):
+        shape = self._new_shape('nurbsCurve', transform)
+        shape.attrs['cvs'] = [list(p) for p in points]
+        shape.attrs['degree'] = degree
+        shape.attrs['knots'] = [float(k) for k in knots]
+        shape.attrs['form'] = form
+        return shape
+
+    def _curve_shape(self, node):
+        if node.type == 'nurbsCurve':
+            return node
+        for shape in node.shapes:
+            if shape.type == 'nurbsCurve':
+                return shape
+        raise ValueError('{} is not a nurbsCurve'.format(node.name))
+
+    def textCurves(self, text=None, t=None, font=None, f=None, name=None,
+                   n=None, **kwargs):
+        # glyphs are stood in by one box outline per character
+        text = text or t or ''
+        grp = self._new('transform', name or n, auto='Text_')
+        for index, char in enumerate(text):
+            if char.isspace():
+                continue
+            x0, x1 = index * 0.7, index * 0.7 + 0.6
+            box = [[x0, 0, 0], [x1, 0, 0], [x1, 1, 0], [x0, 1, 0], [x0, 0, 0]]
+            char_name = 'Char_{}_'.format(char if char.isalnum() else 'sym')
+            glyph = self._new('transform', auto=char_name, parent=grp)
+            self._make_curve_shape(glyph, box, 1, _open_knots(5, 1), 'open')
+        maker = self._new('makeTextCurves', auto='makeTextCurves')
+        self.selection = [grp.name]
+        return [grp.name, maker.name]
+
+    def duplicate(self, *objs, **kwargs):
+        name = kwargs.get('name') or kwargs.get('n')
+        result = list()
+        for node in self._nodes(self._targets(objs)):
+            dup = self._duplicate(node, name if not result else None,
+                                  node.parent)
+            result.append(dup.name)
+        self.selection = result[:1]
+        return result
+
+    def _duplicate(self, node, name, parent):
+        if name:
+            name = self._unique(name)
+        elif node.is_transform:
+            name = self._unique(node.name)
+        else:
+            name = self._unique('{}Shape'.format(parent.name))
+        dup = Node(name, node.type)
+        dup.attrs = copy.deepcopy(node.attrs)
+        dup.aliases = dict(node.aliases)
+        dup.added = copy.deepcopy(node.added)
+        self.nodes[name] = dup
+        if parent is not None:
+            self._set_parent(dup, parent)
+        for child in list(node.children):
+            self._duplicate(child, None, dup)
+        return dup
+
+    def rename(self, *args, **kwargs):
+        args = self._flatten(args)
+        if len(args) == 1:
+            old, new = self.selection[-1], args[0]
+        else:
+            old, new = args[0], args[1]
+        node = self._node(old)
+        if node.name == new:
+            return new
+        del self.nodes[node.name]
+        node.name = self._unique(new)
+        self.nodes[node.name] = node
+        self.selection = [node.name]
+        return node.name
+
+    def delete(self, *objs, **kwargs):
+        items = self._flatten(objs)
+        if not items and objs:
+            raise ValueError('No object matches name')
+        dead = list()
+        for node in self._nodes(self._targets(items)):
+            if node.name not in self.nodes:
+                continue
+            for item in [node] + list(self._descendants(node)):
+                self.nodes.pop(item.name, None)
+                dead.append(item)
+            self._set_parent(node, None)
+        self._disconnect_nodes(dead)
+        self.selection = [s for s in self.selection if s in self.nodes]
+
+    def select(self, *objs, **kwargs):
+        if kwargs.get('clear') or kwargs.get('cl'):
+            self.selection = list()
+            return
+        names = [self._node(o).name for o in self._flatten(objs)]
+        if kwargs.get('add'):
+            self.selection.extend(names)
+        else:
+            self.selection = names
+
+    # ------------------------------------------------------------------
+    # hierarchy commands
+    # ------------------------------------------------------------------
+
+    def parent(self, *objs, **kwargs):
+        items = self._flatten(objs)
+        world = kwargs.get('world') or kwargs.get('w')
+        relative = kwargs.get('relative') or kwargs.get('r')
+        shape = kwargs.get('shape') or kwargs.get('s')
+
+        if world:
+            children, parent = self._nodes(items), None
+        else:
+            children, parent = self._nodes(items[:-1]), self._node(items[-1])
+
+        result = list()
+        for child in children:
+            if child.parent is parent:
+                result.append(child.name)
+                continue
+            if shape or not child.is_transform:
+                self._set_parent(child, parent)
+            elif relative:
+                self._set_parent(child, parent)
+            else:
+                matrix = self._world(child)
+                self._set_parent(child, parent)
+                self._set_world(child, matrix)
+            result.append(child.name)
+        return result
+
+    def listRelatives(self, *objs, **kwargs):
+        nodes = self._nodes(self._targets(objs))
+        ntype = kwargs.get('type')
+
+        found = list()
+        for node in nodes:
+            if kwargs.get('parent') or kwargs.get('p'):
+                if node.parent is not None:
+                    found.append(node.parent)
+            elif kwargs.get('allDescendents') or kwargs.get('ad'):
+                found.extend(reversed(list(self._descendants(node))))
+            elif kwargs.get('shapes') or kwargs.get('s'):
+                found.extend(node.shapes)
+            else:
+                found.extend(node.children)
+
+        if ntype:
+            types = ntype if isinstance(ntype, (list, tuple)) else [ntype]
+            found = [n for n in found if n.type in types or (
+                'transform' in types and n.is_transform)]
+        return [n.name for n in found] or None
+
+    def inheritTransform(self, *objs, **kwargs):
+        off = kwargs.get('off')
+        for node in self._nodes(self._targets(objs)):
+            world = self._world(node)
+            node.attrs['inheritsTransform'] = not off
+            if kwargs.get('preserve', kwargs.get('p', True)):
+                self._set_world(node, world)
+
+    # ------------------------------------------------------------------
+    # query commands
+    # ------------------------------------------------------------------
+
+    def ls(self, *patterns, **kwargs):
+        patterns = self._flatten(patterns)
+        flatten = kwargs.get('flatten') or kwargs.get('fl')
+        ntype = kwargs.get('type')
+
+        if kwargs.get('selection') or kwargs.get('sl'):
+            found = [n for n in self.selection if n in self.nodes]
+        elif not patterns:
+            found = list(self.nodes)
+        else:
+            found = list()
+            for pattern in patterns:
+                found.extend(self._match(pattern, flatten))
+
+        if kwargs.get('transforms') or kwargs.get('tr'):
+            found = [n for n in found
+                     if n in self.nodes and self.nodes[n].is_transform]
+        if kwargs.get('shapes'):
+            found = [n for n in found
+                     if n in self.nodes and not self.nodes[n].is_transform
+                     and self.nodes[n].is_dag]
+        if ntype:
+            types = ntype if isinstance(ntype, (list, tuple)) else [ntype]
+            found = [n for n in found
+                     if n in self.nodes and self.nodes[n].type in types]
+        return found
+
+    def _match(self, pattern, flatten):
+        pattern = str(pattern).split('|')[-1]
+        match = PLUG_PATTERN.match(pattern)
+        if match:
+            return self._match_components(match, flatten)
+        if '*' in pattern or '?' in pattern:
+            return fnmatch.filter(self.nodes, pattern)
+        return [pattern] if pattern in self.nodes else list()
+
+    def _match_components(self, match, flatten):
+        name = match.group(1)
+        if name not in self.nodes:
+            return list()
+        component = COMPONENT_PATTERN.match(match.group(2))
+        if not component or component.group(1) not in ('cv', 'ep'):
+            return [match.group(0)]
+
+        cvs = self._curve_shape(self.nodes[name]).attrs['cvs']
+        indices = self._indices(component, cvs)
+        start, end = indices[0], min(indices[-1], len(cvs) - 1)
+        if not flatten:
+            return ['{}.cv[{}:{}]'.format(name, start, end)]
+        return ['{}.cv[{}]'.format(name, i) for i in range(start, end+1)]
+
+    def objExists(self, name):
+        match = PLUG_PATTERN.match(name)
+        if not match:
+            return name.split('|')[-1] in self.nodes
+        try:
+            node, attr = self._plug(name)
+            self._get(node, attr)
+        except ValueError:
+            return False
+        return True
+
+    def nodeType(self, name, **kwargs):
+        match = PLUG_PATTERN.match(name)
+        node = self._node(match.group(1) if match else name)
+        if not (kwargs.get('inherited') or kwargs.get('i')):
+            return node.type
+
+        # the abstract types the lookups need, the node type last
+        types = list()
+        if node.is_dag:
+            types.extend(['dagNode',
+                          'transform' if node.is_transform else 'shape'])
+        if node.type.endswith('Constraint'):
+            types.append('constraint')
+        if node.type not in types:
+            types.append(node.type)
+        return types
+
+    objectType = nodeType
+
+    def attributeQuery(self, attr, node=None, n=None, exists=False,
+                       ex=False, **kwargs):
+        node = self._node(node or n)
+        try:
+            self._get(node, attr)
+        except ValueError:
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # attribute commands
+    # ------------------------------------------------------------------
+
+    def getAttr(self, plug, **kwargs):
+        node, attr = self._plug(plug)
+        if kwargs.get('lock') or kwargs.get('l'):
+            return attr in node.locked
+        value = self._get(node, attr)
+        if attr in COMPOUNDS:
+            return [tuple(value)]
+        return copy.deepcopy(value)
+
+    def setAttr(self, plug, *values, **kwargs):
+        try:
+            node, attr = self._plug(plug)
+        except ValueError as error:
+            # maya reports a missing plug on edit as a runtime error
+            raise RuntimeError('setAttr: {}'.format(error))
+        lock = kwargs.get('lock', kwargs.get('l'))
+        if lock is not None:
+            if lock:
+                node.locked.add(attr)
+            else:
+                node.locked.discard(attr)
+        if not values:
+            return
+        if kwargs.get('type') == 'nurbsCurve':
+            return self._set_curve_data(node, values)
+        value = list(values) if len(values) > 1 else values[0]
+        if isinstance(value, (list, tuple)):
+            value = [float(v) for v in self._flatten(value)]
+        self._set(node, attr, value)
+
+    def _set_curve_data(self, shape, values):
+        # degree, spans, form, rational, dimension, knots, knot count,
+        # cv count and the cvs, the order of setAttr -type nurbsCurve
+        degree, _, form = values[:3]
+        count = values[7]
+        shape.attrs['degree'] = int(degree)
+        shape.attrs['form'] = dict((v, k) for k, v in FORMS.items())[form]
+        shape.attrs['knots'] = [float(k) for k in values[5]]
+        shape.attrs['cvs'] = [
+            [float(v) for v in cv][:3] for cv in values[8:8+count]]
+
+    def addAttr(self, *objs, **kwargs):
+        long_name = kwargs.get('longName') or kwargs.get('ln')
+        short_name = kwargs.get('shortName') or kwargs.get('sn')
+        default = kwargs.get('defaultValue', kwargs.get('dv', 0.0))
+        long_name = long_name or short_name
+        for node in self._nodes(self._targets(objs)):
+            node.attrs[long_name] = default
+            node.added[long_name] = dict(kwargs)
+            if short_name and short_name != long_name:
+                node.aliases[short_name] = long_name
+
+    def deleteAttr(self, *plugs, **kwargs):
+        for plug in self._targets(plugs):
+            node, attr = self._plug(plug)
+            for key in self.connections.of(node):
+                value = self.connections[key]
+                if (key[0] is node and key[1] == attr) or \
+                        (value[0] is node and value[1] == attr):
+                    del self.connections[key]
+            node.attrs.pop(attr, None)
+            node.added.pop(attr, None)
+            node.locked.discard(attr)
+            for alias, name in list(node.aliases.items()):
+                if name == attr:
+                    del node.aliases[alias]
+
+    def connectAttr(self, source, destination, force=False, f=False,
+                    **kwargs):
+        src = self._plug(source)
+        dst = self._plug(destination)
+        if dst in self.connections and not (force or f):
+            raise RuntimeError('{} is already connected'.format(destination))
+        self._disconnect_plug(dst)
+        self.connections[dst] = src
+
+    def disconnectAttr(self, source, destination, **kwargs):
+        self._disconnect_plug(self._plug(destination))
+
+    def listConnections(self, *objs, **kwargs):
+        source = kwargs.get('source', kwargs.get('s', True))
+        destination = kwargs.get('destination', kwargs.get('d', True))
+        plugs = kwargs.get('plugs') or kwargs.get('p')
+        shapes = kwargs.get('shapes') or kwargs.get('sh')
+        ntype = kwargs.get('type') or kwargs.get('t')
+        pairs = kwargs.get('connections') or kwargs.get('c')
+
+        found = list()
+        for item in self._targets(objs):
+            match = PLUG_PATTERN.match(item)
+            node = self._node(match.group(1) if match else item)
+            attr = node.resolve(match.group(2)) if match else None
+
+            for dst, dst_attr in self.connections.of(node):
+                src, src_attr = self.connections[(dst, dst_attr)]
+                if destination and src is node and \
+                        attr in (None, src_attr):
+                    found.append((node, src_attr, dst, dst_attr))
+                if source and dst is node and attr in (None, dst_attr):
+                    found.append((node, dst_attr, src, src_attr))
+
+        result = list()
+        for local, local_attr, other, other_attr in found:
+            if ntype and other.type != ntype:
+                continue
+            if not shapes and other.is_dag and not other.is_transform:
+                other = other.parent
+            name = '{}.{}'.format(other.name, other_attr) if plugs \
+                else other.name
+            if pairs:
+                # like maya, each connection as the local plug followed by
+                # the other end, duplicates included
+                result.extend(['{}.{}'.format(local.name, local_attr), name])
+            elif name not in result:
+                result.append(name)
+        return result or None
+
+    def _disconnect_plug(self, plug):
+        self.connections.pop((plug[0], plug[1]), None)
+
+    def _disconnect_nodes(self, nodes):
+        dead = set(id(node) for node in nodes)
+        sources = list()
+        for node in nodes:
+            for key in self.connections.of(node):
+                value = self.connections.pop(key)
+                if id(key[0]) in dead:
+                    sources.append(value[0])
+
+        # like maya, animation curves left driving nothing go along
+        orphans = [node for node in sources
+                   if node.type.startswith('animCurve') and
+                   node.name in self.nodes and not self._drives(node)]
+        for node in orphans:
+            self.nodes.pop(node.name, None)
+        if orphans:
+            self._disconnect_nodes(orphans)
+
+    def _drives(self, node):
+        return any(self.connections[key][0] is node
+                   for key in self.connections.of(node))
+
+    # ------------------------------------------------------------------
+    # transform commands
+    # ------------------------------------------------------------------
+
+    def xform(self, *objs, **kwargs):
+        query = kwargs.get('query') or kwargs.get('q')
+        world = kwargs.get('worldSpace') or kwargs.get('ws')
+        relative = kwargs.get('relative') or kwargs.get('r')
+        targets = self._targets(objs)
+
+        if query:
+            return self._query_xform(targets[0], world, kwargs)
+
+        for target in targets:
+            match = PLUG_PATTERN.match(target)
+            node = self._node(match.group(1) if match else target)
+            self._edit_xform(node, world, relative, kwargs)
+
+    def _query_xform(self, target, world, kwargs):
+        match = PLUG_PATTERN.match(target)
+        if match and match.group(2) not in ('rotatePivot', 'scalePivot'):
+            return self._point(target)
+        if match:
+            return self._point(target) if world else list(
+                self._node(match.group(1)).attrs[match.group(2)])
+
+        node = self._node(target)
+        if kwargs.get('translation') or kwargs.get('t'):
+            if world:
+                return self._world(node)[12:15]
+            return list(node.attrs['translate'])
+        if kwargs.get('rotation') or kwargs.get('ro'):
+            if world:
+                return _euler(_rotation_of(self._world(node)))
+            return list(node.attrs['rotate'])
+        if kwargs.get('scale') or kwargs.get('s'):
+            if world:
+                return _decompose(self._world(node))[2]
+            return list(node.attrs['scale'])
+        if kwargs.get('matrix') or kwargs.get('m'):
+            return self._world(node) if world else self._local(node)
+        if kwargs.get('rotatePivot') or kwargs.get('rp') or \
+                kwargs.get('pivots') or kwargs.get('piv'):
+            return self._point('{}.rotatePivot'.format(node.name)) \
+                if world else list(node.attrs['rotatePivot'])
+        if kwargs.get('scalePivot') or kwargs.get('sp'):
+            return self._point('{}.scalePivot'.format(node.name)) \
+                if world else list(node.attrs['scalePivot'])
+        if kwargs.get('rotateOrder') or kwargs.get('roo'):
+            return ROTATE_ORDERS[node.attrs['rotateOrder']]
+        raise Unsupported('xform query flags: {}'.format(kwargs))
+
+    def _edit_xform(self, node, world, relative, kwargs):
+        translation = kwargs.get('translation') or kwargs.get('t')
+        rotation = kwargs.get('rotation') or kwargs.get('ro')
+        scale = kwargs.get('scale') or kwargs.get('s')
+        matrix = kwargs.get('matrix') or kwargs.get('m')
+        pivots = kwargs.get('pivots') or kwargs.get('piv')
+
+        if matrix:
+            matrix = [float(v) for v in matrix]
+            if world:
+                self._set_world(node, matrix)
+            else:
+                t, r, s = _decompose(matrix)
+                node.attrs.update({'translate': t, 'rotate': r, 'scale': s})
+        if translation:
+            translation = [float(v) for v in translation]
+            if relative:
+                translation = _add(
+                    self._world(node)[12:15] if world
+                    else node.attrs['translate'], translation)
+            if world:
+                self._set_world_translation(node, translation)
+            else:
+                node.attrs['translate'] = translation
+        if rotation:
+            rotation = [float(v) for v in rotation]
+            if relative:
+                rotation = _add(node.attrs['rotate'], rotation)
+            if world and not relative:
+                self._set_world_rotation(node, rotation)
+            else:
+                node.attrs['rotate'] = rotation
+        if scale:
+            scale = [float(v) for v in scale]
+            if relative:
+                scale = [a*b for a, b in zip(node.attrs['scale'], scale)]
+            node.attrs['scale'] = scale
+        if pivots:
+            self._set_pivot(node, 'rotatePivot', pivots, world)
+            self._set_pivot(node, 'scalePivot', pivots, world)
+
+    def _set_pivot(self, node, attr, position, world):
+        position = [float(v) for v in position]
+        if world:
+            inverse = _inverse(self._world(node))
+            position = _transform_point(position + [1.0], inverse)
+        node.attrs[attr] = position
+
+    def move(self, x, y, z, *objs, **kwargs):
+        relative = kwargs.get('relative') or kwargs.get('r')
+        local = kwargs.get('objectSpace') or kwargs.get('os') or \
+            kwargs.get('localSpace') or kwargs.get('ls')
+        delta = [float(x), float(y), float(z)]
+
+        for target in self._targets(objs):
+            match = PLUG_PATTERN.match(target)
+            if match:
+                node = self._node(match.group(1))
+                attr = node.resolve(match.group(2))
+                position = delta
+                if relative:
+                    position = _add(self._point(target), delta)
+                self._set_pivot(node, attr, position, True)
+                continue
+
+            node = self._node(target)
+            if local:
+                base = node.attrs['translate'] if relative else [0, 0, 0]
+                node.attrs['translate'] = _add(base, delta)
+                continue
+            position = _add(self._world(node)[12:15], delta) \
+                if relative else delta
+            self._set_world_translation(node, position)
+
+    def rotate(self, x, y, z, *objs, **kwargs):
+        relative = kwargs.get('relative') or kwargs.get('r')
+        delta = [float(x), float(y), float(z)]
+        for node in self._nodes(self._targets(objs)):
+            base = node.attrs['rotate'] if relative else [0, 0, 0]
+            node.attrs['rotate'] = _add(base, delta)
+
+    def scale(self, x, y, z, *objs, **kwargs):
+        relative = kwargs.get('relative') or kwargs.get('r')
+        factor = [float(x), float(y), float(z)]
+        for node in self._nodes(self._targets(objs)):
+            base = node.attrs['scale'] if relative else [1, 1, 1]
+            node.attrs['scale'] = [a*b for a, b in zip(base, factor)]
+
+    def makeIdentity(self, *objs, **kwargs):
+        if not (kwargs.get('apply') or kwargs.get('a')):
+            return
+        flags = [bool(kwargs.get(short) or kwargs.get(long_name))
+                 for short, long_name in (('t', 'translate'),
+                                          ('r', 'rotate'),
+                                          ('s', 'scale'))]
+        if not any(flags):
+            flags = [True, True, True]
+
+        for node in self._nodes(self._targets(objs)):
+            self._freeze(node, *flags)
+
+    def _freeze(self, node, translate, rotate, scale):
+        attrs = node.attrs
+        before = self._local(node)
+        if node.type == 'joint':
+            if rotate:
+                attrs['jointOrient'] = _euler(_mult(
+                    _rotation(attrs['rotate']),
+                    _rotation(attrs['jointOrient'])))
+                attrs['rotate'] = [0.0, 0.0, 0.0]
+            if scale:
+                attrs['scale'] = [1.0, 1.0, 1.0]
+        else:
+            if translate:
+                attrs['translate'] = [0.0, 0.0, 0.0]
+            if rotate:
+                attrs['rotate'] = [0.0, 0.0, 0.0]
+            if scale:
+                attrs['scale'] = [1.0, 1.0, 1.0]
+
+        # push the frozen part down into shapes and children
+        baked = _mult(before, _inverse(self._local(node)))
+        for child in node.children:
+            if child.type == 'nurbsCurve':
+                child.attrs['cvs'] = [
+                    _transform_point(p + [1.0], baked)
+                    for p in child.attrs['cvs']]
+            elif child.is_transform:
+                t, r, s = _decompose(_mult(self._local(child), baked))
+                child.attrs['translate'], child.attrs['scale'] = t, s
+                if child.type == 'joint':
+                    jo = child.attrs['jointOrient']
+                    r = _euler(_mult(_rotation(r), _inverse(_rotation(jo))))
+                child.attrs['rotate'] = r
+        for pivot in ('rotatePivot', 'scalePivot'):
+            attrs[pivot] = _transform_point(attrs[pivot] + [1.0], baked)
+
+    def matchTransform(self, source, target, pos=True, rot=True,
+                       scl=True, **kwargs):
+        if not any(kwargs.get(f) for f in ('position', 'rotation', 'scale')):
+            explicit = [pos, rot, scl]
+        else:
+            explicit = [kwargs.get('position'), kwargs.get('rotation'),
+                        kwargs.get('scale')]
+        node, other = self._node(source), self._node(target)
+        t, r, s = _decompose(self._world(node))
+        ot, orr, os_ = _decompose(self._world(other))
+        matrix = _compose(ot if explicit[0] else t,
+                          orr if explicit[1] else r,
+                          os_ if explicit[2] else s)
+        self._set_world(node, matrix)
+
+    # ------------------------------------------------------------------
+    # constraints
+    # ------------------------------------------------------------------
+
+    def pointConstraint(self, *objs, **kwargs):
+        return self._constraint('pointConstraint', objs, kwargs)
+
+    def orientConstraint(self, *objs, **kwargs):
+        return self._constraint('orientConstraint', objs, kwargs)
+
+    def parentConstraint(self, *objs, **kwargs):
+        return self._constraint('parentConstraint', objs, kwargs)
+
+    def aimConstraint(self, *objs, **kwargs):
+        return self._constraint('aimConstraint', objs, kwargs)
+
+    def scaleConstraint(self, *objs, **kwargs):
+        return self._constraint('scaleConstraint', objs, kwargs)
+
+    def poleVectorConstraint(self, *objs, **kwargs):
+        return self._constraint('poleVectorConstraint', objs, kwargs)
+
+    def _constraint(self, ctype, objs, kwargs):
+        items = self._targets(objs)
+        targets, driven = self._nodes(items[:-1]), self._node(items[-1])
+        weight = kwargs.get('weight', kwargs.get('w', 1.0))
+        offset = kwargs.get('maintainOffset') or kwargs.get('mo')
+
+        # like maya, an existing constraint of the same type gets the
+        # new targets appended instead of creating another node
+        cons = None
+        for child in driven.children:
+            if child.type == ctype:
+                cons = child
+        if cons is None:
+            name = kwargs.get('name') or kwargs.get('n') or \
+                '{}_{}1'.format(driven.name, ctype)
+            cons = self._new(ctype, name, parent=driven)
+            cons.attrs['targets'] = list()
+            self._connect_constraint_outputs(cons, driven, ctype)
+
+        for target in targets:
+            index = len(cons.attrs['targets'])
+            cons.attrs['targets'].append(target.name)
+            attr = '{}W{}'.format(target.name, index)
+            cons.attrs[attr] = float(weight)
+            cons.aliases['w{}'.format(index)] = attr
+            self.connections[(cons, 'target[{}].targetParentMatrix'.format(
+                index))] = (target, 'parentMatrix')
+            self.connections[(cons, 'target[{}].targetWeight'.format(
+                index))] = (cons, attr)
+
+        if not offset:
+            self._snap(cons, driven, ctype, kwargs)
+        return [cons.name]
+
+    def _connect_constraint_outputs(self, cons, driven, ctype):
+        if ctype == 'poleVectorConstraint':
+            self.connections[(driven, 'poleVector')] = (
+                cons, 'constraintTranslate')
+            return
+        for channel in CONSTRAINT_CHANNELS[ctype]:
+            prefix = 'constraint' + channel[0].upper() + channel[1:]
+            for axis in AXES:
+                self.connections[(driven, channel + axis)] = (
+                    cons, prefix + axis)
+
+    def _snap(self, cons, driven, ctype, kwargs):
+        targets = [self.nodes[t] for t in cons.attrs['targets']
+                   if t in self.nodes]
+        if not targets or ctype in ('poleVectorConstraint',
+                                    'scaleConstraint'):
+            return
+        weights = [cons.attrs['{}W{}'.format(t.name, i)]
+                   for i, t in enumerate(targets)]
+        total = sum(weights) or 1.0
+
+        if ctype in ('pointConstraint', 'parentConstraint'):
+            position = [0.0, 0.0, 0.0]
+            for target, weight in zip(targets, weights):
+                position = _add(position, [
+                    v * weight / total for v in self._world(target)[12:15]])
+            self._set_world_translation(driven, position)
+
+        if ctype in ('orientConstraint', 'parentConstraint'):
+            heaviest = targets[weights.index(max(weights))]
+            rotation = _euler(_rotation_of(self._world(heaviest)))
+            self._set_world_rotation(driven, rotation)
+
+        if ctype == 'aimConstraint':
+            aim = _sub(self._world(targets[0])[12:15],
+                       self._world(driven)[12:15])
+            up = kwargs.get('worldUpVector') or kwargs.get('wu') or [0, 1, 0]
+            self._set_world_rotation(driven, _euler(_frame(aim, up, 'xyz')))
+
+    # ------------------------------------------------------------------
+    # deformers, handles and utilities
+    # ------------------------------------------------------------------
+
+    def ikHandle(self, *objs, **kwargs):
+        start = self._node(kwargs.get('startJoint') or kwargs.get('sj'))
+        end = self._node(kwargs.get('endEffector') or kwargs.get('ee'))
+        name = kwargs.get('name') or kwargs.get('n')
+        solver = kwargs.get('solver') or kwargs.get('sol') or 'ikRPsolver'
+
+        handle = self._new('ikHandle', name, auto='ikHandle')
+        handle.attrs['solver'] = solver
+        self._set_world_translation(handle, self._world(end)[12:15])
+        effector = self._new('ikEffector', auto='effector',
+                             parent=end.parent)
+        self._set_world_translation(effector, self._world(end)[12:15])
+
+        self.connections[(handle, 'startJoint')] = (start, 'message')
+        self.connections[(handle, 'endEffector')] = (effector, 'handlePath')
+
+        result = [handle.name, effector.name]
+        curve = kwargs.get('curve') or kwargs.get('c')
+        if curve:
+            shape = self._curve_shape(self._node(curve))
+            self.connections[(handle, 'inCurve')] = (shape, 'worldSpace')
+        elif solver == 'ikSplineSolver':
+            jnts = [start]
+            while jnts[-1] is not end and jnts[-1].children:
+                jnts.append(next(c for c in jnts[-1].children
+                                 if c.type == 'joint'))
+            points = [self._world(j)[12:15] for j in jnts]
+            result.append(self.curve(p=points, d=min(3, len(points)-1)))
+
+        self.selection = [handle.name]
+        return result
+
+    def cluster(self, *objs, **kwargs):
+        name = kwargs.get('name') or kwargs.get('n')
+        items = self._targets(objs)
+        points = [self._point(item) for item in items]
+        center = [sum(p[i] for p in points) / len(points) for i in range(3)]
+
+        deformer = self._new('cluster', name, auto='cluster')
+        handle = self._new('transform', '{}Handle'.format(deformer.name))
+        shape = self._new_shape('clusterHandle', handle)
+        handle.attrs['rotatePivot'] = list(center)
+        handle.attrs['scalePivot'] = list(center)
+        deformer.attrs['components'] = list(items)
+        self.connections[(deformer, 'matrix')] = (handle, 'worldMatrix')
+        self.connections[(deformer, 'clusterXforms')] = (
+            shape, 'clusterTransforms[0]')
+        self.selection = [handle.name]
+        return [deformer.name, handle.name]
+
+    def setDrivenKeyframe(self, *objs, **kwargs):
+        driver = kwargs.get('currentDriver') or kwargs.get('cd')
+        driver_value = kwargs.get('driverValue', kwargs.get('dv', 0.0))
+        value = kwargs.get('value', kwargs.get('v'))
+
+        driver_node, driver_attr = self._plug(driver)
+        for plug in self._targets(objs):
+            node, attr = self._plug(plug)
+            attr, index = self._channel(attr)
+            if index is not None:
+                attr = attr + AXES[index]
+
+            curve = None
+            source = self.connections.get((node, attr))
+            if source and source[0].type.startswith('animCurve'):
+                curve = source[0]
+            if curve is None:
+                curve = self._new('animCurveUU', '{}_{}'.format(
+                    node.name, attr))
+                curve.attrs['keys'] = list()
+                self.connections[(curve, 'input')] = (
+                    driver_node, driver_attr)
+                self.connections[(node, attr)] = (curve, 'output')
+
+            if value is None:
+                value = self._get(node, attr)
+            keys = [k for k in curve.attrs['keys'] if k[0] != driver_value]
+            keys.append((float(driver_value), float(value)))
+            curve.attrs['keys'] = sorted(keys)
+
+    def arclen(self, curve, constructionHistory=False, ch=False):
+        shape = self._curve_shape(self._node(curve))
+        if not (constructionHistory or ch):
+            return _polyline_length(self._world_cvs(shape))
+
+        info = self._new('curveInfo', auto='curveInfo')
+        self.connections[(info, 'inputCurve')] = (shape, 'worldSpace')
+        return info.name
+
+    def _world_cvs(self, shape):
+        world = self._world(shape.parent)
+        return [_transform_point(p + [1.0], world) for p in shape.attrs['cvs']]
+
+    def _info_length(self, info):
+        source = self.connections.get((info, 'inputCurve'))
+        if source is None:
+            return 0.0
+        return _polyline_length(self._world_cvs(source[0]))
+
+    def distanceDimension(self, startPoint=None, sp=None, endPoint=None,
+                          ep=None):
+        start = startPoint or sp
+        end = endPoint or ep
+
+        locs = list()
+        for point in (start, end):
+            loc = self.spaceLocator()[0]
+            self.nodes[loc].attrs['translate'] = [float(v) for v in point]
+            locs.append(self.nodes[loc])
+
+        transform = self._new('transform', auto='distanceDimension')
+        shape = self._new_shape(
+            'distanceDimShape', transform, base='distanceDimensionShape')
+        shape.attrs['distance'] = _length(_sub(end, start))
+        self.connections[(shape, 'startPoint')] = (
+            locs[0].shapes[0], 'worldPosition[0]')
+        self.connections[(shape, 'endPoint')] = (
+            locs[1].shapes[0], 'worldPosition[0]')
+        return shape.name
+
+    # ------------------------------------------------------------------
+    # session state, accepted and ignored
+    # ------------------------------------------------------------------
+
+    def refresh(self, *args, **kwargs):
+        return None
+
+    def undoInfo(self, *args, **kwargs):
+        if kwargs.get('query') or kwargs.get('q'):
+            return True
+        return None
+
+    def evaluationManager(self, *args, **kwargs):
+        if kwargs.get('query') or kwargs.get('q'):
+            return ['off']
+        return None
+
+    def ogs(self, *args, **kwargs):
+        if kwargs.get('query') or kwargs.get('q'):
+            return False
+        return None
+
+
+# ----------------------------------------------------------------------
+# pure python 4x4 matrix math, row-major with row vectors like maya
+# ----------------------------------------------------------------------
+
+def _mult(a, b):
+    result = list()
+    for r in range(0, 16, 4):
+        a0, a1, a2, a3 = a[r:r+4]
+        for c in range(4):
+            result.append(a0*b[c] + a1*b[4+c] + a2*b[8+c] + a3*b[12+c])
+    return result
+
+
+def _inverse(m):
+    size = 4
+    aug = [list(m[r*4:r*4+4]) + [1.0 if r == c else 0.0 for c in range(size)]
+           for r in range(size)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(aug[r][col]))
+        if abs(aug[pivot][col]) < 1e-12:
+            raise ValueError('matrix is singular')
+        aug[col], aug[pivot] = aug[pivot], aug[col]
+        factor = aug[col][col]
+        aug[col] = [v / factor for v in aug[col]]
+        for row in range(size):
+            if row != col and aug[row][col]:
+                scale = aug[row][col]
+                aug[row] = [a - scale * b for a, b in zip(aug[row], aug[col])]
+    return [aug[r][size + c] for r in range(size) for c in range(size)]
+
+
+def _rotation(euler):
+    x, y, z = [math.radians(v) for v in euler]
+    rx = [1, 0, 0, 0,
+          0, math.cos(x), math.sin(x), 0,
+          0, -math.sin(x), math.cos(x), 0,
+          0, 0, 0, 1]
+    ry = [math.cos(y), 0, -math.sin(y), 0,
+          0, 1, 0, 0,
+          math.sin(y), 0, math.cos(y), 0,
+          0, 0, 0, 1]
+    rz = [math.cos(z), math.sin(z), 0, 0,
+          -math.sin(z), math.cos(z), 0, 0,
+          0, 0, 1, 0,
+          0, 0, 0, 1]
+    return _mult(_mult(rx, ry), rz)
+
+
+def _compose(t, r, s, jo=None):
+    scale = [s[0], 0, 0, 0, 0, s[1], 0, 0, 0, 0, s[2], 0, 0, 0, 0, 1]
+    matrix = _mult(scale, _rotation(r))
+    if jo is not None:
+        matrix = _mult(matrix, _rotation(jo))
+    matrix[12:15] = [float(v) for v in t]
+    return matrix
+
+
+def _decompose(m):
+    rows = [m[0:3], m[4:7], m[8:11]]
+    scale = [_length(row) or 1.0 for row in rows]
+    rotation = list(IDENTITY)
+    for r in range(3):
+        for c in range(3):
+            rotation[r*4+c] = rows[r][c] / scale[r]
+    return list(m[12:15]), _euler(rotation), scale
+
+
+def _rotation_of(m):
+    return _compose([0, 0, 0], _decompose(m)[1], [1, 1, 1])
+
+
+def _euler(m):
+    # inverse of _rotation for the xyz rotate order
+    sy = max(-1.0, min(1.0, -m[2]))
+    y = math.asin(sy)
+    if abs(m[2]) < 0.999999:
+        x = math.atan2(m[6], m[10])
+        z = math.atan2(m[1], m[0])
+    else:
+        x = math.atan2(-m[9], m[5])
+        z = 0.0
+    return [math.degrees(x), math.degrees(y), math.degrees(z)]
+
+
+def _frame(aim, up, order='xyz'):
+    # rotation matrix whose primary axis follows aim, secondary follows up
+    primary = _normalize(aim)
+    secondary = _normalize(up)
+    if abs(_dot(primary, secondary)) > 0.9999:
+        secondary = [0.0, 0.0, 1.0] if abs(primary[2]) < 0.9 \
+            else [1.0, 0.0, 0.0]
+    third = _normalize(_cross(primary, secondary))
+    secondary = _cross(third, primary)
+
+    axes = dict()
+    axes[order[0]] = primary
+    axes[order[1]] = secondary
+    axes[order[2]] = third
+    if _dot(_cross(axes['x'], axes['y']), axes['z']) < 0:
+        axes[order[2]] = [-v for v in third]
+
+    matrix = list(IDENTITY)
+    for row, axis in enumerate('xyz'):
+        matrix[row*4:row*4+3] = axes[axis]
+    return matrix
+
+
+def _plane(normal):
+    # two axes spanning the plane perpendicular to normal
+    normal = _normalize(normal)
+    helper = [1.0, 0.0, 0.0] if abs(normal[0]) < 0.9 else [0.0, 1.0, 0.0]
+    u_axis = _normalize(_cross(normal, helper))
+    v_axis = _cross(normal, u_axis)
+    return u_axis, v_axis
+
+
+def _transform_point(point, m):
+    return [sum(point[k] * m[k*4+c] for k in range(4)) for c in range(3)]
+
+
+def _open_knots(count, degree):
+    spans = count - degree
+    return [0.0] * degree + [float(i) for i in range(1, spans)] + \
+        [float(spans)] * degree
+
+
+def _polyline_length(points):
+    return sum(_length(_sub(b, a)) for a, b in zip(points, points[1:]))
+
+
+def _add(a, b):
+    return [x + y for x, y in zip(a, b)]
+
+
+def _sub(a, b):
+    return [x - y for x, y in zip(a, b)]
+
+
+def _dot(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def _cross(a, b):
+    return [a[1]*b[2] - a[2]*b[1],
+            a[2]*b[0] - a[0]*b[2],
+            a[0]*b[1] - a[1]*b[0]]
+
+
+def _length(a):
+    return math.sqrt(_dot(a, a))
+
+
+def _normalize(a):
+    length = _length(a)
+    if not length:
+        return [0.0, 0.0, 0.0]
+    return [v / length for v in a]
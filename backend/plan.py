@@ -0,0 +1,590 @@
+"""
+Recorded build applied through one DAG modifier, rolled back in one step
+
+A build runs against a Recorder: an in-memory scene seeded from the live
+guide hierarchy, so every query is answered locally without a round trip
+into Maya. The scene it leaves is the plan. Applying it queues the new
+nodes on one MDagModifier with createNode and renameNode, reparents the
+live nodes the build moved, adds the dynamic attributes, then sets the
+values and makes the connections through newPlugValue and connect, maya's
+own wiring filled in the way the maya ascii writer does. Live nodes the
+build deleted go last. Nothing runs through the MEL interpreter, and a
+failed or unwanted build is rolled back with one undoIt().
+
+    from autoRigger.backend import plan
+
+    rig.build_guide()
+    # ... place the guides ...
+    modifier = plan.build_rig(rig)
+    modifier.undoIt()
+"""
+
+import copy
+import re
+
+from . import mayaascii, memory
+from .. import backend, util
+from ..solver import curve as solver_curve
+
+try:
+    from maya.api import OpenMaya
+except ImportError:
+    # headless backends keep their knots in the shape attributes
+    OpenMaya = None
+
+
+CV_PATTERN = re.compile(r'^cv\[(\d+)(?::(\d+))?\]$')
+
+# nodes maya shares between every rig of a scene
+SHARED = {'ikRPsolver', 'ikSCsolver', 'ikSplineSolver'}
+
+
+class Seed(object):
+    """
+    A live node as it was when mirrored
+    """
+
+    def __init__(self, node):
+        """
+        Initialization
+
+        :param node: memory.Node. mirrored node
+        """
+        self.node = node
+        self.name = node.name
+        self.parent = node.parent
+        self.attrs = copy.deepcopy(node.attrs)
+        self.added = set(node.added)
+        self.locked = set(node.locked)
+
+
+class Plan(object):
+    """
+    A recorded build: the scene it left and the live nodes it started from
+    """
+
+    def __init__(self, scene):
+        """
+        Initialization
+
+        :param scene: Recorder. scene the build ran against
+        """
+        self.scene = scene
+
+    def apply(self):
+        """
+        Queue the build on one DAG modifier and execute it, undoing the
+        partial result if any step fails
+
+        :return: MDagModifier. the executed modifier, undoIt() rolls back
+        """
+        modifier = OpenMaya.MDagModifier()
+        try:
+            Applier(self.scene, modifier).apply()
+        except Exception:
+            modifier.undoIt()
+            raise
+        return modifier
+
+
+class Applier(mayaascii.Writer):
+    """
+    Writer queuing a recorded scene on a DAG modifier instead of writing
+    it out
+
+    Nodes get created, renamed and reparented and their attributes added
+    as the writer walks the scene; plugs only exist once the modifier ran
+    those, so values, connections and locks wait for a first doIt().
+    """
+
+    def __init__(self, scene, modifier):
+        """
+        Initialization
+
+        :param scene: Recorder. scene the build ran against
+        :param modifier: MDagModifier. modifier the build gets queued on
+        """
+        super(Applier, self).__init__(scene)
+        self.modifier = modifier
+        # node name -> MObject, live or queued for creation
+        self.objects = dict()
+        # id(memory.Node) -> MObject of the mirrored live nodes
+        self.live = dict()
+        self.current = None
+        self.edits = list()
+        self.locks = list()
+
+    def apply(self):
+        """
+        Queue and execute the whole build, in three doIt() calls each
+        running what was queued since the previous one
+        """
+        for seed in self.scene.seeds.values():
+            self.live[id(seed.node)] = _object(seed.name)
+            if self._alive(seed.node):
+                self.objects[seed.node.name] = self.live[id(seed.node)]
+
+        self.add_scene()
+        self.modifier.doIt()
+
+        for function, args in self.edits:
+            function(*args)
+        self.modifier.doIt()
+        for plug in self.locks:
+            _plug(plug).isLocked = True
+
+        self.delete()
+        self.modifier.doIt()
+
+    # ------------------------------------------------------------------
+    # nodes
+    # ------------------------------------------------------------------
+
+    def add_node(self, node):
+        """
+        Override: mirrored nodes only get what the build changed
+        """
+        seed = self.scene.seeds.get(id(node))
+        if seed is None:
+            return super(Applier, self).add_node(node)
+
+        self.current = node.name
+        obj = self.objects[node.name]
+        if node.name != seed.name:
+            self.modifier.renameNode(obj, node.name)
+        if node.parent is not seed.parent:
+            parent = OpenMaya.MObject.kNullObj if node.parent is None \
+                else self.objects[node.parent.name]
+            self.modifier.reparentNode(obj, parent)
+
+        for attr, flags in node.added.items():
+            if attr not in seed.added:
+                self.add_attr(attr, flags)
+        for attr in sorted(node.attrs):
+            if attr in mayaascii.INTERNAL:
+                continue
+            if not mayaascii._same(node.attrs[attr], seed.attrs.get(attr)):
+                self.set_attr(attr, node.attrs[attr])
+        if node.type == 'nurbsCurve' and any(
+                node.attrs[key] != seed.attrs.get(key)
+                for key in ('cvs', 'knots', 'degree', 'form')):
+            self.set_curve(node)
+        for attr in sorted(node.locked - seed.locked):
+            self.lock(attr)
+
+    def add_wiring(self, node):
+        """
+        Override: mirrored nodes are wired already, unless reparented
+        """
+        seed = self.scene.seeds.get(id(node))
+        if seed is None or node.parent is not seed.parent:
+            super(Applier, self).add_wiring(node)
+
+    def create(self, ntype, name, parent=None):
+        """
+        Override: queue the node on the modifier, the shared ones already
+        in the scene are used as they are
+        """
+        self.current = name
+        if name in SHARED and _exists(name):
+            return
+
+        node = self.scene.nodes.get(name)
+        if parent is not None or (node is not None and node.is_dag):
+            obj = self.modifier.createNode(
+                ntype, OpenMaya.MObject.kNullObj if parent is None
+                else self.objects[parent])
+        else:
+            obj = OpenMaya.MDGModifier.createNode(self.modifier, ntype)
+        self.modifier.renameNode(obj, name)
+        self.objects[name] = obj
+
+    def select(self, name):
+        """
+        Override
+        """
+        self.current = name
+
+    def delete(self):
+        """
+        Queue deleting the live nodes the build deleted, the top most
+        ones, their descendants go along
+        """
+        for seed in self.scene.seeds.values():
+            if self._alive(seed.node):
+                continue
+            if seed.parent is not None and not self._alive(seed.parent):
+                continue
+            self.modifier.deleteNode(self.live[id(seed.node)])
+
+    def _alive(self, node):
+        return self.scene.nodes.get(node.name) is node
+
+    # ------------------------------------------------------------------
+    # attributes
+    # ------------------------------------------------------------------
+
+    def add_attr(self, attr, flags):
+        """
+        Override
+        """
+        self.modifier.addAttribute(
+            self.objects[self.current], _attribute(attr, flags))
+
+    def set_attr(self, attr, value):
+        """
+        Override
+        """
+        if isinstance(value, (list, tuple)) and value and \
+                isinstance(value[0], str):
+            return
+        self.edits.append((self._set, (self._path(attr), value)))
+
+    def set_curve(self, shape):
+        """
+        Override
+        """
+        data = dict((key, copy.deepcopy(shape.attrs[key]))
+                    for key in ('cvs', 'knots', 'degree', 'form'))
+        self.edits.append((self._set_data, (self._path('cc'),
+                                            _curve_data, data)))
+
+    def set_components(self, attr, components):
+        """
+        Override
+        """
+        self.edits.append((self._set_data, (self._path(attr),
+                                            _component_data, components)))
+
+    def set_keys(self, curve):
+        """
+        Override
+        """
+        for index, (key, value) in enumerate(curve.attrs.get('keys', list())):
+            self.set_attr('ktv[{}].kt'.format(index), key)
+            self.set_attr('ktv[{}].kv'.format(index), value)
+
+    def lock(self, attr):
+        """
+        Override
+        """
+        self.locks.append(self._path(attr))
+
+    def _path(self, attr):
+        return '{}.{}'.format(self.current, attr)
+
+    def _set(self, path, value):
+        _queue(self.modifier, _plug(path), value)
+
+    def _set_data(self, path, create, value):
+        self.modifier.newPlugValue(_plug(path), create(value))
+
+    # ------------------------------------------------------------------
+    # connections
+    # ------------------------------------------------------------------
+
+    def connect(self, src, src_attr, dst, dst_attr, append=False):
+        """
+        Override
+        """
+        self.edits.append((self._connect, (
+            '{}.{}'.format(mayaascii._name(src), src_attr),
+            '{}.{}'.format(mayaascii._name(dst), dst_attr), append)))
+
+    def _connect(self, source, destination, append):
+        src = _plug(source)
+        if src.isArray:
+            src = src.elementByLogicalIndex(0)
+        dst = _plug(destination)
+        if append:
+            indices = dst.getExistingArrayAttributeIndices()
+            for index in indices:
+                if src in dst.elementByLogicalIndex(index).connectedTo(
+                        True, False):
+                    return
+            dst = dst.elementByLogicalIndex(max(indices) + 1 if indices
+                                            else 0)
+        elif dst.isArray:
+            dst = dst.elementByLogicalIndex(0)
+        self.modifier.connect(src, dst)
+
+
+class Recorder(memory.Scene):
+    """
+    In-memory scene seeded from live nodes, recording where a build
+    leaves them
+    """
+
+    def __init__(self):
+        """
+        Extend: add the names reserved by the live scene and the seeds of
+        the mirrored nodes
+        """
+        super(Recorder, self).__init__()
+        self.reserved = set()
+        # id(memory.Node) -> Seed
+        self.seeds = dict()
+
+    def _taken(self, name):
+        """
+        Override: names used in the live scene are taken too, even the
+        ones of mirrored nodes the build deletes, which only go once the
+        new nodes exist
+        """
+        return name in self.nodes or name in self.reserved
+
+    def mirror(self, source, roots):
+        """
+        Seed the scene with live nodes so queries get answered locally
+
+        :param source: module. command backend of the live scene
+        :param roots: list. root nodes copied along with their descendants
+        """
+        roots = [root for root in roots if source.objExists(root)]
+        queue = list(roots)
+        while queue:
+            name = queue.pop(0)
+            node = self._mirror_node(source, name)
+            self.seeds[id(node)] = Seed(node)
+            queue.extend(source.listRelatives(name, c=1) or list())
+
+        self.reserved = set(source.ls())
+
+    def _mirror_node(self, source, name):
+        node = memory.Node(name, source.nodeType(name))
+        self.nodes[name] = node
+        parent = source.listRelatives(name, p=1)
+        if parent and parent[0] in self.nodes:
+            self._set_parent(node, self.nodes[parent[0]])
+
+        if node.is_transform:
+            for attr in ('translate', 'rotate', 'scale', 'rotatePivot',
+                         'scalePivot'):
+                node.attrs[attr] = list(source.getAttr(
+                    '{}.{}'.format(name, attr))[0])
+            if node.type == 'joint':
+                node.attrs['jointOrient'] = list(source.getAttr(
+                    name + '.jointOrient')[0])
+        elif node.type == 'nurbsCurve':
+            cvs = [list(p) for p in source.getAttr(name + '.cv[*]')]
+            degree = source.getAttr(name + '.degree')
+            form = source.getAttr(name + '.form')
+            node.attrs['cvs'] = cvs
+            node.attrs['degree'] = degree
+            node.attrs['form'] = 'periodic' \
+                if form == solver_curve.PERIODIC else 'open'
+            node.attrs['knots'] = _knots(source, name, len(cvs), degree, form)
+        return node
+
+
+def record(func, roots=None):
+    """
+    Run a build callable against a recorder mirrored from the live scene
+
+    :param func: function. build routine issuing cmds calls
+    :param roots: list. live nodes to mirror, defaults to outliner groups
+    :return: Plan. the recorded plan
+    """
+    if roots is None:
+        roots = [util.G_LOC_GRP, util.G_JNT_GRP, util.G_CTRL_GRP,
+                 util.G_MESH_GRP]
+
+    recorder = Recorder()
+    recorder.mirror(backend.current(), roots)
+    with backend.using(recorder):
+        func()
+    return Plan(recorder)
+
+
+def build_guide(bone):
+    """
+    Build the guide of a rig object through a single modifier
+
+    :param bone: bone.Bone. rig object
+    :return: MDagModifier. the executed modifier
+    """
+    roots = [util.G_LOC_GRP]
+    if getattr(bone, 'curve', None):
+        roots.append(bone.curve)
+    return record(bone.build_guide, roots).apply()
+
+
+def build_rig(bone):
+    """
+    Build the rig of a rig object through a single modifier
+
+    :param bone: bone.Bone. rig object with its guide in the scene
+    :return: MDagModifier. the executed modifier
+    """
+    return record(bone.build_rig).apply()
+
+
+def _knots(source, shape, count, degree, form):
+    """
+    Knot vector of a live curve shape, uniform if it can't be read
+
+    :param source: module. command backend of the live scene
+    :param shape: str. nurbsCurve shape
+    :param count: int. number of control points
+    :param degree: int. curve degree
+    :param form: int. maya form attribute value
+    :return: list. knot vector of count + degree - 1 knots
+    """
+    if isinstance(source, memory.Scene):
+        return list(source._node(shape).attrs['knots'])
+    if OpenMaya:
+        selection = OpenMaya.MSelectionList()
+        selection.add(shape)
+        return list(OpenMaya.MFnNurbsCurve(selection.getDagPath(0)).knots())
+    return solver_curve.uniform_knots(
+        count, degree, form == solver_curve.PERIODIC)
+
+
+def _exists(name):
+    selection = OpenMaya.MSelectionList()
+    try:
+        selection.add(name)
+    except RuntimeError:
+        return False
+    return True
+
+
+def _object(name):
+    selection = OpenMaya.MSelectionList()
+    selection.add(name)
+    return selection.getDependNode(0)
+
+
+def _plug(path):
+    selection = OpenMaya.MSelectionList()
+    selection.add(path)
+    return selection.getPlug(0)
+
+
+def _attribute(attr, flags):
+    """
+    Dynamic attribute described by addAttr flags
+
+    :param attr: str. long attribute name
+    :param flags: dict. addAttr flags
+    :return: MObject. the attribute
+    """
+    def flag(*names):
+        return next((flags[n] for n in names if n in flags), None)
+
+    short = flag('shortName', 'sn') or attr
+    kind = flag('attributeType', 'at') or 'double'
+    if flag('dataType', 'dt'):
+        fn = OpenMaya.MFnTypedAttribute()
+        obj = fn.create(attr, short, OpenMaya.MFnData.kString)
+    elif kind == 'enum':
+        fn = OpenMaya.MFnEnumAttribute()
+        obj = fn.create(attr, short)
+        for index, field in enumerate(flag('enumName', 'en').split(':')):
+            fn.addField(field, index)
+    elif kind == 'message':
+        fn = OpenMaya.MFnMessageAttribute()
+        obj = fn.create(attr, short)
+    else:
+        numeric = {
+            'bool': OpenMaya.MFnNumericData.kBoolean,
+            'long': OpenMaya.MFnNumericData.kInt,
+            'short': OpenMaya.MFnNumericData.kShort,
+            'float': OpenMaya.MFnNumericData.kFloat,
+        }.get(kind, OpenMaya.MFnNumericData.kDouble)
+        fn = OpenMaya.MFnNumericAttribute()
+        obj = fn.create(attr, short, numeric, flag('defaultValue', 'dv') or 0)
+        if flag('minValue', 'min') is not None:
+            fn.setMin(flag('minValue', 'min'))
+        if flag('maxValue', 'max') is not None:
+            fn.setMax(flag('maxValue', 'max'))
+    fn.keyable = bool(flag('keyable', 'k'))
+    return obj
+
+
+def _queue(modifier, plug, value):
+    """
+    Queue setting a plug to a memory attribute value, in the ui units the
+    memory scene keeps them in
+
+    :param modifier: MDGModifier. modifier to queue on
+    :param plug: MPlug. plug to set
+    :param value: object. memory attribute value
+    """
+    if isinstance(value, (list, tuple)):
+        if len(value) == 16:
+            modifier.newPlugValue(plug, OpenMaya.MFnMatrixData().create(
+                OpenMaya.MMatrix(value)))
+            return
+        for index, item in enumerate(value):
+            _queue(modifier, plug.child(index) if plug.isCompound
+                   else plug.elementByLogicalIndex(index), item)
+        return
+    if isinstance(value, str):
+        modifier.newPlugValueString(plug, value)
+        return
+
+    attribute = plug.attribute()
+    if attribute.hasFn(OpenMaya.MFn.kUnitAttribute):
+        unit = OpenMaya.MFnUnitAttribute(attribute).unitType()
+        if unit == OpenMaya.MFnUnitAttribute.kAngle:
+            modifier.newPlugValueMAngle(plug, OpenMaya.MAngle(
+                value, OpenMaya.MAngle.kDegrees))
+        elif unit == OpenMaya.MFnUnitAttribute.kTime:
+            modifier.newPlugValueMTime(plug, OpenMaya.MTime(
+                value, OpenMaya.MTime.uiUnit()))
+        else:
+            modifier.newPlugValueMDistance(plug, OpenMaya.MDistance(
+                value, OpenMaya.MDistance.uiUnit()))
+    elif attribute.hasFn(OpenMaya.MFn.kNumericAttribute):
+        numeric = OpenMaya.MFnNumericAttribute(attribute).numericType()
+        if numeric == OpenMaya.MFnNumericData.kBoolean:
+            modifier.newPlugValueBool(plug, bool(value))
+        elif numeric in (OpenMaya.MFnNumericData.kFloat,
+                         OpenMaya.MFnNumericData.kDouble):
+            modifier.newPlugValueDouble(plug, float(value))
+        else:
+            modifier.newPlugValueInt(plug, int(value))
+    elif attribute.hasFn(OpenMaya.MFn.kEnumAttribute):
+        modifier.newPlugValueInt(plug, int(value))
+    else:
+        modifier.newPlugValueDouble(plug, float(value))
+
+
+def _curve_data(attrs):
+    """
+    :param attrs: dict. cvs, knots, degree and form of a memory curve
+    :return: MObject. nurbsCurve data
+    """
+    forms = {
+        'open': OpenMaya.MFnNurbsCurve.kOpen,
+        'closed': OpenMaya.MFnNurbsCurve.kClosed,
+        'periodic': OpenMaya.MFnNurbsCurve.kPeriodic,
+    }
+    data = OpenMaya.MFnNurbsCurveData().create()
+    OpenMaya.MFnNurbsCurve().create(
+        OpenMaya.MPointArray([OpenMaya.MPoint(cv) for cv in attrs['cvs']]),
+        OpenMaya.MDoubleArray(attrs['knots']), attrs['degree'],
+        forms[attrs['form']], False, False, data)
+    return data
+
+
+def _component_data(components):
+    """
+    :param components: list. curve cv components, like cv[0] or cv[0:2]
+    :return: MObject. componentList data
+    """
+    indexed = OpenMaya.MFnSingleIndexedComponent()
+    component = indexed.create(OpenMaya.MFn.kCurveCVComponent)
+    for item in components:
+        match = CV_PATTERN.match(item)
+        if not match:
+            raise memory.Unsupported('cluster components: {}'.format(item))
+        first = int(match.group(1))
+        last = int(match.group(2) or first)
+        indexed.addElements(list(range(first, last + 1)))
+
+    fn = OpenMaya.MFnComponentListData()
+    data = fn.create()
+    fn.add(component)
+    return data
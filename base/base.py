@@ -4,7 +4,7 @@ import maya.cmds as cmds
 from Qt import QtWidgets, QtGui, _loadUi
 
 from .. import util, shape
-from ..base import bone
+from ..base import bone, layout
 from ..constant import Side, UI_DIR
 from ..utility.rigging import transform
 
@@ -56,15 +56,13 @@ class Base(bone.Bone):
         """
         Override: use a circle as controller
         """
-        self._shape = shape.make_circle(self._scale)
+        self._shape = shape.circle(self._scale)
 
-    def create_locator(self):
+    def layout(self):
         """
-        Override: create a single locator
+        Override: a single locator
         """
-        cmds.spaceLocator(n=self.locs[0])
-        util.uniform_scale(self.locs[0], self._scale)
-        cmds.parent(self.locs[0], util.G_LOC_GRP)
+        return layout.Layout().add(self.locs[0], scale=self._scale)
 
     def create_joint(self):
         """
@@ -82,10 +80,8 @@ class Base(bone.Bone):
         """
         Override: create a controller parented by an offset group
         """
-        cmds.duplicate(self._shape, n=self.ctrls[0])
-        cmds.group(em=1, n=self.offsets[0])
-
-        transform.clear_xform(self.ctrls[0], self.offsets[0], self.jnts[0])
+        self._shape.create(self.ctrls[0])
+        self.create_offset(0, self.jnts[0])
         cmds.parent(self.offsets[0], util.G_CTRL_GRP)
 
     def add_constraint(self):
@@ -4,14 +4,15 @@ from functools import wraps
 import maya.cmds as cmds
 from Qt import QtWidgets, QtGui
 
+from . import guide, layout, lod, offset, preset, registry, session
 from .. import util
-from ..constant import Side, ICON_DIR
+from ..constant import Side, Offset, ICON_DIR
 from ..utility.useful import strGenerator
 from ..utility.datatype import color
 from ..utility.rigging import transform
 
 
-TMP_PREFIX = 'tmp_'
+TMP_PREFIX = registry.TMP_PREFIX
 Yellow = color.ColorRGB.yellow()
 Blue = color.ColorRGB.blue()
 Red = color.ColorRGB.red()
@@ -62,6 +63,13 @@ class RigItem(QtWidgets.QListWidgetItem):
         # rig component object
         self._obj = None
 
+    @property
+    def obj(self):
+        """
+        The rig component object built by the item
+        """
+        return self._obj
+
     def init_base(self):
         """
         Initializing the base_widget attribute which is a QWidget object
@@ -133,6 +141,9 @@ class Bone(object):
         # components and controller shape
         self._comps = list()
         self._shape = None
+        self._guide = None
+        self._digests = dict()
+        self.registry = registry.Registry()
 
         # naming related instance vars
         self.base = None
@@ -140,6 +151,7 @@ class Bone(object):
         self.jnts = list()
         self.ctrls = list()
         self.offsets = list()
+        self.offset_mode = Offset.GROUP
 
     @property
     def name(self):
@@ -161,6 +173,155 @@ class Bone(object):
     def components(self):
         return self._comps
 
+    @property
+    def guide(self):
+        """
+        Guide snapshot shared by the component tree, captured on first use
+        """
+        if self._guide is None:
+            self.snapshot_guide()
+        return self._guide
+
+    def sub_components(self):
+        """
+        Get the direct sub-components, including the ones driven explicitly
+        by the rig object rather than through its components list
+
+        :return: list. rig objects
+        """
+        return [c for c in self._comps if c]
+
+    def walk(self):
+        """
+        Iterate over the rig object and all of its nested sub-components
+        """
+        yield self
+        for comp in self.sub_components():
+            for sub in comp.walk():
+                yield sub
+
+    def set_offset_mode(self, mode):
+        """
+        Set how the component tree offsets its controllers, before building
+        the rig
+
+        :param mode: Offset enum. an offset group per controller, or the
+                     controller's own offsetParentMatrix
+        """
+        for comp in self.walk():
+            comp.offset_mode = mode
+
+    def create_offset(self, index, target):
+        """
+        Create the offset of a controller and place it on a target; in
+        matrix mode the controller itself takes the offset's place, and
+        self.offsets keeps naming whatever stands for the offset
+
+        :param index: int. controller index
+        :param target: str. transform to place the controller on
+        :return: str. the offset, or the controller in matrix mode
+        """
+        ctrl = self.ctrls[index]
+        if self.offset_mode == Offset.MATRIX:
+            offset.place(ctrl, target)
+            self.offsets[index] = ctrl
+            return ctrl
+
+        cmds.group(em=1, n=self.offsets[index])
+        transform.clear_xform(ctrl, self.offsets[index], target)
+        return self.offsets[index]
+
+    def offset_parent(self, index, parent):
+        """
+        Transform to link children under the offset of a controller: the
+        offset group, or in matrix mode where the controller stands in for
+        it, the parent the offset is linked under, so the children keep
+        following what the group would have followed
+
+        :param index: int. controller index
+        :param parent: str. transform the offset is linked under
+        :return: str. the offset group, or its parent in matrix mode
+        """
+        if self.offset_mode == Offset.MATRIX:
+            return parent
+        return self.offsets[index]
+
+    def follow_offset(self, driver, index=0):
+        """
+        Make the offset of a controller follow a driver, keeping its offset
+
+        :param driver: str. transform to follow
+        :param index: int. controller index
+        """
+        if self.offset_mode == Offset.MATRIX:
+            offset.follow(driver, self.ctrls[index])
+        else:
+            cmds.parentConstraint(driver, self.offsets[index], mo=1)
+
+    def bake_offsets(self):
+        """
+        Move the local transform of the controllers standing in for their
+        offset into their offsetParentMatrix, once the hierarchy is final
+        """
+        for comp in self.walk():
+            if comp.offset_mode != Offset.MATRIX:
+                continue
+            ctrls = set(comp.ctrls)
+            for name in comp.offsets:
+                if name in ctrls:
+                    offset.bake(name)
+
+    def lod_nodes(self):
+        """
+        Nodes of the secondary systems, blocked at the low level of detail
+
+        :return: list. node names, none by default
+        """
+        return list()
+
+    def secondary_nodes(self, prefixes):
+        """
+        Nodes the build recorded under the given names, except the ones
+        keeping the controllers of the component tree in place
+
+        :param prefixes: list. names the nodes start with
+        :return: list. node names
+        """
+        handles = [name for comp in self.walk()
+                   for name in comp.ctrls + comp.offsets]
+        return lod.secondary(self.registry, prefixes, handles)
+
+    def add_lod(self, ctrl, comps, rebuilt=None):
+        """
+        Expose a lod attribute on a controller, blocking the secondary
+        systems of components at its low level; when a rebuild kept the
+        controller, only the systems of the rebuilt components connect again
+
+        :param ctrl: str. root controller
+        :param comps: list. rig objects with secondary systems
+        :param rebuilt: list. sub-components built again, all by default
+        :return: str. the lod attribute
+        """
+        if rebuilt is not None and lod.exists(ctrl):
+            fresh = set(sub for comp in rebuilt for sub in comp.walk())
+            comps = [comp for comp in comps if comp in fresh]
+        nodes = [node for comp in comps if comp for node in comp.lod_nodes()]
+        return lod.add(ctrl, nodes)
+
+    def snapshot_guide(self):
+        """
+        Read the world matrix of every guide locator in the component tree
+        in one pass, and share the snapshot with all components
+
+        :return: guide.Snapshot. the captured snapshot
+        """
+        comps = list(self.walk())
+        snapshot = guide.Snapshot.capture(
+            [loc for comp in comps for loc in comp.locs])
+        for comp in comps:
+            comp._guide = snapshot
+        return snapshot
+
     @update_base_name
     def create_namespace(self):
         """
@@ -177,19 +338,31 @@ class Bone(object):
 
     def set_shape(self):
         """
-        Set up controller shape with nurbs curve
+        Set up controller shapes from the shape library
         """
         if self._comps:
             for c in self._comps:
                 c.set_shape()
 
+    def layout(self):
+        """
+        Guide layout of the component tree, the layouts of the components
+        one after the other unless overridden
+
+        :return: layout.Layout. the guide layout
+        """
+        result = layout.Layout()
+        for c in self._comps:
+            if c:
+                result.extend(c.layout())
+        return result
+
     def create_locator(self):
         """
-        Create the rig guides using locators for placement purpose
+        Create the rig guides using locators for placement purpose, each
+        one once at its final transform, following the layout
         """
-        if self._comps:
-            for c in self._comps:
-                c.create_locator()
+        self.layout().build()
 
     def color_locator(self):
         """
@@ -233,6 +406,7 @@ class Bone(object):
         if self._comps:
             for c in self._comps:
                 c.create_joint()
+        self.link(self.joint_links())
 
     def place_controller(self):
         """
@@ -284,6 +458,92 @@ class Bone(object):
         if self._comps:
             for c in self._comps:
                 c.add_constraint()
+        self.connect_components(self.sub_components())
+
+    def joint_links(self):
+        """
+        Joints of the components parented to joints of other components
+
+        :return: list. (child, parent) pairs, none by default
+        """
+        return list()
+
+    def controller_links(self):
+        """
+        Controller offsets of the components parented to controllers or
+        offsets of other components
+
+        :return: list. (child, parent) pairs, none by default
+        """
+        return list()
+
+    def link(self, links):
+        """
+        Parent the children of links to their parent, leaving the ones
+        already in place
+
+        :param links: list. (child, parent) pairs
+        """
+        for child, parent in links:
+            if (cmds.listRelatives(child, p=1) or [None])[0] != parent:
+                cmds.parent(child, parent)
+
+    def connect_components(self, comps):
+        """
+        Connect the components to each other once they are built, on a
+        rebuild only the rebuilt ones are given
+
+        :param comps: list. built rig objects
+        """
+        self.link(self.controller_links())
+
+    def dependents(self, comp):
+        """
+        Components connected to a component by more than parent links,
+        rebuilt along with it
+
+        :param comp: bone.Bone. sub-component
+        :return: list. rig objects, all of them unless the rig object
+                 connects its components in connect_components only
+        """
+        return self.sub_components()
+
+    def digests(self):
+        """
+        Hash the guides and parameters of every sub-component, or of the
+        rig object itself when it has none
+
+        :return: dict. digests by component base name
+        """
+        return dict((comp.base, preset.digest(comp, self.guide))
+                    for comp in self.sub_components() or [self])
+
+    def teardown(self, comps):
+        """
+        Delete the nodes the build recorded for some sub-components, except
+        their guides the rebuild reads again, the children other components
+        linked under them go back to the joint and controller groups
+
+        :param comps: list. sub-components
+        :return: list. deleted node names
+        """
+        owned = set(name for comp in comps for sub in comp.walk()
+                    for name in sub.jnts + sub.ctrls + sub.offsets)
+        for links, group in ((self.joint_links(), util.G_JNT_GRP),
+                             (self.controller_links(), util.G_CTRL_GRP)):
+            for child, parent in links:
+                if parent in owned and child not in owned:
+                    cmds.parent(child, group)
+
+        prefixes = tuple(sub.base for comp in comps for sub in comp.walk())
+        names = [name for name in self.registry.nodes()
+                 if name.startswith(prefixes)
+                 and self.registry.role(name) != registry.LOC]
+        existing = cmds.ls(names) if names else list()
+        if existing:
+            cmds.delete(existing)
+        self.registry.prune()
+        return existing
 
     def delete_guide(self):
         """
@@ -298,12 +558,56 @@ class Bone(object):
         except ValueError:
             pass
 
-    @staticmethod
-    def delete_shape():
+    def delete_shape(self):
+        """
+        Delete the temp nodes recorded during the build to de-clutter
+        the scene
+        """
+        self.registry.delete(registry.TEMP)
+
+    def node_roles(self):
+        """
+        Get the registry role of every node named by the component tree
+
+        :return: dict. node name to registry role
+        """
+        roles = dict()
+        for comp in self.walk():
+            for role, names in (
+                    (registry.LOC, comp.locs),
+                    (registry.JNT, comp.jnts),
+                    (registry.CTRL, comp.ctrls),
+                    (registry.OFFSET, comp.offsets)):
+                for name in names:
+                    roles.setdefault(name, role)
+        return roles
+
+    def recording(self):
+        """
+        Share the registry with the component tree and record the nodes
+        created by the enclosed commands
+        """
+        for comp in self.walk():
+            comp.registry = self.registry
+        return self.registry.recording(self.node_roles)
+
+    def session(self, phase):
+        """
+        Open a build session for a phase of the rig object, no-op when
+        already building inside one
+
+        :param phase: str. build phase, like guide or rig
+        :return: session.Session. the session context manager
         """
-        Delete controller temp shape to de-clutter the scene
+        return session.Session('{} {}'.format(type(self).__name__, phase))
+
+    def rollback(self):
+        """
+        Delete every node recorded while building the rig object
+
+        :return: list. deleted node names
         """
-        cmds.delete(cmds.ls('{}*'.format(TMP_PREFIX)))
+        return self.registry.delete()
 
     def lock_controller(self):
         """
@@ -315,19 +619,108 @@ class Bone(object):
         """
         Create the entire rig guide setup
         """
-        self.create_namespace()
-        self.create_locator()
-        self.color_locator()
+        with self.session('guide'), self.recording():
+            self.create_namespace()
+            self.create_locator()
+            self.color_locator()
+
+    def save_guide(self, path):
+        """
+        Save the guide setup as a preset
+
+        :param path: str. file path
+        :return: guide.Snapshot. the saved guides
+        """
+        return preset.save(self, path)
+
+    def load_guide(self, path):
+        """
+        Restore the guide setup from a preset, in place of build_guide,
+        or onto the guides already in the scene
+
+        :param path: str. file written by save_guide
+        """
+        header, snapshot = preset.read(path)
+        with self.session('guide'), self.recording():
+            if not self.locs:
+                self.create_namespace()
+            preset.check(self, header)
+            preset.restore(self, snapshot)
+            self.color_locator()
+
+    def restore_guide(self):
+        """
+        Create the guides again where the last build found them, for
+        editing before rebuild_rig
+        """
+        with self.session('guide'), self.recording():
+            preset.restore(self, self.guide)
+            self.color_locator()
 
     def build_rig(self):
         """
         Build the full rig system based on the guide
         """
-        self.create_joint()
-        self.set_shape()
-        self.place_controller()
-        self.delete_guide()
-        self.delete_shape()
-        self.color_controller()
-        self.add_constraint()
-        self.lock_controller()
+        with self.session('rig'), self.recording():
+            self.snapshot_guide()
+            self._digests = self.digests()
+            self.create_joint()
+            self.set_shape()
+            self.place_controller()
+            self.delete_guide()
+            self.delete_shape()
+            self.color_controller()
+            self.add_constraint()
+            self.bake_offsets()
+            self.lock_controller()
+            self.registry.prune()
+
+    def rebuild_rig(self):
+        """
+        Build the rig again from the guides in the scene, only the
+        sub-components whose guides or parameters changed since the last
+        build, and their dependents; the components get linked again after
+
+        :return: list. rebuilt sub-components
+        """
+        if not self._digests:
+            self.build_rig()
+            return self.sub_components() or [self]
+
+        with self.session('rebuild'), self.recording():
+            self.snapshot_guide()
+            digests = self.digests()
+            comps = self.sub_components() or [self]
+            dirty = list()
+            for comp in comps:
+                if digests[comp.base] != self._digests.get(comp.base):
+                    for obj in [comp] + self.dependents(comp):
+                        if obj not in dirty:
+                            dirty.append(obj)
+
+            if len(dirty) == len(comps):
+                for role in registry.ROLES:
+                    if role != registry.LOC:
+                        self.registry.delete(role)
+                self.build_rig()
+                return dirty
+
+            self.teardown(dirty)
+            for comp in dirty:
+                comp.create_joint()
+            self.link(self.joint_links())
+            for comp in dirty:
+                comp.set_shape()
+                comp.place_controller()
+            self.delete_guide()
+            self.delete_shape()
+            for comp in dirty:
+                comp.color_controller()
+                comp.add_constraint()
+            self.connect_components(dirty)
+            for comp in dirty:
+                comp.bake_offsets()
+                comp.lock_controller()
+            self.registry.prune()
+            self._digests = digests
+        return dirty
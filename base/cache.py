@@ -0,0 +1,249 @@
+"""
+Built rig cache
+
+Rigs built from the same template, parameters and guides come out the
+same, so the nodes of a build are exported once to a local disk cache,
+keyed by a hash of all three, and imported back on the next identical
+build instead of building the rig procedurally again.
+
+Entries live in one folder per autoRigger version, a new version drops
+the older folders. Least recently used entries get evicted once the
+folder grows over its size limit, the latest one always stays.
+"""
+
+import hashlib
+import json
+import numbers
+import os
+import shutil
+from enum import Enum
+
+import maya.cmds as cmds
+
+from . import preset, registry
+from .. import util
+from ..constant import VERSION
+
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.autoRigger', 'cache')
+
+# default size limit of the cache folder in bytes
+LIMIT = 1024 ** 3
+
+EXTENSION = '.mb'
+
+
+GROUPS = (util.G_JNT_GRP, util.G_CTRL_GRP, util.G_MESH_GRP)
+
+
+class Cache(object):
+    """
+    Exported rigs on local disk, keyed by build hash
+    """
+
+    def __init__(self, root=CACHE_DIR, limit=LIMIT):
+        """
+        Initialization
+
+        :param root: str. cache folder, holding one folder per version
+        :param limit: int. size limit in bytes
+        """
+        self.root = root
+        self.limit = limit
+        self.folder = os.path.join(root, VERSION)
+
+    def key(self, bone, snapshot):
+        """
+        Hash of a rig object's build: version, template, parameters, build
+        options and guides
+
+        :param bone: bone.Bone. rig object, its namespace created
+        :param snapshot: guide.Snapshot. guides of the build
+        :return: str. hex digest
+        """
+        result = hashlib.sha1()
+        result.update(json.dumps([
+            VERSION,
+            type(bone).__module__,
+            type(bone).__name__,
+            [options(comp) for comp in bone.walk()]
+        ]).encode('utf-8'))
+        result.update(preset.digest(bone, snapshot).encode('utf-8'))
+        return result.hexdigest()
+
+    def path(self, key):
+        """
+        :param key: str. build hash
+        :return: str. file path of the entry
+        """
+        return os.path.join(self.folder, key + EXTENSION)
+
+    def entries(self):
+        """
+        Entries of the current version, least recently used first
+
+        :return: list. file paths
+        """
+        if not os.path.isdir(self.folder):
+            return list()
+        paths = [os.path.join(self.folder, name)
+                 for name in os.listdir(self.folder)
+                 if name.endswith(EXTENSION)]
+        return sorted(paths, key=os.path.getmtime)
+
+    def size(self):
+        """
+        :return: int. size of the current version's entries in bytes
+        """
+        return sum(os.path.getsize(path) + os.path.getsize(_roots(path))
+                   for path in self.entries())
+
+    def fetch(self, key):
+        """
+        Look an entry up, marking it as used
+
+        :param key: str. build hash
+        :return: str. file path of the entry, None on a miss
+        """
+        path = self.path(key)
+        if not (os.path.isfile(path) and os.path.isfile(_roots(path))):
+            return None
+        os.utime(path, None)
+        return path
+
+    def store(self, key, nodes):
+        """
+        Export built nodes as an entry, then evict over the size limit
+
+        :param key: str. build hash
+        :param nodes: list. nodes of the build
+        :return: str. file path of the entry
+        """
+        self.invalidate()
+        if not os.path.isdir(self.folder):
+            os.makedirs(self.folder)
+
+        nodes = cmds.ls(nodes) if nodes else list()
+        roots = dict()
+        for node in nodes:
+            parent = cmds.listRelatives(node, p=1)
+            if parent and parent[0] in GROUPS:
+                roots[node] = parent[0]
+
+        path = self.path(key)
+        temp = path[:-len(EXTENSION)] + '_tmp' + EXTENSION
+        cmds.select(nodes, r=1, ne=1)
+        cmds.file(temp, exportSelected=1, type='mayaBinary', force=1,
+                  constructionHistory=1, channels=1, constraints=1,
+                  expressions=1, shader=1, preserveReferences=0)
+        cmds.select(clear=1)
+        with open(_roots(path), 'w') as f:
+            json.dump(roots, f, indent=1, sort_keys=True)
+        os.rename(temp, path)
+
+        self.evict()
+        return path
+
+    def load(self, path):
+        """
+        Import an entry, parenting its roots back under the outliner groups
+
+        :param path: str. file path of the entry
+        :return: list. imported node names
+        """
+        with open(_roots(path)) as f:
+            roots = json.load(f)
+        nodes = cmds.file(path, i=1, type='mayaBinary', namespace=':',
+                          returnNewNodes=1) or list()
+        nodes = [node.split('|')[-1] for node in nodes]
+        for node, group in sorted(roots.items()):
+            cmds.parent(node, group)
+        return nodes
+
+    def evict(self):
+        """
+        Delete least recently used entries until under the size limit,
+        never the newest one, even when it alone is over the limit
+
+        :return: list. evicted file paths
+        """
+        evicted = list()
+        size = self.size()
+        for path in self.entries()[:-1]:
+            if size <= self.limit:
+                break
+            size -= os.path.getsize(path) + os.path.getsize(_roots(path))
+            os.remove(path)
+            os.remove(_roots(path))
+            evicted.append(path)
+        return evicted
+
+    def invalidate(self):
+        """
+        Delete the entries of every other version
+
+        :return: list. deleted folders
+        """
+        if not os.path.isdir(self.root):
+            return list()
+        stale = [os.path.join(self.root, name)
+                 for name in os.listdir(self.root) if name != VERSION]
+        for folder in stale:
+            shutil.rmtree(folder, ignore_errors=True)
+        return stale
+
+
+def options(comp):
+    """
+    Constructor parameters and build options of a component, read from
+    every attribute holding a number, a flag, an enum or a vector rather
+    than from a list to keep in sync; node names, sub-components and build
+    state are left out, the preset digest covers names and guides
+
+    :param comp: bone.Bone. rig object
+    :return: list. [name, value] pairs, sorted by name
+    """
+    result = list()
+    for name, value in sorted(vars(comp).items()):
+        if isinstance(value, (list, tuple)) and value and all(
+                isinstance(item, numbers.Number) for item in value):
+            value = [float(item) for item in value]
+        elif isinstance(value, Enum):
+            value = str(value)
+        elif isinstance(value, numbers.Number):
+            value = float(value)
+        else:
+            continue
+        result.append([name, value])
+    return result
+
+
+def build(bone, cache=None):
+    """
+    Build the rig of a rig object, its guides in the scene, importing the
+    rig of an identical earlier build when cached
+
+    :param bone: bone.Bone. rig object
+    :param cache: Cache. the default cache if None
+    :return: bool. whether the rig came from the cache
+    """
+    cache = cache or Cache()
+    key = cache.key(bone, bone.snapshot_guide())
+    path = cache.fetch(key)
+    if not path:
+        bone.build_rig()
+        cache.store(key, bone.registry.nodes())
+        return False
+
+    with bone.session('rig'):
+        roles = bone.node_roles()
+        for node in cache.load(path):
+            bone.registry.add(node, roles.get(node, registry.UTILITY))
+        bone.delete_guide()
+        bone.registry.prune()
+        bone._digests = bone.digests()
+    return True
+
+
+def _roots(path):
+    return path[:-len(EXTENSION)] + '.json'
@@ -0,0 +1,157 @@
+"""
+Dependency graph checks on built nodes
+
+Builds the node-level dependency graph of a set of nodes from their
+incoming connections and DAG parenting, and finds the cycles that would
+make maya's evaluation manager fall back to serial evaluation.
+
+    from autoRigger.base import graph
+
+    rig.build_rig()
+    graph.assert_acyclic(rig.registry.nodes())
+"""
+
+from collections import defaultdict
+
+import maya.cmds as cmds
+
+
+# source attributes carrying no data the destination evaluates from
+PASSIVE = {'message', 'handlePath'}
+
+# source attributes computed from the node's parent, not the node itself
+INHERITED = {'parentMatrix', 'parentInverseMatrix'}
+
+SHAPE_TYPES = {
+    'nurbsCurve',
+    'nurbsSurface',
+    'mesh',
+    'locator',
+    'clusterHandle',
+    'distanceDimShape',
+}
+
+
+def dependencies(nodes):
+    """
+    Map every node to the nodes it evaluates from
+
+    Shapes are folded into their transform, a child depends on its parent,
+    except constraints which only read the plugs they are connected to
+
+    :param nodes: list. node names
+    :return: dict. node name to set of node names
+    """
+    graph = defaultdict(set)
+    for node in nodes:
+        if not cmds.objExists(node):
+            continue
+
+        owners = [node] + (cmds.listRelatives(node, s=1) or list())
+        for owner in owners:
+            pairs = cmds.listConnections(
+                owner, s=1, d=0, c=1, p=1, sh=1) or list()
+            for source in pairs[1::2]:
+                name, attr = source.split('.', 1)
+                attr = attr.split('[')[0]
+                if attr in PASSIVE:
+                    continue
+                if attr in INHERITED:
+                    name = _parent(name)
+                    if name is None:
+                        continue
+                graph[node].add(_transform(name))
+
+        parent = _parent(node)
+        if parent and not cmds.nodeType(node).endswith('Constraint'):
+            graph[node].add(parent)
+    return graph
+
+
+def cycles(nodes):
+    """
+    Find the dependency cycles among a set of nodes
+
+    :param nodes: list. node names, usually the ones a build recorded
+    :return: list. one list of node names per cycle, empty when acyclic
+    """
+    graph = dependencies(nodes)
+    return [component for component in _components(graph)
+            if len(component) > 1 or component[0] in graph[component[0]]]
+
+
+def assert_acyclic(nodes):
+    """
+    Raise if a set of nodes depends on itself
+
+    :param nodes: list. node names
+    """
+    found = cycles(nodes)
+    if found:
+        raise RuntimeError('Dependency cycle between {}'.format(
+            '; '.join(', '.join(sorted(cycle)) for cycle in found)))
+
+
+def _parent(name):
+    parent = cmds.listRelatives(name, p=1)
+    return parent[0] if parent else None
+
+
+def _transform(name):
+    if cmds.nodeType(name) in SHAPE_TYPES:
+        return _parent(name) or name
+    return name
+
+
+def _components(graph):
+    """
+    Strongly connected components, Tarjan's algorithm without recursion
+    so that long chains don't hit the recursion limit
+
+    :param graph: dict. node to set of nodes it depends on
+    :return: list. components as lists of nodes
+    """
+    index = dict()
+    low = dict()
+    stack = list()
+    on_stack = set()
+    components = list()
+
+    for root in list(graph):
+        if root in index:
+            continue
+        work = [(root, iter(sorted(graph.get(root, ()))))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, edges = work[-1]
+            advanced = False
+            for other in edges:
+                if other not in index:
+                    index[other] = low[other] = len(index)
+                    stack.append(other)
+                    on_stack.add(other)
+                    work.append((other, iter(sorted(graph.get(other, ())))))
+                    advanced = True
+                    break
+                if other in on_stack:
+                    low[node] = min(low[node], index[other])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = list()
+                while True:
+                    other = stack.pop()
+                    on_stack.discard(other)
+                    component.append(other)
+                    if other == node:
+                        break
+                components.append(component)
+    return components
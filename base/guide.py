@@ -0,0 +1,103 @@
+"""
+Bulk guide queries, reading guide locators once per build
+"""
+
+import maya.cmds as cmds
+import numpy as np
+
+from .. import backend
+
+try:
+    from maya.api import OpenMaya
+except ImportError:
+    # headless backends are read one node at a time
+    OpenMaya = None
+
+
+class Snapshot(object):
+    """
+    World matrices of a set of guide nodes stored in one (N, 4, 4) array
+
+    Matrices follow maya's row-vector layout, translation is the last row
+    """
+
+    def __init__(self, names, matrices):
+        """
+        Initialization
+
+        :param names: list. node names, one per matrix
+        :param matrices: np.ndarray. (N, 4, 4) float64 world matrices
+        """
+        self.names = list(names)
+        self.index = dict((name, row) for row, name in enumerate(self.names))
+        self.matrices = np.asarray(matrices, dtype=np.float64).reshape(
+            len(self.names), 4, 4)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    @classmethod
+    def capture(cls, names):
+        """
+        Query the world matrix of every existing node in a single pass,
+        one maya API selection list rather than one command per node
+
+        :param names: list. node names, duplicates are read once
+        :return: Snapshot. the captured snapshot
+        """
+        unique = list()
+        seen = set()
+        for name in names:
+            if name not in seen:
+                seen.add(name)
+                unique.append(name)
+
+        existing = set(cmds.ls(unique) or list())
+        unique = [name for name in unique if name in existing]
+
+        return cls(unique, _world_matrices(unique))
+
+    def matrix(self, name):
+        """
+        :param name: str. node name
+        :return: np.ndarray. (4, 4) world matrix
+        """
+        return self.matrices[self.index[name]]
+
+    def position(self, name):
+        """
+        :param name: str. node name
+        :return: list. world position x, y and z, ready for a cmds call
+        """
+        return self.matrices[self.index[name], 3, :3].tolist()
+
+    def positions(self, names):
+        """
+        :param names: list. node names
+        :return: np.ndarray. (k, 3) world positions
+        """
+        rows = [self.index[name] for name in names]
+        return self.matrices[rows, 3, :3]
+
+
+def _world_matrices(names):
+    """
+    :param names: list. existing node names
+    :return: np.ndarray. (N, 4, 4) world matrices
+    """
+    matrices = np.empty((len(names), 4, 4), dtype=np.float64)
+    if OpenMaya and backend.is_maya(cmds):
+        selection = OpenMaya.MSelectionList()
+        for name in names:
+            selection.add(name)
+        for row in range(len(names)):
+            matrices[row] = np.reshape(
+                list(selection.getDagPath(row).inclusiveMatrix()), (4, 4))
+        return matrices
+
+    for row, name in enumerate(names):
+        matrices[row] = np.reshape(cmds.xform(name, q=1, m=1, ws=1), (4, 4))
+    return matrices
@@ -0,0 +1,218 @@
+"""
+Guide layouts as data
+
+A layout lists the guide locators of a component tree with their parent
+and local transform. Components describe their own layout, composites
+and templates adjust the roots of their components' layouts, then every
+locator gets created once, straight at its final transform, with world
+matrices solved for the whole tree in one NumPy pass.
+
+Matrices follow maya's row-vector layout, translation is the last row.
+"""
+
+from collections import OrderedDict
+
+import maya.cmds as cmds
+import numpy as np
+
+from .. import util
+from ..solver import frame
+
+
+class Layout(object):
+    """
+    Guide locators in creation order, parents listed before their children
+    """
+
+    def __init__(self):
+        """
+        Initialization
+        """
+        self.names = list()
+        self.parents = list()
+        self.locals = list()
+        self.index = dict()
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def add(self, name, parent=None, translate=(0, 0, 0), rotate=(0, 0, 0),
+            scale=1.0):
+        """
+        Add a locator
+
+        :param name: str. locator name
+        :param parent: str. parent locator, None for a root
+        :param translate: list. translation in parent space
+        :param rotate: list. rotation in degrees, xyz order
+        :param scale: float. uniform scale
+        :return: Layout. the layout, so calls chain
+        """
+        matrix = np.eye(4)
+        matrix[:3, :3] = scale * frame.euler_to_matrix([rotate])[0]
+        matrix[3, :3] = translate
+        self.index[name] = len(self.names)
+        self.names.append(name)
+        self.parents.append(parent)
+        self.locals.append(matrix)
+        return self
+
+    def chain(self, names, offset, scale=1.0):
+        """
+        Add locators each parented to the previous one, a constant world
+        offset apart, whatever the scale of the root
+
+        :param names: list. locator names, root first
+        :param offset: list. world translation from one locator to the next
+        :param scale: float. uniform scale of the root
+        :return: Layout. the layout
+        """
+        # the children inherit the root scale, their offsets undo it
+        local = np.divide(offset, float(scale))
+        self.add(names[0], scale=scale)
+        for parent, name in zip(names, names[1:]):
+            self.add(name, parent, local)
+        return self
+
+    def extend(self, other):
+        """
+        Append the locators of another layout
+
+        :param other: Layout. layout of a sub-component
+        :return: Layout. the layout
+        """
+        for name, parent, matrix in zip(
+                other.names, other.parents, other.locals):
+            self.index[name] = len(self.names)
+            self.names.append(name)
+            self.parents.append(parent)
+            self.locals.append(matrix.copy())
+        return self
+
+    def move(self, name, offset):
+        """
+        Move a locator, and the locators below it, in its parent space
+
+        :param name: str. locator name
+        :param offset: list. translation to add
+        :return: Layout. the layout
+        """
+        self.locals[self.index[name]][3, :3] += offset
+        return self
+
+    def rotate(self, name, rotate):
+        """
+        Set the rotation of a locator, keeping its translation and scale
+
+        :param name: str. locator name
+        :param rotate: list. rotation in degrees, xyz order
+        :return: Layout. the layout
+        """
+        matrix = self.locals[self.index[name]]
+        scale = np.linalg.norm(matrix[0, :3])
+        matrix[:3, :3] = scale * frame.euler_to_matrix([rotate])[0]
+        return self
+
+    def attach(self, name, parent):
+        """
+        Parent a locator to another one, keeping its world transform
+
+        :param name: str. locator name
+        :param parent: str. new parent locator, listed before it
+        :return: Layout. the layout
+        """
+        if self.index[parent] > self.index[name]:
+            raise ValueError('{} is laid out after {}'.format(parent, name))
+        worlds = self.worlds()
+        row = self.index[name]
+        self.locals[row] = worlds[row].dot(
+            np.linalg.inv(worlds[self.index[parent]]))
+        self.parents[row] = parent
+        return self
+
+    def place(self, snapshot):
+        """
+        Put locators at the world matrices of a snapshot, the ones it
+        doesn't list keep their world transform
+
+        :param snapshot: guide.Snapshot. world matrices by locator name
+        :return: Layout. the layout
+        """
+        worlds = self.worlds()
+        for row, name in enumerate(self.names):
+            if name in snapshot:
+                worlds[row] = snapshot.matrix(name)
+
+        children = [row for row, parent in enumerate(self.parents) if parent]
+        parents = [self.index[self.parents[row]] for row in children]
+        locals_ = np.array(worlds)
+        if children:
+            locals_[children] = np.einsum(
+                'nij,njk->nik', worlds[children],
+                np.linalg.inv(worlds[parents]))
+        self.locals = list(locals_)
+        return self
+
+    def worlds(self, root=None):
+        """
+        World matrices of every locator, solved one hierarchy level at a
+        time over the whole layout
+
+        :param root: np.ndarray. (4, 4) matrix the roots are laid out in
+        :return: np.ndarray. (n, 4, 4) world matrices
+        """
+        locals_ = np.array(self.locals).reshape(len(self.names), 4, 4)
+        parents = np.array([-1 if p is None else self.index[p]
+                            for p in self.parents], dtype=int)
+
+        depth = np.zeros(len(self.names), dtype=int)
+        for row, parent in enumerate(parents):
+            if parent >= 0:
+                depth[row] = depth[parent] + 1
+
+        worlds = np.empty_like(locals_)
+        roots = parents < 0
+        worlds[roots] = locals_[roots] if root is None else \
+            np.einsum('nij,jk->nik', locals_[roots], root)
+        for level in range(1, depth.max() + 1 if len(depth) else 0):
+            rows = np.flatnonzero(depth == level)
+            worlds[rows] = np.einsum(
+                'nij,njk->nik', locals_[rows], worlds[parents[rows]])
+        return worlds
+
+    def build(self, root=None, group=None, names=None):
+        """
+        Create the locators, parented and placed once each
+
+        :param root: np.ndarray. (4, 4) matrix the roots are laid out in
+        :param group: str. group the roots go under, the locator group by
+                      default
+        :param names: list. locators to create, all of them by default, the
+                      parents of the others have to exist
+        :return: list. created locator names
+        """
+        group = group or util.G_LOC_GRP
+        rows = range(len(self.names)) if names is None else \
+            sorted(self.index[name] for name in names)
+        locals_ = list(self.locals)
+        if root is not None:
+            locals_ = [matrix.dot(root) if parent is None else matrix
+                       for matrix, parent in zip(locals_, self.parents)]
+
+        children = OrderedDict()
+        for row in rows:
+            cmds.spaceLocator(n=self.names[row])
+            children.setdefault(self.parents[row] or group, list()).append(
+                self.names[row])
+
+        for parent, created in children.items():
+            cmds.parent(created, parent, r=1)
+
+        identity = np.eye(4)
+        for row in rows:
+            if not np.allclose(locals_[row], identity):
+                cmds.xform(self.names[row], m=locals_[row].ravel().tolist())
+        return [self.names[row] for row in rows]
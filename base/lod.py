@@ -0,0 +1,91 @@
+"""
+Runtime level of detail
+
+Templates expose a lod attribute on their root controller, connected to
+the nodeState of the nodes making up their secondary systems. At the low
+level those nodes are blocking: they stop evaluating and hold their last
+output, so the rig stays posed but no longer pays for them each frame.
+Switching back needs no rebuild.
+"""
+
+import maya.cmds as cmds
+
+from ..constant import ATTRS
+
+
+# enum fields are the nodeState each level sets: normal, blocking
+LEVELS = 'high=0:low=2'
+
+# node types evaluated for their own transform or geometry, never blocked,
+# along with the types inheriting from them, like ikEffector and
+# clusterHandle
+KEEP = {
+    'transform',
+    'shape',
+}
+
+# node types living in the DAG that solve or constrain other nodes,
+# blocked all the same
+BLOCK = {
+    'constraint',
+    'ikHandle',
+}
+
+
+def secondary(registry, prefixes, handles=()):
+    """
+    Recorded nodes named after the given nodes, like the constraints,
+    solvers and utility nodes driving them
+
+    :param registry: registry.Registry. registry of the build
+    :param prefixes: list. names the nodes start with
+    :param handles: list. controller and offset names, nodes named after
+                    them keep evaluating so the controllers follow the rig
+    :return: list. node names
+    """
+    prefixes, handles = tuple(prefixes), tuple(handles)
+    if not prefixes:
+        return list()
+    names = [name for name in registry.nodes() if name.startswith(prefixes)
+             and not (handles and name.startswith(handles))]
+    if not names:
+        return list()
+    # recorded nodes a later step deleted, like guides, are skipped
+    return [name for name in cmds.ls(names) if not is_kept(name)]
+
+
+def is_kept(name):
+    """
+    :param name: str. node name
+    :return: bool. whether the node keeps evaluating at the low level
+    """
+    types = set(cmds.nodeType(name, inherited=1) or list())
+    return bool(types & KEEP) and not types & BLOCK
+
+
+def exists(ctrl):
+    """
+    :param ctrl: str. root controller of the rig
+    :return: bool. whether the controller has the lod attribute
+    """
+    return bool(cmds.attributeQuery(ATTRS['lod'], node=ctrl, exists=1))
+
+
+def add(ctrl, nodes):
+    """
+    Add the lod attribute to a controller, unless it kept the one of a
+    previous build, and connect it to nodes
+
+    :param ctrl: str. root controller of the rig
+    :param nodes: list. nodes blocked at the low level
+    :return: str. the lod attribute
+    """
+    if not exists(ctrl):
+        cmds.addAttr(
+            ctrl,
+            sn='lod', ln=ATTRS['lod'], at='enum', en=LEVELS,
+            k=1)
+    attr = ctrl+'.lod'
+    for node in nodes:
+        cmds.connectAttr(attr, node+'.nodeState')
+    return attr
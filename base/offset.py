@@ -0,0 +1,107 @@
+"""
+Controller offsets kept in the offsetParentMatrix
+
+In matrix mode a controller stands in for its offset group: it is placed
+at its target and parented wherever the offset would have been, and once
+the rig is built its local transform moves into its offsetParentMatrix,
+leaving zeroed channels and one DAG transform per controller instead of
+two.
+
+Matrices follow maya's row-vector layout, translation is the last row.
+"""
+
+import maya.cmds as cmds
+import numpy as np
+
+from ..utility.rigging import transform
+
+
+# channels a baked controller gets zeroed, and the plugs that, when
+# driven, leave the controller out of the bake
+CHANNELS = ('translate', 'rotate')
+DRIVEN = CHANNELS + ('offsetParentMatrix',)
+
+
+def place(ctrl, target):
+    """
+    Freeze a controller, so its shape keeps any rotation applied to it,
+    then move it onto its target
+
+    :param ctrl: str. controller transform
+    :param target: str. transform to match
+    """
+    cmds.makeIdentity(ctrl, apply=1, t=1, r=1, s=1)
+    transform.match_xform(ctrl, target)
+
+
+def is_driven(ctrl):
+    """
+    :param ctrl: str. controller transform
+    :return: bool. whether a connection drives its transform channels or
+             its offsetParentMatrix
+    """
+    pairs = cmds.listConnections(ctrl, s=1, d=0, c=1, p=1) or list()
+    return any(plug.split('.', 1)[1].startswith(DRIVEN)
+               for plug in pairs[::2])
+
+
+def bake(ctrl):
+    """
+    Move the local transform of an undriven controller into its
+    offsetParentMatrix and zero its channels, its world transform is left
+    as it was
+
+    :param ctrl: str. controller transform, offsetParentMatrix at identity
+    :return: bool. whether the controller got baked
+    """
+    if is_driven(ctrl):
+        return False
+    cmds.setAttr(ctrl+'.offsetParentMatrix', *cmds.getAttr(ctrl+'.matrix'),
+                 type='matrix')
+    for channel in CHANNELS:
+        cmds.setAttr(ctrl+'.'+channel, 0, 0, 0)
+    return True
+
+
+def follow(driver, ctrl):
+    """
+    Make a controller follow a driver through its offsetParentMatrix,
+    keeping its current offset like a parent constraint with mo, and
+    leaving its channels free to animate
+
+    :param driver: str. transform to follow
+    :param ctrl: str. controller transform
+    :return: str. the multMatrix node
+    """
+    world = np.reshape(cmds.xform(ctrl, q=1, m=1, ws=1), (4, 4))
+    source = np.reshape(cmds.xform(driver, q=1, m=1, ws=1), (4, 4))
+    rest = world.dot(np.linalg.inv(source))
+
+    network = cmds.shadingNode('multMatrix', asUtility=1, n=ctrl+'_follow')
+    cmds.setAttr(network+'.matrixIn[0]', *rest.ravel().tolist(),
+                 type='matrix')
+    cmds.connectAttr(driver+'.worldMatrix[0]', network+'.matrixIn[1]')
+    cmds.connectAttr(ctrl+'.parentInverseMatrix', network+'.matrixIn[2]')
+    cmds.connectAttr(network+'.matrixSum', ctrl+'.offsetParentMatrix')
+    for channel in CHANNELS:
+        cmds.setAttr(ctrl+'.'+channel, 0, 0, 0)
+    return network
+
+
+def drive_translate(ctrl, plug):
+    """
+    Drive the offset translation of a controller, in its parent space,
+    keeping its current rotation in the offsetParentMatrix
+
+    :param ctrl: str. controller transform
+    :param plug: str. double3 output plug of the translation
+    :return: str. the composeMatrix node
+    """
+    network = cmds.shadingNode(
+        'composeMatrix', asUtility=1, n=ctrl+'_offsetMatrix')
+    cmds.setAttr(network+'.inputRotate', *cmds.getAttr(ctrl+'.rotate')[0])
+    cmds.connectAttr(plug, network+'.inputTranslate')
+    cmds.connectAttr(network+'.outputMatrix', ctrl+'.offsetParentMatrix')
+    for channel in CHANNELS:
+        cmds.setAttr(ctrl+'.'+channel, 0, 0, 0)
+    return network
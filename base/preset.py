@@ -0,0 +1,189 @@
+"""
+Guide presets
+
+A preset stores the guide state of a rig object's component tree: the
+world matrix of every guide locator, stacked in one array, and the
+constructor parameters of each component, which decide how many guides
+there are and where the template would lay them out. Loading restores all
+the guides in one bulk pass, without laying out the template again and
+moving everything afterwards. The same parameters and guides hash each
+component, telling a rebuild which components changed since the last one.
+
+The file is a compressed numpy archive holding a json header, the
+locator names and a (N, 4, 4) float64 matrix array.
+"""
+
+import hashlib
+import json
+
+import maya.cmds as cmds
+import numpy as np
+
+from . import guide
+from .. import util
+
+
+# bumped whenever the layout of the file changes
+VERSION = 1
+
+# guide matrices are hashed at this precision
+DECIMALS = 6
+
+# component attributes recorded as constructor parameters
+PARAMS = (
+    'segment',
+    'length',
+    'cvs',
+    'distance',
+    'interval',
+    'height',
+    'gap',
+    's_len',
+)
+
+
+def params(comp):
+    """
+    Constructor parameters of a single component
+
+    :param comp: bone.Bone. rig object
+    :return: dict. parameter values by name, unset ones left out
+    """
+    result = dict()
+    for key in PARAMS:
+        value = getattr(comp, key, None)
+        if value is not None:
+            result[key] = value
+    return result
+
+
+def describe(bone):
+    """
+    Header of a rig object's preset, everything but the guide matrices
+
+    :param bone: bone.Bone. rig object, its namespace created
+    :return: dict. json serializable header
+    """
+    return {
+        'version': VERSION,
+        'type': type(bone).__name__,
+        'components': [
+            {'base': comp.base,
+             'type': type(comp).__name__,
+             'params': params(comp)}
+            for comp in bone.walk()
+        ]
+    }
+
+
+def save(bone, path):
+    """
+    Write the guides of a rig object to disk
+
+    :param bone: bone.Bone. rig object with its guides in the scene
+    :param path: str. file path
+    :return: guide.Snapshot. the saved guides
+    """
+    snapshot = guide.Snapshot.capture(
+        [loc for comp in bone.walk() for loc in comp.locs])
+    with open(path, 'wb') as f:
+        np.savez_compressed(
+            f,
+            header=np.array(json.dumps(describe(bone), sort_keys=True)),
+            names=np.array(snapshot.names, dtype=np.str_),
+            matrices=snapshot.matrices)
+    return snapshot
+
+
+def read(path):
+    """
+    Read a preset from disk
+
+    :param path: str. file written by save
+    :return: tuple. header dict and guide.Snapshot
+    """
+    with open(path, 'rb') as f:
+        data = np.load(f)
+        header = json.loads(str(data['header']))
+        if header.get('version') != VERSION:
+            raise ValueError('Unsupported guide preset version {} in {}'.format(
+                header.get('version'), path))
+        names = [str(name) for name in data['names']]
+        return header, guide.Snapshot(names, data['matrices'])
+
+
+def check(bone, header):
+    """
+    Make sure a preset was saved from a rig object built the same way
+
+    :param bone: bone.Bone. rig object, its namespace created
+    :param header: dict. preset header
+    """
+    expected = json.loads(json.dumps(describe(bone)))
+    if header['type'] != expected['type']:
+        raise ValueError('Guide preset of a {}, not a {}'.format(
+            header['type'], expected['type']))
+
+    saved = header['components']
+    if len(saved) != len(expected['components']):
+        raise ValueError('Guide preset has {} components, expected {}'.format(
+            len(saved), len(expected['components'])))
+    for entry, comp in zip(saved, expected['components']):
+        if entry != comp:
+            raise ValueError('Guide preset mismatch on {}: {} != {}'.format(
+                comp['base'], entry['params'], comp['params']))
+
+
+def restore(bone, snapshot):
+    """
+    Put the guides of a rig object where a snapshot has them, creating
+    the missing ones, guides the snapshot doesn't list keep their layout
+    relative to their parent
+
+    :param bone: bone.Bone. rig object, its namespace created
+    :param snapshot: guide.Snapshot. saved guides
+    :return: list. guide locator names
+    """
+    guides = bone.layout().place(snapshot)
+    existing = set(cmds.ls(guides.names) or list())
+    if not existing:
+        return guides.build()
+
+    missing = [name for name in guides.names if name not in existing]
+    if missing:
+        guides.build(names=missing)
+
+    # guides left over from a partial scene go back under their parent
+    for name, parent in zip(guides.names, guides.parents):
+        parent = parent or util.G_LOC_GRP
+        if name in existing and \
+                (cmds.listRelatives(name, p=1) or [None])[0] != parent:
+            cmds.parent(name, parent)
+
+    # parents first, so moving them doesn't carry already placed children
+    worlds = guides.worlds()
+    for row, name in enumerate(guides.names):
+        if name in snapshot:
+            cmds.xform(name, ws=1, m=worlds[row].ravel().tolist())
+    return list(guides.names)
+
+
+def digest(comp, snapshot):
+    """
+    Hash of a component's guides and constructor parameters, sub-components
+    included, changing whenever a rebuild would build it differently
+
+    :param comp: bone.Bone. rig object
+    :param snapshot: guide.Snapshot. guides of the build
+    :return: str. hex digest
+    """
+    result = hashlib.sha1()
+    for sub in comp.walk():
+        result.update(json.dumps(
+            [type(sub).__name__, sub.base, params(sub)],
+            sort_keys=True).encode('utf-8'))
+        rows = [snapshot.index[loc] for loc in sub.locs if loc in snapshot]
+        # adding zero folds -0.0 into 0.0
+        matrices = np.round(snapshot.matrices[rows], DECIMALS) + 0.0
+        result.update(np.ascontiguousarray(matrices).tobytes())
+    return result.hexdigest()
@@ -0,0 +1,282 @@
+"""
+Build-scoped node registry
+
+Records every node created while a rig object builds, tagged by role, so
+cleanup, rollback and lookup only ever touch the nodes the build created
+instead of scanning the scene with wildcards.
+"""
+
+import fnmatch
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+
+import maya.cmds as cmds
+
+from .. import backend
+
+
+LOC = 'loc'
+JNT = 'jnt'
+CTRL = 'ctrl'
+OFFSET = 'offset'
+TEMP = 'temp'
+UTILITY = 'utility'
+
+ROLES = (LOC, JNT, CTRL, OFFSET, TEMP, UTILITY)
+
+TMP_PREFIX = 'tmp_'
+
+STRING_TYPES = (str, type(u''))
+
+# commands returning the nodes they create
+CREATORS = {
+    'arclen',
+    'spaceLocator',
+    'joint',
+    'curve',
+    'circle',
+    'textCurves',
+    'createNode',
+    'shadingNode',
+    'group',
+    'duplicate',
+    'ikHandle',
+    'cluster',
+    'distanceDimension',
+    'pointConstraint',
+    'orientConstraint',
+    'parentConstraint',
+    'aimConstraint',
+    'scaleConstraint',
+    'poleVectorConstraint',
+}
+
+
+class Registry(object):
+    """
+    Nodes created by a build, in creation order, keyed by name
+    """
+
+    def __init__(self):
+        """
+        Initialization
+        """
+        self._roles = OrderedDict()
+
+    def __len__(self):
+        return len(self._roles)
+
+    def __contains__(self, name):
+        return name in self._roles
+
+    def add(self, name, role=UTILITY):
+        """
+        Record a node
+
+        :param name: str. node name
+        :param role: str. one of ROLES
+        """
+        if role not in ROLES:
+            raise ValueError('Unknown node role: {}'.format(role))
+        self._roles[name] = role
+
+    def rename(self, old, new, role=None):
+        """
+        Follow a recorded node being renamed
+
+        :param old: str. previous name
+        :param new: str. new name
+        :param role: str. new role, defaults to the current one
+        """
+        if old in self._roles:
+            current = self._roles.pop(old)
+            self.add(new, role or current)
+
+    def discard(self, names):
+        """
+        Forget nodes, deleted ones for instance
+
+        :param names: list. node names
+        """
+        for name in names:
+            self._roles.pop(name, None)
+
+    def role(self, name):
+        """
+        :param name: str. node name
+        :return: str. role of a recorded node, None if not recorded
+        """
+        return self._roles.get(name)
+
+    def nodes(self, role=None):
+        """
+        Get the recorded nodes
+
+        :param role: str. only return nodes of this role
+        :return: list. node names in creation order
+        """
+        if role is None:
+            return list(self._roles)
+        return [name for name, r in self._roles.items() if r == role]
+
+    def match(self, pattern, role=None):
+        """
+        Glob the recorded nodes, the registry counterpart of cmds.ls
+
+        :param pattern: str. fnmatch style name pattern
+        :param role: str. only return nodes of this role
+        :return: list. matching node names in creation order
+        """
+        return [name for name in self.nodes(role)
+                if fnmatch.fnmatchcase(name, pattern)]
+
+    def prune(self):
+        """
+        Forget the recorded nodes that went away with a deleted parent,
+        with a single query over the recorded names only
+        """
+        names = self.nodes()
+        existing = set(cmds.ls(names) if names else list())
+        self.discard([name for name in names if name not in existing])
+
+    def delete(self, role=None):
+        """
+        Delete the recorded nodes still in the scene and forget them
+
+        :param role: str. only delete nodes of this role
+        :return: list. deleted node names
+        """
+        names = self.nodes(role)
+        existing = cmds.ls(names) if names else list()
+        if existing:
+            cmds.delete(existing)
+        self.discard(names)
+        return existing
+
+    @contextmanager
+    def recording(self, roles=None):
+        """
+        Record the nodes created by the enclosed commands
+
+        :param roles: function. returns a dict mapping node names to roles,
+                      called once the first node gets created, names not in
+                      it are temp or utility nodes
+        """
+        commands = backend.current()
+        if isinstance(commands, Tracker) and commands.registry is self:
+            yield self
+            return
+
+        with backend.using(Tracker(commands, self, roles)):
+            yield self
+
+
+class Tracker(object):
+    """
+    Command backend wrapper feeding created, renamed and deleted nodes
+    to a registry
+    """
+
+    def __init__(self, commands, registry, roles=None):
+        """
+        Initialization
+
+        :param commands: module or object. wrapped command backend
+        :param registry: Registry. registry to feed
+        :param roles: function. returns a dict mapping node names to roles
+        """
+        self.commands = commands
+        self.registry = registry
+        self._roles = roles
+        self._known = None
+
+    def __getattr__(self, name):
+        command = getattr(self.commands, name)
+        if name in CREATORS:
+            wrapper = self._creator(command)
+        elif name == 'rename':
+            wrapper = self._renamer(command)
+        elif name == 'delete':
+            wrapper = self._deleter(command)
+        else:
+            wrapper = command
+        # cache, so the lookup only happens once per command
+        setattr(self, name, wrapper)
+        return wrapper
+
+    def classify(self, name):
+        """
+        :param name: str. created node name
+        :return: str. role of the node
+        """
+        if self._known is None:
+            self._known = self._roles() if self._roles else dict()
+        if name in self._known:
+            return self._known[name]
+        return TEMP if name.startswith(TMP_PREFIX) else UTILITY
+
+    def _creator(self, command):
+        @wraps(command)
+        def wrap(*args, **kwargs):
+            result = command(*args, **kwargs)
+            if not _is_edit(kwargs):
+                for name in _names(result):
+                    self.registry.add(name, self.classify(name))
+            return result
+        return wrap
+
+    def _renamer(self, command):
+        @wraps(command)
+        def wrap(*args, **kwargs):
+            result = command(*args, **kwargs)
+            if len(args) > 1 and not isinstance(args[0], (list, tuple)):
+                self.registry.rename(args[0], result, self.classify(result))
+            return result
+        return wrap
+
+    def _deleter(self, command):
+        @wraps(command)
+        def wrap(*args, **kwargs):
+            names = list()
+            for arg in args:
+                names.extend(_names(arg))
+            existing = self.commands.ls(names) if names else list()
+            below = set()
+            for name in existing:
+                # a parent listed first already covers its descendants
+                if name not in below:
+                    below.update(
+                        self.commands.listRelatives(name, ad=1) or list())
+            names += existing + list(below)
+            try:
+                return command(*args, **kwargs)
+            finally:
+                # descendants go along with their parents, and a delete
+                # failing halfway may still have removed some of the nodes
+                left = set(self.commands.ls(names) if names else list())
+                self.registry.discard(
+                    [name for name in names if name not in left])
+        return wrap
+
+
+def recorded(func):
+    """
+    Run a method of an object holding a ``registry`` while recording
+    """
+    @wraps(func)
+    def wrap(self, *args, **kwargs):
+        with self.registry.recording():
+            return func(self, *args, **kwargs)
+    return wrap
+
+
+def _is_edit(kwargs):
+    return any(kwargs.get(flag) for flag in ('q', 'query', 'e', 'edit'))
+
+
+def _names(result):
+    if not isinstance(result, (list, tuple)):
+        result = [result] if result else list()
+    return [name for name in result
+            if isinstance(name, STRING_TYPES) and name and '.' not in name]
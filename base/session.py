@@ -0,0 +1,260 @@
+"""
+Build session
+
+Wraps a build in one undo chunk (or with undo disabled), with viewport
+refresh suspended and viewport 2.0 paused, so maya doesn't redraw,
+re-evaluate and queue an undo entry after every single command. The
+previous state is restored on exit, even when the build fails.
+
+Viewport 2.0 gets paused rather than the evaluation manager switched off:
+switching its mode back rebuilds the whole evaluation graph, which can
+cost more than the build saved.
+
+    with session.Session('Biped rig'):
+        rig.build_rig()
+
+Sessions don't nest: an inner session runs its block untouched and the
+outermost one owns the toggles.
+"""
+
+from timeit import default_timer
+
+import maya.cmds as cmds
+
+
+# undo modes
+CHUNK = 'chunk'
+OFF = 'off'
+
+# settings used by sessions not given their own
+DEFAULTS = {
+    'undo': CHUNK,
+    'refresh': True,
+    'evaluation': True,
+}
+
+TOGGLES = ('undo', 'refresh', 'evaluation')
+
+# build durations in seconds, per label then per enabled toggles
+HISTORY = dict()
+
+# scene edits per probe, timed before and after each toggle engages
+PROBE = 25
+PROBE_RUNS = 3
+PROBE_NODE = 'tmp_session_probe'
+
+_ACTIVE = list()
+
+
+def configure(**settings):
+    """
+    Change the default settings of the upcoming sessions
+
+    :param settings: undo (CHUNK, OFF or None), refresh (bool),
+                     evaluation (bool)
+    """
+    for key in settings:
+        if key not in DEFAULTS:
+            raise ValueError('Unknown session setting: {}'.format(key))
+    DEFAULTS.update(settings)
+
+
+def active():
+    """
+    :return: Session. outermost running session, None if not building
+    """
+    return _ACTIVE[0] if _ACTIVE else None
+
+
+class Session(object):
+    """
+    Context manager toggling maya's per command overheads off for a build
+    """
+
+    def __init__(self, label, undo=None, refresh=None, evaluation=None):
+        """
+        Initialization
+
+        :param label: str. build name, used as undo chunk name and to
+                      compare durations between builds
+        :param undo: str. CHUNK to undo the build in one step, OFF to skip
+                     the undo queue entirely, defaults to DEFAULTS
+        :param refresh: bool. suspend viewport refresh
+        :param evaluation: bool. pause viewport 2.0
+        """
+        self.label = label
+        self.undo = DEFAULTS['undo'] if undo is None else undo
+        self.refresh = DEFAULTS['refresh'] if refresh is None else refresh
+        self.evaluation = DEFAULTS['evaluation'] \
+            if evaluation is None else evaluation
+
+        self.duration = None
+        self.costs = dict()
+        # toggle -> probe seconds before and after it engaged
+        self.probes = dict()
+        self._restore = list()
+        self._start = None
+
+    @property
+    def enabled(self):
+        """
+        :return: frozenset. names of the toggles switched by this session
+        """
+        return frozenset(
+            toggle for toggle in TOGGLES if getattr(self, toggle))
+
+    def __enter__(self):
+        _ACTIVE.append(self)
+        if len(_ACTIVE) > 1:
+            return self
+
+        try:
+            if self.undo:
+                self._toggle('undo', self._pause_undo)
+            if self.refresh:
+                self._toggle('refresh', self._suspend_refresh)
+            if self.evaluation:
+                self._toggle('evaluation', self._pause_evaluation)
+        except Exception:
+            self._resume()
+            _ACTIVE.pop()
+            raise
+
+        self._start = default_timer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _ACTIVE.pop()
+        if self._start is None:
+            return False
+
+        self.duration = default_timer() - self._start
+        try:
+            self._resume()
+        except Exception:
+            # don't hide the build error behind a restore one
+            if exc_type is None:
+                raise
+        if exc_type is None:
+            HISTORY.setdefault(self.label, dict())[self.enabled] = \
+                self.duration
+        return False
+
+    def savings(self):
+        """
+        Estimate how long each toggle saved, by comparing this build with
+        the last one of the same label run without that toggle only, or
+        else by scaling the build duration with the speedup its probe
+        showed within this session
+
+        :return: dict. toggle name to seconds saved, None when the toggle
+                 had nothing to switch
+        """
+        if self.duration is None:
+            return dict()
+
+        saved = dict()
+        for toggle in self.enabled:
+            baseline = self._baseline(toggle)
+            if baseline is not None:
+                saved[toggle] = baseline - self.duration
+            elif self.probes.get(toggle, (0, 0))[1]:
+                before, after = self.probes[toggle]
+                saved[toggle] = self.duration * (before / after - 1)
+            else:
+                saved[toggle] = None
+        return saved
+
+    def report(self):
+        """
+        :return: str. build duration, toggle costs and estimated savings
+        """
+        if self.duration is None:
+            return '{}: not built'.format(self.label)
+
+        lines = ['{}: {:.3f}s'.format(self.label, self.duration)]
+        savings = self.savings()
+        for toggle in TOGGLES:
+            if toggle not in self.costs:
+                continue
+            saved = savings.get(toggle)
+            if saved is None:
+                saved = 'n/a (already switched)'
+            else:
+                # ~ marks estimates from the probes
+                saved = '{}{:.3f}s'.format(
+                    '' if self._baseline(toggle) is not None else '~', saved)
+            lines.append('    {:<10} cost {:.3f}s, saved {}'.format(
+                toggle, self.costs[toggle], saved))
+        return '\n'.join(lines)
+
+    def _baseline(self, toggle):
+        return HISTORY.get(self.label, dict()).get(self.enabled - {toggle})
+
+    def _toggle(self, name, switch):
+        before = _probe()
+        start = default_timer()
+        restore = switch()
+        self.costs[name] = default_timer() - start
+        if restore:
+            self._restore.append((name, restore))
+            self.probes[name] = (before, _probe())
+
+    def _resume(self):
+        # restore in reverse order, carry on past failures
+        error = None
+        while self._restore:
+            name, restore = self._restore.pop()
+            start = default_timer()
+            try:
+                restore()
+            except Exception as e:
+                error = error or e
+            self.costs[name] = \
+                self.costs.get(name, 0.0) + default_timer() - start
+        if error:
+            raise error
+
+    def _pause_undo(self):
+        if not cmds.undoInfo(q=1, state=1):
+            return None
+
+        if self.undo == OFF:
+            cmds.undoInfo(stateWithoutFlush=False)
+            return lambda: cmds.undoInfo(stateWithoutFlush=True)
+
+        cmds.undoInfo(openChunk=True, chunkName=self.label)
+        return lambda: cmds.undoInfo(closeChunk=True)
+
+    def _suspend_refresh(self):
+        if cmds.refresh(q=1, suspend=1):
+            return None
+
+        cmds.refresh(suspend=True)
+        return lambda: cmds.refresh(suspend=False)
+
+    def _pause_evaluation(self):
+        if cmds.ogs(q=1, pause=1):
+            return None
+
+        # a toggle, the second call resumes
+        cmds.ogs(pause=True)
+        return lambda: cmds.ogs(pause=True)
+
+
+def _probe():
+    """
+    Time a short batch of scene edits, best of a few runs
+
+    :return: float. seconds the batch took
+    """
+    best = None
+    for _ in range(PROBE_RUNS):
+        start = default_timer()
+        node = cmds.createNode('transform', n=PROBE_NODE)
+        for index in range(PROBE):
+            cmds.setAttr(node + '.translateX', index)
+        cmds.delete(node)
+        elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
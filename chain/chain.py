@@ -5,9 +5,9 @@ import maya.cmds as cmds
 from Qt import QtWidgets, QtGui, _loadUi
 
 from .. import util
-from ..base import base
+from ..base import base, layout
 from ..constant import UI_DIR, Direction
-from ..utility.rigging import joint, transform
+from ..solver import frame
 
 
 class ChainItem(base.BaseItem):
@@ -54,48 +54,47 @@ class Chain(base.Base):
         self.dir = None
         self.curve = None
 
-    def create_locator(self):
+    def layout(self):
         """
-        Override: create a single chain-like locator
-        parented in hierarchical order
+        Override: chain-like locators parented in hierarchical order
         """
-        for index in range(self.segment):
-            cmds.spaceLocator(n=self.locs[index])
-            if not index:
-                util.uniform_scale(self.locs[index], self._scale)
-            else:
-                cmds.parent(self.locs[index], self.locs[index-1], r=1)
-                distance = (self.interval * self.dir).as_list
-                util.move(self.locs[index], distance)
-        cmds.parent(self.locs[0], util.G_LOC_GRP)
+        return layout.Layout().chain(
+            self.locs, (self.interval * self.dir).as_list, self._scale)
 
     def place_controller(self):
         """
         Override: create and place controllers parented in hierarchical order
         """
         for index in range(self.segment):
-            cmds.duplicate(self._shape, n=self.ctrls[index])
+            self._shape.create(self.ctrls[index])
             cmds.rotate(0, 0, 90, self.ctrls[index])
-            cmds.group(em=1, n=self.offsets[index])
-            transform.clear_xform(
-                self.ctrls[index],
-                self.offsets[index],
-                self.jnts[index]
-            )
+            self.create_offset(index, self.jnts[index])
             if index:
                 cmds.parent(self.offsets[index], self.ctrls[index-1])
 
         cmds.parent(self.offsets[0], util.G_CTRL_GRP)
 
+    def solve_orients(self, positions):
+        """
+        Solve the joint orients of the chain, using rotation minimizing
+        frames so that twisting chains don't flip
+
+        :param positions: np.ndarray. (n, 3) joint world positions
+        :return: np.ndarray. (n, 3) joint orients in degrees
+        """
+        frames = frame.rotation_minimizing_frames(positions)
+        return frame.joint_orients(frames)
+
     def create_joint(self):
         """
-        Override: create a single joint chain
+        Override: create a single joint chain with its final orientation
         """
+        orients = self.solve_orients(self.guide.positions(self.locs))
+
         cmds.select(clear=1)
         for index in range(self.segment):
-            cmds.joint(n=self.jnts[index])
-            transform.match_xform(self.jnts[index], self.locs[index], 1)
+            pos = self.guide.position(self.locs[index])
+            cmds.joint(p=pos, o=orients[index].tolist(), n=self.jnts[index])
             util.uniform_scale(self.jnts[index], self._scale)
 
         cmds.parent(self.jnts[0], util.G_JNT_GRP)
-        joint.orient_joint(self.jnts[0])
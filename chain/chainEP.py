@@ -1,13 +1,15 @@
 import os
 
 import maya.cmds as cmds
+import numpy as np
 from Qt import QtWidgets, _loadUi
 
 from . import chain
 from .. import util, shape
-from ..base import bone, base
-from ..constant import UI_DIR
-from ..utility.rigging import transform
+from ..base import bone, base, guide, layout
+from ..constant import UI_DIR, Falloff
+from ..solver import curve as solver_curve
+from ..solver import falloff, frame
 from ..utility.useful import algorithm
 
 
@@ -51,7 +53,8 @@ class ChainEP(chain.Chain):
     The EP serves as controllers like in a EP-curve with fall-off influence
     """
 
-    def __init__(self, side, name, segment, curve, cv=0):
+    def __init__(self, side, name, segment, curve, cv=0,
+                 mode=Falloff.CONSTRAINT):
         """
         Extend: specify the guide curve and the number of control vertices
         which affects the fall-off influences;
@@ -59,8 +62,11 @@ class ChainEP(chain.Chain):
 
         :param curve: str. curve transform name used for guide
         :param cv: int. number of control vertices
+        :param mode: Falloff enum. drive the joints with point and orient
+                     constraints, or with one matrix blend network each
         """
         super(ChainEP, self).__init__(side, name, segment)
+        self.mode = mode
 
         if not cv:
             cv = self.segment
@@ -92,41 +98,50 @@ class ChainEP(chain.Chain):
 
         self.guide_curve = '{}_curve'.format(self.base)
 
-    def create_locator(self):
+    def layout(self):
         """
-        Override: create guide locators evenly distributed on guide curve
+        Override: guide locators evenly distributed on guide curve, aimed
+        along its tangent and parented in hierarchical order; without the
+        guide curve, like when loading a preset in a new scene, they line up
+        at the origin for the preset to place
         """
-        locs = util.create_locators_on_curve(self.curve, self.segment)
-        for index, loc in enumerate(locs):
-            cmds.rename(loc, self.locs[index])
-            if index:
-                cmds.parent(self.locs[index], self.locs[index-1])
-        cmds.parent(self.locs[0], util.G_LOC_GRP)
+        if not cmds.objExists(self.curve):
+            return layout.Layout().chain(self.locs, [0, 0, 0])
+
+        points, tangents = solver_curve.NurbsCurve.from_scene(
+            self.curve).sample(self.segment)
+        rotations = frame.aim_rotations(tangents)
+
+        worlds = np.tile(np.eye(4), (self.segment, 1, 1))
+        worlds[:, :3, :3] = frame.euler_to_matrix(rotations)
+        worlds[:, 3, :3] = points
+        # chained, then placed back at their world matrices in one pass
+        return layout.Layout().chain(self.locs, [0, 0, 0]).place(
+            guide.Snapshot(self.locs, worlds))
 
     def set_shape(self):
         """
         Override: setup sphere as controller shape
         """
-        self._shape = shape.make_sphere(self._scale)
+        self._shape = shape.sphere(self._scale)
 
     def place_controller(self):
         """
         Override: create and place controller based on control vertices
         """
-        # TODO: use clear_xform
         for index in self.cvs:
-            cmds.duplicate(self._shape, n=self.ctrls[index])
-            cmds.group(em=1, n=self.offsets[index])
-
-            transform.match_xform(self.offsets[index], self.jnts[index])
-
-            cmds.parent(self.ctrls[index], self.offsets[index], r=1)
+            self._shape.create(self.ctrls[index])
+            self.create_offset(index, self.jnts[index])
             cmds.parent(self.offsets[index], util.G_CTRL_GRP)
 
     def add_constraint(self):
         """
         Override: add smooth fall-off constraint between joints and controller
         """
+        if self.mode == Falloff.MATRIX:
+            self.add_falloff_network()
+            return
+
         # smooth fall-off constraint along the chain
         for i in range(len(self.cvs)-1):
             head = self.cvs[i]
@@ -143,3 +158,80 @@ class ChainEP(chain.Chain):
                                       w=1 - ((j-head) * gap), mo=1)
                 cmds.orientConstraint(self.ctrls[tail], self.jnts[j],
                                       w=(j-head) * gap, mo=1)
+
+    def add_falloff_network(self):
+        """
+        Drive every joint with a weighted blend of its two edit point
+        controllers' motion from rest, through blendMatrix, multMatrix and
+        decomposeMatrix nodes instead of two point and two orient
+        constraints
+
+        Like the constraints, a joint moves by the blended translation of
+        its controllers and turns by their blended rotation about its own
+        position: each controller's motion is measured about its rest
+        position, and blendMatrix slerps the rotations instead of adding
+        matrices up.
+
+        For n joints and c edit points this creates 3n utility nodes, where
+        the constraint fall-off creates 2n constraints with 2(n + c - 2)
+        targets
+        """
+        positions = self.guide.positions(self.locs)
+        frames = frame.rotation_minimizing_frames(positions)
+        orients = frame.joint_orients(frames)
+        rests = falloff.rest_matrices(frames, positions)
+        heads, tails, weights = falloff.spans(self.segment, self.cvs)
+
+        # motion of each controller about its rest position, the joints it
+        # influences share it
+        deltas = list()
+        inverses = falloff.inverse_rigid(falloff.rotations(rests[self.cvs]))
+        pivots = falloff.translations(-positions[self.cvs])
+        for index, inverse, pivot in zip(self.cvs, inverses, pivots):
+            delta = cmds.shadingNode(
+                'multMatrix', asUtility=1, n=self.ctrls[index]+'_delta')
+            cmds.setAttr(delta+'.matrixIn[0]', *inverse.ravel().tolist(),
+                         type='matrix')
+            cmds.connectAttr(self.ctrls[index]+'.worldMatrix[0]',
+                             delta+'.matrixIn[1]')
+            cmds.setAttr(delta+'.matrixIn[2]', *pivot.ravel().tolist(),
+                         type='matrix')
+            deltas.append(delta)
+
+        orientations = falloff.rotations(rests)
+        translations = falloff.translations(positions)
+        for index, jnt in enumerate(self.jnts):
+            weight = float(weights[index])
+            if weight == 0:
+                motion = deltas[heads[index]]+'.matrixSum'
+            elif weight == 1:
+                motion = deltas[tails[index]]+'.matrixSum'
+            else:
+                blend = cmds.shadingNode(
+                    'blendMatrix', asUtility=1, n=jnt+'_falloff')
+                cmds.connectAttr(deltas[heads[index]]+'.matrixSum',
+                                 blend+'.inputMatrix')
+                cmds.connectAttr(deltas[tails[index]]+'.matrixSum',
+                                 blend+'.target[0].targetMatrix')
+                cmds.setAttr(blend+'.target[0].weight', weight)
+                motion = blend+'.outputMatrix'
+
+            local = cmds.shadingNode(
+                'multMatrix', asUtility=1, n=jnt+'_falloffLocal')
+            cmds.setAttr(local+'.matrixIn[0]',
+                         *orientations[index].ravel().tolist(), type='matrix')
+            cmds.connectAttr(motion, local+'.matrixIn[1]')
+            cmds.setAttr(local+'.matrixIn[2]',
+                         *translations[index].ravel().tolist(), type='matrix')
+            cmds.connectAttr(jnt+'.parentInverseMatrix', local+'.matrixIn[3]')
+
+            decompose = cmds.shadingNode(
+                'decomposeMatrix', asUtility=1, n=jnt+'_falloffDecompose')
+            cmds.connectAttr(local+'.matrixSum', decompose+'.inputMatrix')
+
+            # the network outputs the whole local rotation, move the
+            # orientation off jointOrient so that rest stays in place
+            cmds.setAttr(jnt+'.jointOrient', 0, 0, 0)
+            cmds.setAttr(jnt+'.rotate', *orients[index].tolist())
+            cmds.connectAttr(decompose+'.outputTranslate', jnt+'.translate')
+            cmds.connectAttr(decompose+'.outputRotate', jnt+'.rotate')
@@ -3,9 +3,8 @@ import maya.cmds as cmds
 from . import chain, chainFK, chainIK
 from .. import util, shape
 from ..base import bone
-from ..constant import ATTRS
+from ..constant import ATTRS, Blend
 from ..utility.datatype import vector
-from ..utility.rigging import joint, transform
 
 
 class ChainFKIKItem(chain.ChainItem):
@@ -27,7 +26,8 @@ class ChainFKIK(chain.Chain):
     in which, the result joint chain is driven by both FK and IK chain
     """
 
-    def __init__(self, side, name, segment, length, direction, is_stretch=1):
+    def __init__(self, side, name, segment, length, direction, is_stretch=1,
+                 blend=Blend.DRIVEN_KEY):
         """
         Extend: create FK/IK and result three-chain system
         specify length and direction of the chain
@@ -36,8 +36,12 @@ class ChainFKIK(chain.Chain):
         :param length: float. total length of rig chain
         :param direction: vector.Vector. world direction from root to top node
         :param is_stretch: bool. allow stretching for the rig
+        :param blend: Blend enum. drive the FK/IK weights and controller
+                      visibilities with driven keys per segment, or with
+                      one reverse node for the whole chain
         """
         super(ChainFKIK, self).__init__(side, name, segment)
+        self.blend = blend
 
         self.ik_chain = chainIK.ChainIK(side, name, segment, length, direction, is_stretch)
         self.fk_chain = chainFK.ChainFK(side, name, segment, length, direction)
@@ -61,13 +65,29 @@ class ChainFKIK(chain.Chain):
         self.offsets.append('{}master_offset'.format(self.base))
         self.ctrls.append('{}master_ctrl'.format(self.base))
 
+    def sub_components(self):
+        """
+        Override: the FK and IK chains are driven explicitly
+        """
+        return [self.ik_chain, self.fk_chain]
+
+    def lod_nodes(self):
+        """
+        Override: the FK and IK chains, the result joints share their base
+        name and keep their constraints, so they follow the held chains
+        """
+        ik, fk = self.ik_chain, self.fk_chain
+        nodes = self.secondary_nodes(
+            ik.jnts + fk.jnts + ik.clusters + [ik.ik_curve, ik.ik])
+        return nodes + ik.lod_nodes()
+
     def set_shape(self):
         """
         Override: setup controller shapes for all three chains
         """
         self.ik_chain.set_shape()
         self.fk_chain.set_shape()
-        self._shape = shape.make_arrow(self._scale)
+        self._shape = shape.arrow(self._scale)
 
     def create_joint(self):
         """
@@ -77,10 +97,11 @@ class ChainFKIK(chain.Chain):
         self.fk_chain.create_joint()
 
         # result jnt
+        orients = self.solve_orients(self.guide.positions(self.locs))
         cmds.select(clear=1)
         for index, loc in enumerate(self.locs):
-            pos = cmds.xform(loc, q=1, t=1, ws=1)
-            cmds.joint(p=pos, n=self.jnts[index])
+            pos = self.guide.position(loc)
+            cmds.joint(p=pos, o=orients[index].tolist(), n=self.jnts[index])
             util.uniform_scale(self.jnts[index], self._scale)
 
         # clean up
@@ -88,7 +109,6 @@ class ChainFKIK(chain.Chain):
         cmds.setAttr(self.fk_chain.jnts[0]+'.v', 0)
 
         cmds.parent(self.jnts[0], util.G_JNT_GRP)
-        joint.orient_joint(self.jnts[0])
 
     def place_controller(self):
         """
@@ -98,10 +118,9 @@ class ChainFKIK(chain.Chain):
         self.fk_chain.place_controller()
 
         # result joint master control
-        cmds.duplicate(self._shape, n=self.ctrls[0])
+        self._shape.create(self.ctrls[0])
         cmds.rotate(0, 0, 90, self.ctrls[0])
-        cmds.group(n=self.offsets[0], em=1)
-        transform.clear_xform(self.ctrls[0], self.offsets[0], self.jnts[0])
+        self.create_offset(0, self.jnts[0])
         cmds.addAttr(
             self.ctrls[0],
             sn='sw', ln=ATTRS['sw'], at='double',
@@ -122,20 +141,24 @@ class ChainFKIK(chain.Chain):
         self.fk_chain.add_constraint()
 
         # IK, FK to result jnt
-        for index in range(self.segment):
-            cons = cmds.parentConstraint(
-                self.ik_chain.jnts[index],
-                self.fk_chain.jnts[index],
-                self.jnts[index])[0]
+        cons = [cmds.parentConstraint(
+            self.ik_chain.jnts[index],
+            self.fk_chain.jnts[index],
+            self.jnts[index])[0] for index in range(self.segment)]
+
+        if self.blend == Blend.UTILITY:
+            self.add_switch(cons)
+            return
 
+        for index in range(self.segment):
             cmds.setDrivenKeyframe(
-                '{}.w0'.format(cons), cd=self.ctrls[0]+'.sw', dv=1, v=1)
+                '{}.w0'.format(cons[index]), cd=self.ctrls[0]+'.sw', dv=1, v=1)
             cmds.setDrivenKeyframe(
-                '{}.w1'.format(cons), cd=self.ctrls[0]+'.sw', dv=1, v=0)
+                '{}.w1'.format(cons[index]), cd=self.ctrls[0]+'.sw', dv=1, v=0)
             cmds.setDrivenKeyframe(
-                '{}.w0'.format(cons), cd=self.ctrls[0]+'.sw', dv=0, v=0)
+                '{}.w0'.format(cons[index]), cd=self.ctrls[0]+'.sw', dv=0, v=0)
             cmds.setDrivenKeyframe(
-                '{}.w1'.format(cons), cd=self.ctrls[0]+'.sw', dv=0, v=1)
+                '{}.w1'.format(cons[index]), cd=self.ctrls[0]+'.sw', dv=0, v=1)
 
             cmds.setDrivenKeyframe(self.ik_chain.ctrls[index]+'.v',
                                    cd=self.ctrls[0]+'.sw', dv=1, v=1)
@@ -145,3 +168,22 @@ class ChainFKIK(chain.Chain):
                                    cd=self.ctrls[0]+'.sw', dv=0, v=1)
             cmds.setDrivenKeyframe(self.fk_chain.ctrls[index]+'.v',
                                    cd=self.ctrls[0]+'.sw', dv=1, v=0)
+
+    def add_switch(self, cons):
+        """
+        Drive the IK weights and controller visibilities straight from the
+        FK_IK attribute, the FK ones from a single reverse node of it
+
+        :param cons: list. parent constraint of every result joint
+        """
+        switch = self.ctrls[0]+'.sw'
+        reverse = cmds.shadingNode(
+            'reverse', asUtility=1, n='{}switch_reverse'.format(self.base))
+        cmds.connectAttr(switch, reverse+'.inputX')
+
+        for index in range(self.segment):
+            cmds.connectAttr(switch, '{}.w0'.format(cons[index]))
+            cmds.connectAttr(reverse+'.outputX', '{}.w1'.format(cons[index]))
+            cmds.connectAttr(switch, self.ik_chain.ctrls[index]+'.v')
+            cmds.connectAttr(
+                reverse+'.outputX', self.fk_chain.ctrls[index]+'.v')
@@ -1,8 +1,10 @@
 import maya.cmds as cmds
+import numpy as np
 
 from . import chain
 from .. import util, shape
-from ..base import bone
+from ..base import bone, offset
+from ..constant import CurveDriver, Offset
 from ..utility.datatype import vector
 
 
@@ -21,7 +23,8 @@ class ChainIK(chain.Chain):
     Create a IK control rig system for a chain-like joints
     """
 
-    def __init__(self, side, name, segment, length, direction, is_stretch=0):
+    def __init__(self, side, name, segment, length, direction, is_stretch=0,
+                 driver=CurveDriver.CLUSTER):
         """
         Extend: specify length and direction of the chain
         and whether it allows for stretching
@@ -29,12 +32,16 @@ class ChainIK(chain.Chain):
         :param length: float. total length of rig chain
         :param direction: vector.Vector. world direction from root to top node
         :param is_stretch: bool. allow stretching for the rig
+        :param driver: CurveDriver enum. move the IK curve's control points
+                       with one cluster each, or connect them to the
+                       controllers' world positions
         """
         super(ChainIK, self).__init__(side, name, segment)
 
         self.interval = length / (self.segment-1)
         self.dir = vector.Vector(direction).normalize()
         self.is_stretch = is_stretch
+        self.driver = driver
 
         self.clusters = list()
         self.ik_curve = None
@@ -60,16 +67,14 @@ class ChainIK(chain.Chain):
         """
         Override: set controller shape as sphere
         """
-        self._shape = shape.make_sphere(self._scale)
+        self._shape = shape.sphere(self._scale)
 
     def build_ik(self):
         """
         Build the IK controller
         """
-        curve_points = list()
-        for index, jnt in enumerate(self.jnts):
-            pos = cmds.xform(jnt, q=1, t=1, ws=1)
-            curve_points.append(pos)
+        # joints are built on the guide, read their rest position from it
+        curve_points = [self.guide.position(loc) for loc in self.locs]
 
         cmds.curve(p=curve_points, n=self.ik_curve)
         cmds.setAttr(self.ik_curve+'.v', 0)
@@ -78,10 +83,13 @@ class ChainIK(chain.Chain):
         cmds.inheritTransform(self.ik_curve, off=1)
         cmds.parent(self.ik_curve, util.G_CTRL_GRP)
 
-        cvs = cmds.ls(self.ik_curve+'.cv[0:]', fl=1)
-        for index, cv in enumerate(cvs):
-            cluster = cmds.cluster(cv, n=self.clusters[index])[-1]
-            cmds.setAttr(cluster+'.v', 0)
+        if self.driver == CurveDriver.MATRIX:
+            self.drive_curve()
+        else:
+            cvs = cmds.ls(self.ik_curve+'.cv[0:]', fl=1)
+            for index, cv in enumerate(cvs):
+                cluster = cmds.cluster(cv, n=self.clusters[index])[-1]
+                cmds.setAttr(cluster+'.v', 0)
 
         cmds.ikHandle(sj=self.jnts[0],
                       ee=self.jnts[self.segment-1],
@@ -91,6 +99,24 @@ class ChainIK(chain.Chain):
         cmds.setAttr(self.ik+'.v', 0)
         cmds.parent(self.ik, util.G_CTRL_GRP)
 
+    def drive_curve(self):
+        """
+        Connect the IK curve's control points to the controllers' world
+        positions through one decomposeMatrix each, so that no cluster
+        deformer gets evaluated
+
+        Every controller sits on its control point at rest, and the curve
+        doesn't inherit transforms, so its object space is world space
+        """
+        shape = cmds.listRelatives(self.ik_curve, s=1)[0]
+        for index, ctrl in enumerate(self.ctrls):
+            decompose = cmds.shadingNode(
+                'decomposeMatrix', asUtility=1, n=ctrl+'_point')
+            cmds.connectAttr(ctrl+'.worldMatrix[0]', decompose+'.inputMatrix')
+            cmds.connectAttr(
+                decompose+'.outputTranslate',
+                '{}.controlPoints[{}]'.format(shape, index))
+
     def add_constraint(self):
         """
         Override: constraint joints with corresponding controllers
@@ -98,8 +124,9 @@ class ChainIK(chain.Chain):
         """
         self.build_ik()
 
-        for index, cluster in enumerate(self.clusters):
-            cmds.parent(cluster+'Handle', self.ctrls[index])
+        if self.driver == CurveDriver.CLUSTER:
+            for index, cluster in enumerate(self.clusters):
+                cmds.parent(cluster+'Handle', self.ctrls[index])
 
         # enable advance twist control
         cmds.setAttr(self.ik+'.dTwistControlEnable', 1)
@@ -116,36 +143,94 @@ class ChainIK(chain.Chain):
 
         self.add_stretch()
 
-    def add_stretch(self):
+    def lod_nodes(self):
         """
-        Add node network for joint stretch ability
-        :return:
+        Override: the stretch network
         """
-        # FIXME: cycle evaluation when stretching
-
-        # mid cluster weighting
-        for index, offset in enumerate(self.offsets):
-            if self.ctrls[index] not in [self.ctrls[0], self.ctrls[-1]]:
-                weight = (1.00 / (self.segment-1)) * index
-                cmds.pointConstraint(self.ctrls[-1], offset, w=weight, mo=1)
-                cmds.pointConstraint(self.ctrls[0], offset, w=1-weight, mo=1)
+        if not self.is_stretch:
+            return list()
+        root, end = self.ctrls[0], self.ctrls[-1]
+        nodes = [end+'_local', end+'_localPoint',
+                 root+'StretchLength', root+'Stretch']
+        nodes.extend(ctrl+'_distance' for ctrl in self.ctrls[:-1])
+        nodes.extend(mid+'_follow' for mid in self.offsets[1:-1])
+        return nodes
 
-        # scaling of the spine
-        arc_len = cmds.arclen(self.ik_curve, constructionHistory=1)
-        ik_info = self.ik_curve + '_info'
-        cmds.rename(arc_len, ik_info)
-        cmds.parent(self.ik_curve, util.G_CTRL_GRP)
-        cmds.setAttr(self.ik_curve+'.v', 0)
+    def add_stretch(self):
+        """
+        Add node network for joint stretch ability
 
-        # create curve length node and multiply node
-        init_len = cmds.getAttr('{}.arcLength'.format(ik_info))
+        The network is acyclic by construction: the mid offsets leave the
+        controller hierarchy for the root controller's space, where they
+        follow the end controller through one blendColors each, and the
+        stretch ratio compares the controller polyline length, measured
+        from world matrices, to its rest length read from the guide
+        """
+        positions = self.guide.positions(self.locs)
+        root, end = self.ctrls[0], self.ctrls[-1]
+        matrix = np.reshape(cmds.xform(root, q=1, m=1, ws=1), (4, 4))
+
+        # nothing the end controller inherits from may follow it
+        mids = self.offsets[1:-1]
+        parents = [cmds.listRelatives(node, p=1)[0] for node in
+                   self.offsets[1:]]
+        moved = [node for node, parent in zip(mids, parents)
+                 if parent != root]
+        if parents[-1] in self.ctrls[1:-1]:
+            moved.append(self.offsets[-1])
+        if moved:
+            cmds.parent(moved, root)
+
+        # end controller position in root controller space
+        local = cmds.shadingNode('multMatrix', asUtility=1, n=end+'_local')
+        cmds.connectAttr(end+'.worldMatrix[0]', local+'.matrixIn[0]')
+        cmds.connectAttr(root+'.worldInverseMatrix[0]', local+'.matrixIn[1]')
+        point = cmds.shadingNode(
+            'decomposeMatrix', asUtility=1, n=end+'_localPoint')
+        cmds.connectAttr(local+'.matrixSum', point+'.inputMatrix')
+
+        # blendColors outputs w * color1 + (1 - w) * color2, so a color2 of
+        # (rest - w * end rest) / (1 - w) offsets the rest position by w
+        # times the end controller's motion, like a weighted point
+        # constraint keeping its offset
+        rest = (positions - matrix[3, :3]).dot(np.linalg.inv(matrix[:3, :3]))
+        weights = np.linspace(0.0, 1.0, self.segment)
+        for index, mid in enumerate(mids, 1):
+            weight = weights[index]
+            color = (rest[index] - weight * rest[-1]) / (1 - weight)
+            blend = cmds.shadingNode(
+                'blendColors', asUtility=1, n=mid+'_follow')
+            cmds.setAttr(blend+'.blender', weight)
+            cmds.setAttr(blend+'.color2', *color.tolist())
+            cmds.connectAttr(point+'.outputTranslate', blend+'.color1')
+            if self.offset_mode == Offset.MATRIX:
+                offset.drive_translate(mid, blend+'.output')
+            else:
+                cmds.connectAttr(blend+'.output', mid+'.translate')
+
+        # stretch ratio of the controller polyline
+        length = cmds.shadingNode(
+            'plusMinusAverage', asUtility=1, n=root+'StretchLength')
+        for index in range(self.segment-1):
+            distance = cmds.shadingNode(
+                'distanceBetween', asUtility=1,
+                n=self.ctrls[index]+'_distance')
+            cmds.connectAttr(self.ctrls[index]+'.worldMatrix[0]',
+                             distance+'.inMatrix1')
+            cmds.connectAttr(self.ctrls[index+1]+'.worldMatrix[0]',
+                             distance+'.inMatrix2')
+            cmds.connectAttr(distance+'.distance',
+                             '{}.input1D[{}]'.format(length, index))
+
+        rest_length = float(
+            np.linalg.norm(np.diff(positions, axis=0), axis=1).sum())
         stretch_node = cmds.shadingNode(
             'multiplyDivide',
             asUtility=1,
-            n=self.ctrls[0]+'Stretch')
+            n=root+'Stretch')
         cmds.setAttr(stretch_node+'.operation', 2)
-        cmds.setAttr(stretch_node+'.i2x', init_len)
-        cmds.connectAttr('{}.arcLength'.format(ik_info), stretch_node+'.i1x')
+        cmds.setAttr(stretch_node+'.i2x', rest_length)
+        cmds.connectAttr(length+'.output1D', stretch_node+'.i1x')
 
         for i in range(self.segment):
             cmds.connectAttr(stretch_node+'.ox', self.jnts[i]+'.sx')
@@ -1,9 +1,8 @@
 import maya.cmds as cmds
 
-from .... import util
-from ....base import base, bone
+from ....base import base, bone, layout
 from ....chain.limb import limbFKIK
-from ....constant import Side
+from ....constant import Side, IKSolver, Blend
 from ....module import hand
 
 
@@ -23,13 +22,16 @@ class Arm(bone.Bone):
     Uses the combination of LimbFKIK and Hand modules
     """
 
-    def __init__(self, side, name, distance=6, interval=0.5, gap=2):
+    def __init__(self, side, name, distance=6, interval=0.5, gap=2,
+                 solver=IKSolver.RP, blend=Blend.DRIVEN_KEY):
         """
         Extend: specify distance, interval and gap for connection
 
         :param distance: float. length of the limb
         :param interval: float. interval for Hand module
         :param gap: float. gap for Hand module
+        :param solver: IKSolver enum. solver of the limb IK chain
+        :param blend: Blend enum. FK/IK switch network of the limb
         """
         super(Arm, self).__init__(side, name)
         self._rtype = 'arm'
@@ -39,7 +41,8 @@ class Arm(bone.Bone):
         self.gap = gap
 
         self.limb = limbFKIK.LimbFKIK(
-            self._side, name, ltype='arm', length=self.distance)
+            self._side, name, ltype='arm', length=self.distance,
+            solver=solver, blend=blend)
 
         self.hand = None
         if self._side == Side.LEFT:
@@ -51,22 +54,23 @@ class Arm(bone.Bone):
 
         self._comps = [self.hand, self.limb]
 
-    def create_locator(self):
+    def layout(self):
         """
-        Extend: move hand and parent it with top of the limb
+        Override: move hand and parent it with top of the limb
         """
-        super(Arm, self).create_locator()
+        result = layout.Layout().extend(self.limb.layout())
+        if not self.hand:
+            return result
 
+        result.extend(self.hand.layout())
         if self._side == Side.LEFT:
-            util.move(
-                self.hand.wrist.locs[0],
-                pos=[self.distance+self.gap, 0, 0])
+            result.move(
+                self.hand.wrist.locs[0], [self.distance+self.gap, 0, 0])
         elif self._side == Side.RIGHT:
-            util.move(
-                self.hand.wrist.locs[0],
-                pos=[-self.distance-self.gap, 0, 0])
+            result.move(
+                self.hand.wrist.locs[0], [-self.distance-self.gap, 0, 0])
 
-        cmds.parent(self.hand.wrist.locs[0], self.limb.locs[-1])
+        return result.attach(self.hand.wrist.locs[0], self.limb.locs[-1])
 
     def add_constraint(self):
         """
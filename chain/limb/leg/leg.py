@@ -1,8 +1,8 @@
 import maya.cmds as cmds
 
-from .... import util
 from ....base import base, bone
 from ....chain.limb import limbFKIK
+from ....constant import IKSolver, Blend
 from ....module import foot
 
 
@@ -22,13 +22,16 @@ class Leg(bone.Bone):
     Uses the combination of LimbFKIK and Foot modules
     """
 
-    def __init__(self, side, name, distance=8, interval=0.5, height=0.4):
+    def __init__(self, side, name, distance=8, interval=0.5, height=0.4,
+                 solver=IKSolver.RP, blend=Blend.DRIVEN_KEY):
         """
         Extend: specify distance, interval and height for connection
 
         :param distance: float. length of the limb
         :param interval: float. interval for Foot module
         :param height: float. gap for Foot module
+        :param solver: IKSolver enum. solver of the limb IK chain
+        :param blend: Blend enum. FK/IK switch, foot roll and bank networks
         """
         super(Leg, self).__init__(side, name)
         self._rtype = 'leg'
@@ -38,20 +41,21 @@ class Leg(bone.Bone):
         self.height = height
 
         self.limb = limbFKIK.LimbFKIK(
-            self._side, name, ltype='leg', length=self.distance)
+            self._side, name, ltype='leg', length=self.distance,
+            solver=solver, blend=blend)
         self.foot = foot.Foot(
-            self._side, name, interval=self.interval, height=self.height)
+            self._side, name, interval=self.interval, height=self.height,
+            blend=blend)
 
         self._comps = [self.limb, self.foot]
 
-    def create_locator(self):
+    def layout(self):
         """
         Extend: move foot and parent it with top of the limb
         """
-        super(Leg, self).create_locator()
-
-        util.move(self.foot.locs[0], [0, -self.distance, 0])
-        cmds.parent(self.foot.locs[0], self.limb.locs[-1])
+        result = super(Leg, self).layout()
+        result.move(self.foot.locs[0], [0, -self.distance, 0])
+        return result.attach(self.foot.locs[0], self.limb.locs[-1])
 
     def add_constraint(self):
         """
@@ -62,6 +66,10 @@ class Leg(bone.Bone):
         # IK constraint #
         cmds.parentConstraint(
             self.foot.rev_jnts[0], self.limb.ik_chain.ctrls[-1], mo=1)
+        if self.limb.blend == Blend.UTILITY:
+            # the foot controller takes over, the end one stays hidden
+            cmds.disconnectAttr(
+                self.limb.ctrls[0]+'.sw', self.limb.ik_chain.ctrls[-1]+'.v')
         cmds.setAttr(self.limb.ik_chain.ctrls[-1]+'.v', 0)
 
         # FK constraint #
@@ -82,15 +90,16 @@ class Leg(bone.Bone):
             v=0)
 
         # controller visibility and channel lock #
-        cmds.setDrivenKeyframe(
-            self.limb.ik_chain.ctrls[-1]+'.v',
-            cd=self.limb.ctrls[0]+'.FK_IK',
-            dv=1,
-            v=0)
-
-        cmds.setDrivenKeyframe(
-            self.limb.ik_chain.ctrls[-1]+'.v',
-            cd=self.limb.ctrls[0]+'.FK_IK',
-            dv=0,
-            v=0)
+        if self.limb.blend == Blend.DRIVEN_KEY:
+            cmds.setDrivenKeyframe(
+                self.limb.ik_chain.ctrls[-1]+'.v',
+                cd=self.limb.ctrls[0]+'.FK_IK',
+                dv=1,
+                v=0)
+
+            cmds.setDrivenKeyframe(
+                self.limb.ik_chain.ctrls[-1]+'.v',
+                cd=self.limb.ctrls[0]+'.FK_IK',
+                dv=0,
+                v=0)
         cmds.setAttr(self.limb.ctrls[0]+'.FK_IK', l=1, k=0)
@@ -1,11 +1,11 @@
 import maya.cmds as cmds
+import numpy as np
 
 from .... import util, shape
-from ....base import bone
+from ....base import bone, layout
 from ....constant import ATTRS
+from ....solver import frame
 from ....utility.common import hierarchy
-from ....utility.datatype import vector
-from ....utility.rigging import joint, transform
 
 
 class LegQuad(bone.Bone):
@@ -60,39 +60,22 @@ class LegQuad(bone.Bone):
         """
         Override: setup controller shapes for quadruped legs
         """
-        self._shape = list(range(3))
-
-        self._shape[0] = shape.make_sphere()
-        self._shape[1] = shape.make_sphere()
-        self._shape[2] = shape.make_circle()
+        self._shape = [shape.sphere(), shape.sphere(), shape.circle()]
         
-    def create_locator(self):
+    def layout(self):
         """
-        Override: create locator guides for quadruped leg placement
+        Override: locator guides for quadruped leg placement
         """
-        for loc in self.locs:
-            cmds.spaceLocator(n=loc)
-
-        cmds.parent(self.locs[1], self.locs[0], r=1)
-        cmds.move(0, -self.distance, 0, self.locs[1], r=1)
-        if self.is_front:
-            cmds.move(0, 0, -0.5 * self.distance, self.locs[1], r=1)
-
-        cmds.parent(self.locs[2], self.locs[1], r=1)
-        cmds.move(0, -self.distance, 0, self.locs[2], r=1)
-        if not self.is_front:
-            cmds.move(0, 0, -0.5 * self.distance, self.locs[2], r=1)
-
-        cmds.parent(self.locs[3], self.locs[2], r=1)
-        cmds.move(0, -self.distance+self.height, 0, self.locs[3], r=1)
-        if self.is_front:
-            cmds.move(0, 0, 0.5 * self.distance, self.locs[3], r=1)
-
-        cmds.parent(self.locs[4], self.locs[3], r=1)
-        cmds.move(0, 0, 0.5 * self.distance, self.locs[4], r=1)
-
-        cmds.parent(self.locs[0], util.G_LOC_GRP)
-        return self.locs[0]
+        distance, front = self.distance, self.is_front
+        return layout.Layout() \
+            .add(self.locs[0]) \
+            .add(self.locs[1], self.locs[0],
+                 [0, -distance, -0.5 * distance if front else 0]) \
+            .add(self.locs[2], self.locs[1],
+                 [0, -distance, 0 if front else -0.5 * distance]) \
+            .add(self.locs[3], self.locs[2],
+                 [0, -distance+self.height, 0.5 * distance if front else 0]) \
+            .add(self.locs[4], self.locs[3], [0, 0, 0.5 * distance])
 
     def create_joint(self):
         """
@@ -100,27 +83,29 @@ class LegQuad(bone.Bone):
         chain for hind/back leg
         """
 
+        positions = self.guide.positions(self.locs)
+
         # result joint chain
+        orients = frame.joint_orients(frame.pole_frames(positions))
         cmds.select(clear=1)
         for index in range(len(self.locs)):
-            loc = cmds.ls(self.locs[index], transforms=1)
-            loc_pos = cmds.xform(loc, q=1, t=1, ws=1)
-            cmds.joint(p=loc_pos, n=self.jnts[index])
+            loc_pos = self.guide.position(self.locs[index])
+            cmds.joint(
+                p=loc_pos, o=orients[index].tolist(), n=self.jnts[index])
 
-        joint.orient_joint(self.jnts[0])
         cmds.parent(self.jnts[0], util.G_JNT_GRP)
 
         if self.is_front:
             return self.jnts[0]
 
         # helper joint chain
+        orients = frame.joint_orients(frame.pole_frames(positions[:-1]))
         cmds.select(clear=1)
         for index in range(len(self.locs[:-1])):
-            loc = cmds.ls(self.locs[index], transforms=1)
-            loc_pos = cmds.xform(loc, q=1, t=1, ws=1)
-            cmds.joint(p=loc_pos, n=self.helpers[index])
+            loc_pos = self.guide.position(self.locs[index])
+            cmds.joint(
+                p=loc_pos, o=orients[index].tolist(), n=self.helpers[index])
 
-        joint.orient_joint(self.helpers[0])
         cmds.parent(self.helpers[0], util.G_JNT_GRP)
         cmds.setAttr(self.helpers[0]+'.v', 0)
         return self.jnts[0]
@@ -129,14 +114,12 @@ class LegQuad(bone.Bone):
         """
         Override: create and place controller for quadruped leg
         """
-        cmds.duplicate(self._shape[0], n=self.ctrls[0])
-        cmds.group(em=1, n=self.offsets[0])
-        transform.clear_xform(self.ctrls[0], self.offsets[0], self.jnts[0])
+        self._shape[0].create(self.ctrls[0])
+        self.create_offset(0, self.jnts[0])
 
         # foot control
-        cmds.duplicate(self._shape[2], n=self.ctrls[3])
-        cmds.group(em=1, n=self.offsets[3])
-        transform.clear_xform(self.ctrls[3], self.offsets[3], self.locs[3])
+        self._shape[2].create(self.ctrls[3])
+        self.create_offset(3, self.locs[3])
 
         # custom attribute for later pivot group access
         cmds.addAttr(self.ctrls[3],
@@ -153,13 +136,8 @@ class LegQuad(bone.Bone):
 
         # ankle control - pole vector
         pole_index = 1 if self.is_front else 2
-        cmds.duplicate(self._shape[1], n=self.ctrls[pole_index])
-        cmds.group(em=1, n=self.offsets[pole_index])
-        transform.clear_xform(
-            self.ctrls[pole_index],
-            self.offsets[pole_index],
-            self.jnts[pole_index]
-        )
+        self._shape[1].create(self.ctrls[pole_index])
+        self.create_offset(pole_index, self.jnts[pole_index])
         hierarchy.batch_parent(
             [self.offsets[0],
              self.offsets[3],
@@ -189,40 +167,47 @@ class LegQuad(bone.Bone):
                 sol='ikRPsolver')
             cmds.setAttr(self.helper_ik+'.v', 0)
 
+    def lod_nodes(self):
+        """
+        Override: the helper chain and the stretch network
+        """
+        nodes = self.secondary_nodes(self.helpers + [self.helper_ik])
+        nodes.extend('{}{}'.format(self.base, name) for name in
+                     ('length_node', 'stretch_node', 'condition_node'))
+        return nodes
+
     def add_measurement(self):
         """
         Create node network for measuring leg length for stretching
         """
-        hip_vec = vector.Vector(cmds.xform(self.jnts[0], q=1, ws=1, t=1))
-        knee_vec = vector.Vector(cmds.xform(self.jnts[1], q=1, ws=1, t=1))
-        ankle_vec = vector.Vector(cmds.xform(self.jnts[2], q=1, ws=1, t=1))
-        foot_vec = vector.Vector(cmds.xform(self.jnts[3], q=1, ws=1, t=1))
-
-        ankle_to_knee = (ankle_vec - knee_vec).length
-        foot_to_ankle = (foot_vec - ankle_vec).length
-        hip_to_knee = (knee_vec - hip_vec).length
+        # joints are built on the guide, read their rest position from it
+        hip_pos, knee_pos, ankle_pos, foot_pos = self.guide.positions(
+            self.locs[:4])
+        hip_to_knee, ankle_to_knee, foot_to_ankle = np.linalg.norm(
+            [knee_pos - hip_pos, ankle_pos - knee_pos, foot_pos - ankle_pos],
+            axis=1).tolist()
 
         straighten_len = ankle_to_knee + hip_to_knee
         if not self.is_front:
             straighten_len += foot_to_ankle
 
-        # create measurement
-        if not self.is_front:
-            measure_shape = cmds.distanceDimension(
-                sp=hip_vec.as_list, ep=foot_vec.as_list)
-        else:
-            measure_shape = cmds.distanceDimension(
-                sp=hip_vec.as_list, ep=ankle_vec.as_list)
-
-        locs = cmds.listConnections(measure_shape)
-        measure_node = cmds.listRelatives(
-            measure_shape, parent=1, type='transform')
-        length_node = '{}length_node'.format(self.base)
-        hip_loc = '{}hip_node'.format(self.base)
-        ankle_loc = '{}ankle_node'.format(self.base)
-        cmds.rename(measure_node, length_node)
-        cmds.rename(locs[0], hip_loc)
-        cmds.rename(locs[1], ankle_loc)
+        # measure from the controllers' world matrices: the hip from the
+        # root controller, the end point rigidly following the foot one
+        end_pos = ankle_pos if self.is_front else foot_pos
+        foot_matrix = np.reshape(
+            cmds.xform(self.ctrls[3], q=1, m=1, ws=1), (4, 4))
+        end_local = (end_pos - foot_matrix[3, :3]).dot(
+            np.linalg.inv(foot_matrix[:3, :3]))
+
+        length_node = cmds.shadingNode(
+            'distanceBetween',
+            asUtility=1,
+            n='{}length_node'.format(self.base))
+        cmds.connectAttr(self.ctrls[0]+'.worldMatrix[0]',
+                         length_node+'.inMatrix1')
+        cmds.connectAttr(self.ctrls[3]+'.worldMatrix[0]',
+                         length_node+'.inMatrix2')
+        cmds.setAttr(length_node+'.point2', *end_local.tolist())
 
         stretch_node = cmds.shadingNode(
             'multiplyDivide',
@@ -250,15 +235,6 @@ class LegQuad(bone.Bone):
             cmds.connectAttr(condition_node+'.ocr', self.jnts[0]+'.sx')
             cmds.connectAttr(condition_node+'.ocr', self.jnts[1]+'.sx')
 
-        cmds.setAttr(length_node+'.v', 0)
-        cmds.setAttr(hip_loc+'.v', 0)
-        cmds.setAttr(ankle_loc+'.v', 0)
-        hierarchy.batch_parent(
-            [length_node, hip_loc, ankle_loc], util.G_CTRL_GRP)
-
-        cmds.parentConstraint(self.ctrls[0], hip_loc)
-        cmds.parentConstraint(self.ctrls[3], ankle_loc, mo=1)
-
     def add_constraint(self):
         """
         Override: build IK system, connect controllers and joints
@@ -277,9 +253,9 @@ class LegQuad(bone.Bone):
         swivel_pivot = cmds.group(em=1, n='{}swivel_piv'.format(self.base))
         tip_pivot = cmds.group(em=1, n='{}tip_piv'.format(self.base))
 
-        wrist_pos = cmds.xform(self.jnts[2], q=1, ws=1, t=1)
-        foot_pos = cmds.xform(self.jnts[3], q=1, ws=1, t=1)
-        toe_pos = cmds.xform(self.jnts[4], q=1, ws=1, t=1)
+        wrist_pos = self.guide.position(self.locs[2])
+        foot_pos = self.guide.position(self.locs[3])
+        toe_pos = self.guide.position(self.locs[4])
 
         cmds.move(foot_pos[0], foot_pos[1], foot_pos[2], flex_pivot)
         cmds.move(foot_pos[0], foot_pos[1], foot_pos[2], tap_pivot)
@@ -1,5 +1,6 @@
 from ...chain import chainFK
 from ...constant import Side
+from ...solver import frame
 
 
 class LimbFK(chainFK.ChainFK):
@@ -22,3 +23,9 @@ class LimbFK(chainFK.ChainFK):
             self.direction = [-1, 0, 0]
 
         super(LimbFK, self).__init__(side, name, 3, length, self.direction)
+
+    def solve_orients(self, positions):
+        """
+        Override: limb joints share the pole plane of the rotate plane IK
+        """
+        return frame.joint_orients(frame.pole_frames(positions))
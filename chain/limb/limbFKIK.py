@@ -1,7 +1,8 @@
 from ...chain import chainFKIK
 from ...chain.limb import limbIK, limbFK
-from ...constant import Side
+from ...constant import Side, IKSolver, Blend
 from ...base import base
+from ...solver import frame
 from ...utility.datatype import vector
 
 
@@ -19,11 +20,14 @@ class LimbFKIK(chainFKIK.ChainFKIK):
     Create a FK/IK control rig system for limb
     """
 
-    def __init__(self, side, name, length=5, ltype='arm'):
+    def __init__(self, side, name, length=5, ltype='arm',
+                 solver=IKSolver.RP, blend=Blend.DRIVEN_KEY):
         """
         Extend: specify limb type and side determines direction
 
         :param ltype: str. type of the limb: 'arm' or 'leg'
+        :param solver: IKSolver enum. solver of the IK chain
+        :param blend: Blend enum. FK/IK switch network
         """
         self._rtype = ltype
 
@@ -33,10 +37,18 @@ class LimbFKIK(chainFKIK.ChainFKIK):
         elif ltype == 'arm' and side == Side.RIGHT:
             self.direction = [-1, 0, 0]
 
-        super(LimbFKIK, self).__init__(side, name, 3, length, self.direction, 0)
-        self.ik_chain = limbIK.LimbIK(side, name, length)
+        super(LimbFKIK, self).__init__(
+            side, name, 3, length, self.direction, 0, blend=blend)
+        self.ik_chain = limbIK.LimbIK(
+            side, name, length, solver=solver)
         self.fk_chain = limbFK.LimbFK(side, name, length)
 
         # master controller location
         self.interval = length / (self.segment-1)
         self.dir = vector.Vector(self.direction).normalize()
+
+    def solve_orients(self, positions):
+        """
+        Override: limb joints share the pole plane of the rotate plane IK
+        """
+        return frame.joint_orients(frame.pole_frames(positions))
@@ -1,10 +1,15 @@
 import maya.cmds as cmds
+import numpy as np
 
 from ... import util
 from ...chain import chainIK
-from ...constant import Side
+from ...constant import Side, IKSolver
+from ...solver import frame, twobone
 from ...utility.rigging import joint
-from ...utility.rigging import transform
+
+
+# pole offset towards the rest knee, as a fraction of the limb length
+POLE_NUDGE = 1e-3
 
 
 class LimbIK(chainIK.ChainIK):
@@ -12,13 +17,16 @@ class LimbIK(chainIK.ChainIK):
     Create a IK control rig system for limb
     """
 
-    def __init__(self, side, name, length, ltype=None):
+    def __init__(self, side, name, length, ltype=None, solver=IKSolver.RP):
         """
         Extend: specify limb type and side determines direction
 
         :param ltype: str. type of the limb: 'arm' or 'leg'
+        :param solver: IKSolver enum. RP solver handle, or the analytic
+                       utility node network
         """
         self._rtype = ltype
+        self.solver = solver
 
         self.direction = [0, -1, 0]
         if ltype == 'arm' and side == Side.LEFT:
@@ -28,6 +36,23 @@ class LimbIK(chainIK.ChainIK):
 
         super(LimbIK, self).__init__(side, name, 3, length, self.direction)
 
+    def solve_orients(self, positions):
+        """
+        Override: limb joints share the pole plane of the rotate plane IK
+        """
+        return frame.joint_orients(frame.pole_frames(positions))
+
+    def is_vertical(self):
+        """
+        Whether the limb hangs along the world y axis, like a leg, read from
+        the reach line of its guide
+
+        :return: bool. True for a vertical limb
+        """
+        start, end = self.guide.positions([self.locs[0], self.locs[-1]])
+        reach = np.abs(end - start)
+        return bool(reach[1] > max(reach[0], reach[2]))
+
     def place_controller(self):
         """
         Override: create and place root, IK pole and top controllers
@@ -35,17 +60,15 @@ class LimbIK(chainIK.ChainIK):
         # TODO: move pole vector out
 
         for index in range(self.segment):
-            cmds.duplicate(self._shape, n=self.ctrls[index])
-            cmds.group(em=1, n=self.offsets[index])
-            transform.match_xform(self.offsets[index], self.jnts[index])
-            cmds.parent(self.ctrls[index], self.offsets[index], r=1)
+            self._shape.create(self.ctrls[index])
+            self.create_offset(index, self.jnts[index])
             cmds.parent(self.offsets[index], util.G_CTRL_GRP)
 
     def build_ik(self):
         """
         Override: build the IK controller for limb using RP solver
         """
-        if self.direction == 'vertical':
+        if self.is_vertical():
             joint.set_prefer_angle(self.jnts[1], [0, 0, -1])
         else:
             joint.set_prefer_angle(self.jnts[1], [0, 0, 1])
@@ -55,10 +78,174 @@ class LimbIK(chainIK.ChainIK):
             ee=self.jnts[-1],
             n=self.ik, sol='ikRPsolver')
 
+    def build_analytic(self):
+        """
+        Build a two-bone IK out of utility nodes: the law of cosines places
+        the mid joint in the plane of the pole controller, then both upper
+        joints get their world frame assembled from the solved bone
+        directions, see solver.twobone.solve for the same math in NumPy
+        """
+        positions = self.guide.positions(self.locs)
+        upper, lower = np.linalg.norm(
+            np.diff(positions, axis=0), axis=1).tolist()
+        frames = frame.pole_frames(positions)
+        orients = frame.joint_orients(frames)
+
+        # the knee side of the rest chain, from the prefer angle when the
+        # guide is straight; nudging the pole along it keeps the pole plane
+        # defined when the pole controller sits on the reach line
+        line = positions[2] - positions[0]
+        line /= np.linalg.norm(line)
+        knee = positions[1] - positions[0]
+        knee -= knee.dot(line) * line
+        if np.linalg.norm(knee) < 1e-6 * upper:
+            knee = frames[1, 1] * (1 if self.is_vertical() else -1)
+        knee *= POLE_NUDGE * (upper + lower) / np.linalg.norm(knee)
+        sign = twobone.bend_sign(
+            positions[0], positions[2], positions[1] + knee, frames[0, 2])
+
+        root, pole, end = self.ctrls
+        prefix = '{}ik'.format(self.base)
+
+        def node(ntype, suffix):
+            return cmds.shadingNode(ntype, asUtility=1, n=prefix+suffix)
+
+        def vector(suffix, operation, first, second=None):
+            # vectorProduct: 0 normalizes first, 2 crosses first and second
+            product = node('vectorProduct', suffix)
+            cmds.setAttr(product+'.operation', operation)
+            cmds.setAttr(product+'.normalizeOutput', 1)
+            cmds.connectAttr(first, product+'.input1')
+            if second:
+                cmds.connectAttr(second, product+'.input2')
+            return product+'.output'
+
+        def scale(suffix, vec, scalar):
+            product = node('multiplyDivide', suffix)
+            cmds.connectAttr(vec, product+'.input1')
+            for axis in 'XYZ':
+                cmds.connectAttr(scalar, product+'.input2'+axis)
+            return product+'.output'
+
+        def combine(suffix, operation, *plugs):
+            # plusMinusAverage: 1 sums, 2 subtracts from the first
+            total = node('plusMinusAverage', suffix)
+            cmds.setAttr(total+'.operation', operation)
+            for index, plug in enumerate(plugs):
+                cmds.connectAttr(plug, '{}.input3D[{}]'.format(total, index))
+            return total+'.output3D'
+
+        nudge = np.eye(4)
+        nudge[3, :3] = knee.dot(frames[1].T)
+        pole_matrix = node('multMatrix', 'PoleNudge')
+        cmds.setAttr(pole_matrix+'.matrixIn[0]', *nudge.ravel().tolist(),
+                     type='matrix')
+        cmds.connectAttr(pole+'.worldMatrix[0]', pole_matrix+'.matrixIn[1]')
+
+        points = list()
+        for plug, suffix in ((root+'.worldMatrix[0]', 'Start'),
+                             (end+'.worldMatrix[0]', 'Target'),
+                             (pole_matrix+'.matrixSum', 'Pole')):
+            point = node('decomposeMatrix', suffix)
+            cmds.connectAttr(plug, point+'.inputMatrix')
+            points.append(point+'.outputTranslate')
+        start, target, pole_point = points
+
+        # reach, clamped between the folded and the straight chain
+        reach = node('distanceBetween', 'Reach')
+        cmds.connectAttr(root+'.worldMatrix[0]', reach+'.inMatrix1')
+        cmds.connectAttr(end+'.worldMatrix[0]', reach+'.inMatrix2')
+        limit = node('clamp', 'ReachLimit')
+        cmds.setAttr(limit+'.minR', max(abs(upper - lower), 1e-6))
+        cmds.setAttr(limit+'.maxR', upper + lower)
+        cmds.connectAttr(reach+'.distance', limit+'.inputR')
+        distance = limit+'.outputR'
+
+        # mid joint projection along the reach: (d^2 + a^2 - b^2) / 2d
+        square = node('multiplyDivide', 'ReachSquare')
+        cmds.connectAttr(distance, square+'.input1X')
+        cmds.connectAttr(distance, square+'.input2X')
+        cmds.connectAttr(distance, square+'.input1Y')
+        cmds.setAttr(square+'.input2Y', 2)
+        numerator = node('plusMinusAverage', 'AlongSum')
+        cmds.connectAttr(square+'.outputX', numerator+'.input1D[0]')
+        cmds.setAttr(numerator+'.input1D[1]', upper ** 2 - lower ** 2)
+        along = node('multiplyDivide', 'Along')
+        cmds.setAttr(along+'.operation', 2)
+        cmds.connectAttr(numerator+'.output1D', along+'.input1X')
+        cmds.connectAttr(square+'.outputY', along+'.input2X')
+
+        # and its height off the reach: sqrt(a^2 - along^2)
+        along_square = node('multiplyDivide', 'AlongSquare')
+        cmds.connectAttr(along+'.outputX', along_square+'.input1X')
+        cmds.connectAttr(along+'.outputX', along_square+'.input2X')
+        height_square = node('plusMinusAverage', 'HeightSquare')
+        cmds.setAttr(height_square+'.operation', 2)
+        cmds.setAttr(height_square+'.input1D[0]', upper ** 2)
+        cmds.connectAttr(along_square+'.outputX',
+                         height_square+'.input1D[1]')
+        positive = node('clamp', 'HeightLimit')
+        cmds.setAttr(positive+'.maxR', upper ** 2)
+        cmds.connectAttr(height_square+'.output1D', positive+'.inputR')
+        height = node('multiplyDivide', 'Height')
+        cmds.setAttr(height+'.operation', 3)
+        cmds.connectAttr(positive+'.outputR', height+'.input1X')
+        cmds.setAttr(height+'.input2X', 0.5)
+
+        # pole plane: x along the reach, z the bend axis, y towards the pole
+        aim = vector('Aim', 0, combine('ReachVector', 2, target, start))
+        to_pole = combine('PoleVector', 2, pole_point, start)
+        if sign > 0:
+            bend = vector('Bend', 2, aim, to_pole)
+            side = vector('Side', 2, bend, aim)
+        else:
+            bend = vector('Bend', 2, to_pole, aim)
+            side = vector('Side', 2, aim, bend)
+
+        upper_vec = combine(
+            'UpperVector', 1,
+            scale('AlongVector', aim, along+'.outputX'),
+            scale('HeightVector', side, height+'.outputX'))
+        lower_vec = combine(
+            'LowerVector', 2,
+            scale('ReachScaled', aim, distance), upper_vec)
+
+        for index, bone in enumerate((upper_vec, lower_vec)):
+            jnt = self.jnts[index]
+            suffix = ('Upper', 'Lower')[index]
+            x_axis = vector(suffix+'Aim', 0, bone)
+            y_axis = vector(suffix+'Up', 2, bend, x_axis)
+
+            world = node('fourByFourMatrix', suffix+'Frame')
+            for row, axis in enumerate((x_axis, y_axis, bend)):
+                for column, channel in enumerate('XYZ'):
+                    cmds.connectAttr(
+                        axis+channel,
+                        '{}.in{}{}'.format(world, row, column))
+
+            # rotate = world * parent inverse * jointOrient inverse
+            orient = np.eye(4)
+            orient[:3, :3] = frame.euler_to_matrix(orients[index:index+1])[0].T
+            local = node('multMatrix', suffix+'Local')
+            cmds.connectAttr(world+'.output', local+'.matrixIn[0]')
+            cmds.connectAttr(jnt+'.parentInverseMatrix', local+'.matrixIn[1]')
+            cmds.setAttr(local+'.matrixIn[2]', *orient.ravel().tolist(),
+                         type='matrix')
+            rotation = node('decomposeMatrix', suffix+'Rotate')
+            cmds.connectAttr(local+'.matrixSum', rotation+'.inputMatrix')
+            cmds.connectAttr(rotation+'.outputRotate', jnt+'.rotate')
+
     def add_constraint(self):
         """
         Override: no stretching support
         """
+        if self.solver == IKSolver.ANALYTIC:
+            self.build_analytic()
+            cmds.orientConstraint(self.ctrls[-1], self.jnts[-1], mo=1)
+            cmds.pointConstraint(self.ctrls[0], self.jnts[0], mo=1)
+            cmds.parent(self.offsets[1], self.ctrls[0])
+            return
+
         self.build_ik()
 
         cmds.pointConstraint(self.ctrls[-1], self.ik, mo=1)
@@ -1,5 +1,6 @@
 from ...base import base
 from ...chain import chainIK
+from ...constant import CurveDriver
 
 
 class SpineItem(base.BaseItem):
@@ -16,9 +17,14 @@ class Spine(chainIK.ChainIK):
     Create a IK control rig system for biped spine
     """
 
-    def __init__(self, side, name, length=6.0, segment=6):
+    def __init__(self, side, name, length=6.0, segment=6,
+                 driver=CurveDriver.CLUSTER):
         """
         Override: specify the direction to be world Y-up
+
+        :param driver: CurveDriver enum. how the IK curve follows the
+                       controllers
         """
-        super(Spine, self).__init__(side, name, segment, length, [0, 1, 0], 0)
+        super(Spine, self).__init__(
+            side, name, segment, length, [0, 1, 0], 0, driver)
         self._rtype = 'spine'
@@ -1,5 +1,6 @@
 from ...base import base
 from ...chain import chainIK
+from ...constant import CurveDriver
 
 
 class SpineQuadItem(base.BaseItem):
@@ -16,10 +17,15 @@ class SpineQuad(chainIK.ChainIK):
     Create a IK control rig system for quadruped spine
     """
 
-    def __init__(self, side, name, length=6.0, segment=6):
+    def __init__(self, side, name, length=6.0, segment=6,
+                 driver=CurveDriver.CLUSTER):
         """
         Override: specify the direction to be world Z-forward
+
+        :param driver: CurveDriver enum. how the IK curve follows the
+                       controllers
         """
-        super(SpineQuad, self).__init__(side, name, segment, length, [0, 0, 1], 0)
+        super(SpineQuad, self).__init__(
+            side, name, segment, length, [0, 0, 1], 0, driver)
 
         self._rtype = 'qspine'
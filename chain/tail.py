@@ -1,5 +1,6 @@
 from ..base import base
 from ..chain import chainFKIK
+from ..constant import Blend
 
 
 class TailItem(base.BaseItem):
@@ -16,9 +17,13 @@ class Tail(chainFKIK.ChainFKIK):
     Create a Tail rig system with FK/IK controls
     """
 
-    def __init__(self, side, name, segment=6, length=4.0, direction=[0, -1, 0]):
+    def __init__(self, side, name, segment=6, length=4.0, direction=[0, -1, 0],
+                 blend=Blend.DRIVEN_KEY):
         """
         Extend: specify rig type
+
+        :param blend: Blend enum. FK/IK switch network
         """
-        super(Tail, self).__init__(side, name, segment, length, direction)
+        super(Tail, self).__init__(
+            side, name, segment, length, direction, blend=blend)
         # self._rtype = 'tail'
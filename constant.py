@@ -7,6 +7,9 @@ PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 UI_DIR = os.path.join(PROJECT_ROOT, 'ui')
 ICON_DIR = os.path.join(UI_DIR, 'icon')
 
+# release of the rig builders, invalidates cached rigs when it changes
+VERSION = '2.0'
+
 # custom attribute short name long name mapping to be added on controllers
 ATTRS = {
     # quad foot
@@ -19,7 +22,9 @@ ATTRS = {
     'fr': 'foot_roll',
     'fb': 'foot_bank',
     # fk ik switch
-    'sw': 'FK_IK'
+    'sw': 'FK_IK',
+    # runtime level of detail
+    'lod': 'lod'
 }
 
 
@@ -47,3 +52,33 @@ class Direction(Enum):
     Z_POSITIVE = [0, 0, 1]
     Z_NEGATIVE = [0, 0, -1]
 
+
+
+@unique
+class Falloff(Enum):
+    CONSTRAINT = 'constraint'
+    MATRIX = 'matrix'
+
+
+@unique
+class CurveDriver(Enum):
+    CLUSTER = 'cluster'
+    MATRIX = 'matrix'
+
+
+@unique
+class IKSolver(Enum):
+    RP = 'ikRPsolver'
+    ANALYTIC = 'analytic'
+
+
+@unique
+class Blend(Enum):
+    DRIVEN_KEY = 'drivenKey'
+    UTILITY = 'utility'
+
+
+@unique
+class Offset(Enum):
+    GROUP = 'group'
+    MATRIX = 'matrix'
@@ -1,5 +1,7 @@
 import maya.cmds as cmds
 
+from ..base import registry
+
 
 #TODO: re-write this
 
@@ -8,6 +10,7 @@ class Head(create_locator.Bone):
     def __init__(self, id, side='NA'):
         create_locator.Bone.__init__(self, side, id)
         self.metaType = 'Face'
+        self.registry = registry.Registry()
 
         self.constructNameSpace(self.metaType)
         self.set_locator_attr()
@@ -17,6 +20,7 @@ class Head(create_locator.Bone):
         self.distance = distance
         self.scale = scale
     
+    @registry.recorded
     def create_locator(self):
         self.eyeLocators()
         #self.lipLocators()
@@ -107,7 +111,7 @@ class Head(create_locator.Bone):
         jawEndLoc = cmds.spaceLocator(n='Loc_Face_JawEnd')
         cmds.move(0, 325*self.distance, 0, jawEndLoc)
     
-        curves = cmds.ls("CV_*")
+        curves = self.registry.match("CV_*")
         for curve in curves:
             cvs = cmds.ls(curve+'.cv[0:]', fl=1)
             for i, cv in enumerate(cvs):
@@ -130,17 +134,18 @@ class Head(create_locator.Bone):
                     cmds.parent(faceCluster[1], faceLoc)
     
     def groupLocators(self):
-        locs = cmds.ls('Loc_Face_*', transforms=1)
+        locs = self.registry.match('Loc_Face_*')
         locGrp = cmds.group(em=1, name='FaceLoc_Grp')
         cmds.parent(locs, locGrp)
     
-        crvs = cmds.ls('CV_*', transforms=1)
+        crvs = self.registry.match('CV_*')
         crvGrp = cmds.group(em=1, name='FaceCV_Grp')
         cmds.parent(crvs, crvGrp)
     
+    @registry.recorded
     def create_joint(self):
         jointGrp = cmds.group(em=1, name='Joint_Grp')
-        allLocs = cmds.ls('Loc_Face_*', transforms=1)
+        allLocs = self.registry.match('Loc_Face_*')
         for loc in allLocs:
             locPos = cmds.xform(loc, q=1, t=1, ws=1)
             cmds.select(clear=1)
@@ -151,20 +156,22 @@ class Head(create_locator.Bone):
         self.parentJoint()
     
     def parentJoint(self):
-        leftEyeLidJnt = cmds.ls('Jnt_Face_L*EyeLid*')
-        rightEyeLidJnt = cmds.ls('Jnt_Face_R*EyeLid*')
-        smileJnt = cmds.ls('Jnt_Face*Smile*')
-        foreHeadJnt = cmds.ls('Jnt_Face*ForeHeadBrow*')
-        eyeBrowJnt = cmds.ls('Jnt_Face*EyeBrow*')
-        lipJnt = cmds.ls('Jnt_Face*Lip*')
-        eyeCenterJnt = cmds.ls('Jnt_Face*EyeCenter')
-        cheekJnt = cmds.ls('Jnt_Face*Cheek')
+        leftEyeLidJnt = self.registry.match('Jnt_Face_L*EyeLid*')
+        rightEyeLidJnt = self.registry.match('Jnt_Face_R*EyeLid*')
+        smileJnt = self.registry.match('Jnt_Face*Smile*')
+        foreHeadJnt = self.registry.match('Jnt_Face*ForeHeadBrow*')
+        eyeBrowJnt = self.registry.match('Jnt_Face*EyeBrow*')
+        lipJnt = self.registry.match('Jnt_Face*Lip*')
+        eyeCenterJnt = self.registry.match('Jnt_Face*EyeCenter')
+        cheekJnt = self.registry.match('Jnt_Face*Cheek')
+        leftEyeCenterJnt = self.registry.match('Jnt*L_EyeCenter')
+        rightEyeCenterJnt = self.registry.match('Jnt*R_EyeCenter')
     
         for jnt in leftEyeLidJnt:
-            cmds.parent(jnt, 'Jnt*L_EyeCenter')
+            cmds.parent(jnt, leftEyeCenterJnt[0])
     
         for jnt in rightEyeLidJnt:
-            cmds.parent(jnt, 'Jnt*R_EyeCenter')
+            cmds.parent(jnt, rightEyeCenterJnt[0])
     
         for jnt in smileJnt+foreHeadJnt+eyeBrowJnt+lipJnt+eyeCenterJnt+cheekJnt:
             cmds.parent(jnt, 'Jnt_Face_Center')
@@ -173,10 +180,11 @@ class Head(create_locator.Bone):
         cmds.parent('Jnt_Face_JawEnd', 'Jnt_Face_Center')
         cmds.parent('Jnt_Face_Head', 'Jnt_Face_Center')
     
+    @registry.recorded
     def place_controller(self):
         ctrlGrp = cmds.group(em=1, name='FaceCtrl_Grp')
         for side in ['L', 'R']:
-            allJnts = cmds.ls('Jnt_Face_%s*' % side)
+            allJnts = self.registry.match('Jnt_Face_%s*' % side)
             for jnt in allJnts:
                 ctrl = cmds.circle(nr=(0, 0, 1), c=(0, 0, 0), radius=0.07, s=6, name='Ctrl_Face_%s' % jnt.split('Jnt_Face_')[1])
                 ctrlOffsetGrp = cmds.group(em=1, n='CtrlOffset_Face_%s' % jnt.split('Jnt_Face_')[1])
@@ -210,11 +218,12 @@ class Head(create_locator.Bone):
         cmds.move(jawEndPos[0], jawEndPos[1], jawEndPos[2], jawCtrl + '.scalePivot')
         cmds.parent(jawCtrl, ctrlGrp)
     
+    @registry.recorded
     def add_constraint(self):
         self.connectNode()
 
         filteredCtrl = []
-        allCtrls = cmds.ls('Ctrl_Face*', transforms=1)
+        allCtrls = self.registry.match('Ctrl_Face*')
         for ctrl in allCtrls:
             if 'EyeLid' in ctrl or 'Jaw' in ctrl:
                 name = ctrl.split('Ctrl_Face')[1]
@@ -238,13 +247,13 @@ class Head(create_locator.Bone):
         self.lock_controller()
 
     def connectNode(self):
-        allctrls = cmds.ls("Ctrl_Face*", transforms=1)
+        allctrls = self.registry.match("Ctrl_Face*")
         for ctrl in allctrls:
             cmds.makeIdentity(ctrl, apply=1, t=1, s=1, r=1)
-        allctrloffsets = cmds.ls("CtrlOffset_Face*", transforms=1)
+        allctrloffsets = self.registry.match("CtrlOffset_Face*")
 
         for side in 'LR':
-            eyeLidCtrl = cmds.ls('Ctrl_Face_%s_*EyeLid*' % side, transforms=1)
+            eyeLidCtrl = self.registry.match('Ctrl_Face_%s_*EyeLid*' % side)
             eyeCenterPos = cmds.xform('Jnt_Face_%s_EyeCenter' % side, q=1, t=1, ws=1)
             for ctrl in eyeLidCtrl:
                 cmds.move(eyeCenterPos[0], eyeCenterPos[1], eyeCenterPos[2], ctrl+'.scalePivot')
@@ -301,13 +310,13 @@ class Head(create_locator.Bone):
                 cmds.connectAttr(multNode+'.output', ctrl+'.translate')
 
     def colorController(self):
-        allCtrls = cmds.ls('Ctrl_Face_*')
+        allCtrls = self.registry.match('Ctrl_Face_*')
         for ctrl in allCtrls:
             cmds.setAttr(ctrl+'.overrideEnabled', 1)
             cmds.setAttr(ctrl+'.overrideColor', 17)
         for side in 'LR':
             if side is 'L':
-                controllers = cmds.ls('Ctrl_Face_L*')
+                controllers = self.registry.match('Ctrl_Face_L*')
                 for ctrl in controllers:
                     if 'Ctrl_Face_L_LowerLip_0' in ctrl or 'Ctrl_Face_L_UpperLip_0' in ctrl:
                         pass
@@ -315,12 +324,12 @@ class Head(create_locator.Bone):
                         cmds.setAttr(ctrl+'.overrideColor', 6)
 
             elif side is 'R':
-                controllers = cmds.ls('Ctrl_Face_R*')
+                controllers = self.registry.match('Ctrl_Face_R*')
                 for ctrl in controllers:
                     cmds.setAttr(ctrl+'.overrideColor', 13)
 
     def lock_controller(self):
-        allCtrls = cmds.ls('Ctrl_Face_*', transforms=1)
+        allCtrls = self.registry.match('Ctrl_Face_*')
         for ctrl in allCtrls:
             cmds.setAttr(ctrl+'.v', k=0, l=1)
             for axis in 'xyz':
@@ -345,9 +354,9 @@ class Head(create_locator.Bone):
     #############################################################
 
     def mirror(self):
-        rLocs = cmds.ls('Loc_Face_R_*', transforms=1)
+        rLocs = self.registry.match('Loc_Face_R_*')
 
-        lLocs = cmds.ls('Loc_Face_L_*', transforms=1)
+        lLocs = self.registry.match('Loc_Face_L_*')
         lLocs.remove('Loc_Face_L_UpperLip_0')
         lLocs.remove('Loc_Face_L_LowerLip_0')
 
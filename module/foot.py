@@ -1,12 +1,16 @@
 import maya.cmds as cmds
 
 from .. import util, shape
-from ..base import bone, base
-from ..constant import Side, ATTRS
+from ..base import bone, base, layout
+from ..constant import Side, ATTRS, Blend
 from ..utility.common import hierarchy
 
 
-cmds.sdk = cmds.setDrivenKeyframe
+def sdk(*args, **kwargs):
+    """
+    Shorthand for setDrivenKeyframe, resolved against the bound cmds backend
+    """
+    return cmds.setDrivenKeyframe(*args, **kwargs)
 
 
 class FootItem(base.BaseItem):
@@ -23,15 +27,19 @@ class Foot(bone.Bone):
     Create a reverse FK rig system for Foot
     """
     
-    def __init__(self, side, name, interval=0.5, height=0.4):
+    def __init__(self, side, name, interval=0.5, height=0.4,
+                 blend=Blend.DRIVEN_KEY):
         """
         Extend: specify interval and height for foot creation
 
         :param interval: float. horizontal distance between segments of foot
         :param height: float. vertical height of ankle to the ground
+        :param blend: Blend enum. drive roll, bank and the FK/IK switch with
+                      driven keys, or with setRange and reverse nodes
         """
         super(Foot, self).__init__(side, name)
         self._rtype = 'foot'
+        self.blend = blend
 
         self.interval = interval
         self.height = height
@@ -59,57 +67,34 @@ class Foot(bone.Bone):
         """
         Override: setup controller shapes for foot and FK switch
         """
-        self._shape = list(range(3))
+        self._shape = [
+            shape.circle(self._scale),
+            shape.circle(self._scale, rotate=[0, 90, 0]),
+            shape.text('FK/IK', self._scale)
+        ]
 
-        self._shape[0] = shape.make_circle(self._scale)
-        self._shape[1] = shape.make_circle(self._scale)
-        cmds.rotate(0, 90, 0, self._shape[1], r=1)
-        self._shape[2] = shape.make_text('FK/IK', self._scale)
-
-    def create_locator(self):
+    def layout(self):
         """
-        Override: create locators for result foot and reverse foot setup
+        Override: locators for result foot and reverse foot setup
         """
-        # result foot
-        cmds.spaceLocator(n=self.locs[0])
-
-        cmds.spaceLocator(n=self.locs[1])
-        cmds.parent(self.locs[1], self.locs[0], r=1)
-        cmds.move(0, -self.height, self.interval, self.locs[1], r=1)
-
-        cmds.spaceLocator(n=self.locs[2])
-        cmds.parent(self.locs[2], self.locs[1], r=1)
-        cmds.move(0, 0, 2 * self.interval, self.locs[2], r=1)
-
-        # reverse foot setup
-        cmds.spaceLocator(n=self.locs[3])
-        cmds.parent(self.locs[3], self.locs[1], r=1)
-        if self._side == Side.LEFT:
-            cmds.move(-self.interval, 0, 0, self.locs[3], r=1)
-        else: 
-            cmds.move(self.interval, 0, 0, self.locs[3], r=1)
-
-        cmds.spaceLocator(n=self.locs[4])
-        cmds.parent(self.locs[4], self.locs[1], r=1)
-        if self._side == Side.LEFT:
-            cmds.move(self.interval, 0, 0, self.locs[4], r=1)
-        else: 
-            cmds.move(-self.interval, 0, 0, self.locs[4], r=1)
-
-        cmds.spaceLocator(n=self.locs[5])
-        cmds.parent(self.locs[5], self.locs[1], r=1)
-        cmds.move(0, 0, -1.5 * self.interval, self.locs[5], r=1)
-
-        cmds.parent(self.locs[0], util.G_LOC_GRP)
+        interval = self.interval
+        side_factor = 1 if self._side == Side.LEFT else -1
+        return layout.Layout() \
+            .add(self.locs[0]) \
+            .add(self.locs[1], self.locs[0], [0, -self.height, interval]) \
+            .add(self.locs[2], self.locs[1], [0, 0, 2 * interval]) \
+            .add(self.locs[3], self.locs[1], [-side_factor * interval, 0, 0]) \
+            .add(self.locs[4], self.locs[1], [side_factor * interval, 0, 0]) \
+            .add(self.locs[5], self.locs[1], [0, 0, -1.5 * interval])
 
     def create_joint(self):
         """
         Override: create joint sets for result, reverse and FK foot
         """
-        ankle_pos = cmds.xform(self.locs[0], q=1, t=1, ws=1)
-        ball_pos = cmds.xform(self.locs[1], q=1, t=1, ws=1)
-        toe_pos = cmds.xform(self.locs[2], q=1, t=1, ws=1)
-        
+        ankle_pos = self.guide.position(self.locs[0])
+        ball_pos = self.guide.position(self.locs[1])
+        toe_pos = self.guide.position(self.locs[2])
+
         # result foot
         cmds.select(clear=1)
         cmds.joint(p=ankle_pos, n=self.jnts[0])
@@ -118,9 +103,9 @@ class Foot(bone.Bone):
 
         # reverse foot
         cmds.select(clear=1)
-        cmds.joint(p=cmds.xform(self.locs[3], q=1, t=1, ws=1), n=self.jnts[3])
-        cmds.joint(p=cmds.xform(self.locs[4], q=1, t=1, ws=1), n=self.jnts[4])
-        cmds.joint(p=cmds.xform(self.locs[5], q=1, t=1, ws=1), n=self.jnts[5])
+        cmds.joint(p=self.guide.position(self.locs[3]), n=self.jnts[3])
+        cmds.joint(p=self.guide.position(self.locs[4]), n=self.jnts[4])
+        cmds.joint(p=self.guide.position(self.locs[5]), n=self.jnts[5])
         cmds.joint(p=toe_pos, n=self.rev_jnts[2])
         cmds.joint(p=ball_pos, n=self.rev_jnts[1])
         cmds.joint(p=ankle_pos, n=self.rev_jnts[0])
@@ -143,7 +128,7 @@ class Foot(bone.Bone):
         add custom controller attribute for foot roll and foot bank
         """
         # reverse
-        cmds.duplicate(self._shape[0], n=self.ctrls[0])
+        self._shape[0].create(self.ctrls[0])
         cmds.addAttr(
             self.ctrls[0],
             sn='fr', ln=ATTRS['fr'], at='double',
@@ -155,21 +140,21 @@ class Foot(bone.Bone):
             dv=0, min=-20, max=20,
             k=1)
 
-        foot_pos = cmds.xform(self.jnts[1], q=1, t=1, ws=1)
+        foot_pos = self.guide.position(self.locs[1])
         cmds.move(foot_pos[0], foot_pos[1], foot_pos[2]+1, self.ctrls[0])
         cmds.makeIdentity(self.ctrls[0], apply=1, t=1, r=1, s=1)
 
-        heel_loc = cmds.xform(self.jnts[5], q=1, t=1, ws=1)
+        heel_loc = self.guide.position(self.locs[5])
         util.move_to('{}.sp'.format(self.ctrls[0]), heel_loc)
         util.move_to('{}.rp'.format(self.ctrls[0]), heel_loc)
 
         # FK setup
-        cmds.duplicate(self._shape[1], n=self.ctrls[1])
+        self._shape[1].create(self.ctrls[1])
         util.move_to(self.ctrls[1], foot_pos)
         cmds.makeIdentity(self.ctrls[1], apply=1, t=1, r=1, s=1)
 
         # IK/FK switch
-        cmds.duplicate(self._shape[2], n=self.ctrls[2])
+        self._shape[2].create(self.ctrls[2])
         if self._side == Side.LEFT:
             cmds.move(foot_pos[0]+2, foot_pos[1], foot_pos[2], self.ctrls[2])
         elif self._side == Side.RIGHT:
@@ -203,49 +188,110 @@ class Foot(bone.Bone):
         cmds.orientConstraint(self.rev_jnts[2], self.jnts[1], mo=1)
         cmds.pointConstraint(self.rev_jnts[0], self.jnts[0], mo=1)
 
+        # IK/FK switch
+        # switch will follow ankle movement
+        cmds.parentConstraint(self.jnts[0], self.ctrls[2], mo=1)
+
+        if self.blend == Blend.UTILITY:
+            self.add_network(cons_p1, cons_o1, cons_o2, cons_o3)
+            return
+
         # foot roll
-        cmds.sdk(self.jnts[5]+'.rx', cd=self.ctrls[0]+'.fr', dv=0, v=0)
-        cmds.sdk(self.jnts[5]+'.rx', cd=self.ctrls[0]+'.fr', dv=-10, v=-25)
+        sdk(self.jnts[5]+'.rx', cd=self.ctrls[0]+'.fr', dv=0, v=0)
+        sdk(self.jnts[5]+'.rx', cd=self.ctrls[0]+'.fr', dv=-10, v=-25)
 
-        cmds.sdk(self.rev_jnts[1]+'.rx', cd=self.ctrls[0]+'.fr', dv=0, v=0)
-        cmds.sdk(self.rev_jnts[1]+'.rx', cd=self.ctrls[0]+'.fr', dv=20, v=25)
+        sdk(self.rev_jnts[1]+'.rx', cd=self.ctrls[0]+'.fr', dv=0, v=0)
+        sdk(self.rev_jnts[1]+'.rx', cd=self.ctrls[0]+'.fr', dv=20, v=25)
 
-        cmds.sdk(self.rev_jnts[2]+'.rx', cd=self.ctrls[0]+'.fr', dv=20, v=0)
-        cmds.sdk(self.rev_jnts[2]+'.rx', cd=self.ctrls[0]+'.fr', dv=40, v=25)
+        sdk(self.rev_jnts[2]+'.rx', cd=self.ctrls[0]+'.fr', dv=20, v=0)
+        sdk(self.rev_jnts[2]+'.rx', cd=self.ctrls[0]+'.fr', dv=40, v=25)
 
         # foot bank
-        cmds.sdk(self.jnts[3]+'.rz', cd=self.ctrls[0]+'.fb', dv=0, v=0)
-        cmds.sdk(self.jnts[4]+'.rz', cd=self.ctrls[0]+'.fb', dv=0, v=0)
+        sdk(self.jnts[3]+'.rz', cd=self.ctrls[0]+'.fb', dv=0, v=0)
+        sdk(self.jnts[4]+'.rz', cd=self.ctrls[0]+'.fb', dv=0, v=0)
         if self._side == Side.RIGHT:
-            cmds.sdk(self.jnts[3]+'.rz', cd=self.ctrls[0]+'.fb', dv=-20, v=-30)
-            cmds.sdk(self.jnts[4]+'.rz', cd=self.ctrls[0]+'.fb', dv=20, v=30)
+            sdk(self.jnts[3]+'.rz', cd=self.ctrls[0]+'.fb', dv=-20, v=-30)
+            sdk(self.jnts[4]+'.rz', cd=self.ctrls[0]+'.fb', dv=20, v=30)
         else:
-            cmds.sdk(self.jnts[3]+'.rz', cd=self.ctrls[0]+'.fb', dv=-20, v=30)
-            cmds.sdk(self.jnts[4]+'.rz', cd=self.ctrls[0]+'.fb', dv=20, v=-30)
+            sdk(self.jnts[3]+'.rz', cd=self.ctrls[0]+'.fb', dv=-20, v=30)
+            sdk(self.jnts[4]+'.rz', cd=self.ctrls[0]+'.fb', dv=20, v=-30)
 
         # result foot
-        cmds.sdk('{}.w1'.format(cons_o1), cd=self.ctrls[2]+'.sw', dv=1, v=1)
-        cmds.sdk('{}.w1'.format(cons_o1), cd=self.ctrls[2]+'.sw', dv=0, v=0)
-        cmds.sdk('{}.w1'.format(cons_p1), cd=self.ctrls[2]+'.sw', dv=1, v=1)
-        cmds.sdk('{}.w1'.format(cons_p1), cd=self.ctrls[2]+'.sw', dv=0, v=0)
-
-        cmds.sdk('{}.w0'.format(cons_p1), cd=self.ctrls[2]+'.sw', dv=1, v=0)
-        cmds.sdk('{}.w0'.format(cons_p1), cd=self.ctrls[2]+'.sw', dv=0, v=1)
-        cmds.sdk('{}.w0'.format(cons_o1), cd=self.ctrls[2]+'.sw', dv=1, v=0)
-        cmds.sdk('{}.w0'.format(cons_o1), cd=self.ctrls[2]+'.sw', dv=0, v=1)
-
-        cmds.sdk('{}.w0'.format(cons_o2), cd=self.ctrls[2]+'.sw', dv=1, v=0)
-        cmds.sdk('{}.w0'.format(cons_o2), cd=self.ctrls[2]+'.sw', dv=0, v=1)
-        cmds.sdk('{}.w1'.format(cons_o2), cd=self.ctrls[2]+'.sw', dv=1, v=1)
-        cmds.sdk('{}.w1'.format(cons_o2), cd=self.ctrls[2]+'.sw', dv=0, v=0)
-
-        cmds.sdk('{}.w0'.format(cons_o3), cd=self.ctrls[2]+'.sw', dv=1, v=0)
-        cmds.sdk('{}.w0'.format(cons_o3), cd=self.ctrls[2]+'.sw', dv=0, v=1)
-
-        # IK/FK switch
-        # switch will follow ankle movement
-        cmds.parentConstraint(self.jnts[0], self.ctrls[2], mo=1)
-        cmds.sdk(self.ctrls[0]+'.v', cd=self.ctrls[2]+'.sw', dv=1, v=1)
-        cmds.sdk(self.ctrls[0]+'.v', cd=self.ctrls[2]+'.sw', dv=0, v=0)
-        cmds.sdk(self.ctrls[1]+'.v', cd=self.ctrls[2]+'.sw', dv=1, v=0)
-        cmds.sdk(self.ctrls[1]+'.v', cd=self.ctrls[2]+'.sw', dv=0, v=1)
+        sdk('{}.w1'.format(cons_o1), cd=self.ctrls[2]+'.sw', dv=1, v=1)
+        sdk('{}.w1'.format(cons_o1), cd=self.ctrls[2]+'.sw', dv=0, v=0)
+        sdk('{}.w1'.format(cons_p1), cd=self.ctrls[2]+'.sw', dv=1, v=1)
+        sdk('{}.w1'.format(cons_p1), cd=self.ctrls[2]+'.sw', dv=0, v=0)
+
+        sdk('{}.w0'.format(cons_p1), cd=self.ctrls[2]+'.sw', dv=1, v=0)
+        sdk('{}.w0'.format(cons_p1), cd=self.ctrls[2]+'.sw', dv=0, v=1)
+        sdk('{}.w0'.format(cons_o1), cd=self.ctrls[2]+'.sw', dv=1, v=0)
+        sdk('{}.w0'.format(cons_o1), cd=self.ctrls[2]+'.sw', dv=0, v=1)
+
+        sdk('{}.w0'.format(cons_o2), cd=self.ctrls[2]+'.sw', dv=1, v=0)
+        sdk('{}.w0'.format(cons_o2), cd=self.ctrls[2]+'.sw', dv=0, v=1)
+        sdk('{}.w1'.format(cons_o2), cd=self.ctrls[2]+'.sw', dv=1, v=1)
+        sdk('{}.w1'.format(cons_o2), cd=self.ctrls[2]+'.sw', dv=0, v=0)
+
+        sdk('{}.w0'.format(cons_o3), cd=self.ctrls[2]+'.sw', dv=1, v=0)
+        sdk('{}.w0'.format(cons_o3), cd=self.ctrls[2]+'.sw', dv=0, v=1)
+
+        # controller visibility
+        sdk(self.ctrls[0]+'.v', cd=self.ctrls[2]+'.sw', dv=1, v=1)
+        sdk(self.ctrls[0]+'.v', cd=self.ctrls[2]+'.sw', dv=0, v=0)
+        sdk(self.ctrls[1]+'.v', cd=self.ctrls[2]+'.sw', dv=1, v=0)
+        sdk(self.ctrls[1]+'.v', cd=self.ctrls[2]+'.sw', dv=0, v=1)
+
+    def add_network(self, cons_p1, cons_o1, cons_o2, cons_o3):
+        """
+        Drive foot roll, foot bank and the result foot switch with the
+        same ranges as the driven keys, out of one setRange per attribute
+        and one reverse node; setRange clamps to its old range like the
+        driven key curves hold their end values
+
+        :param cons_p1: str. ankle point constraint, FK then reverse target
+        :param cons_o1: str. ankle orient constraint, FK then reverse target
+        :param cons_o2: str. ball orient constraint, FK then reverse target
+        :param cons_o3: str. toe orient constraint, FK target first
+        """
+        # foot roll: heel below 0, ball from 0 to 20, toe from 20 to 40
+        roll = cmds.shadingNode(
+            'setRange', asUtility=1, n='{}roll_range'.format(self.base))
+        for axis, old, new, target in (
+                ('X', (-10, 0), (-25, 0), self.jnts[5]),
+                ('Y', (0, 20), (0, 25), self.rev_jnts[1]),
+                ('Z', (20, 40), (0, 25), self.rev_jnts[2])):
+            cmds.connectAttr(self.ctrls[0]+'.fr', roll+'.value'+axis)
+            cmds.setAttr(roll+'.oldMin'+axis, old[0])
+            cmds.setAttr(roll+'.oldMax'+axis, old[1])
+            cmds.setAttr(roll+'.min'+axis, new[0])
+            cmds.setAttr(roll+'.max'+axis, new[1])
+            cmds.connectAttr(roll+'.outValue'+axis, target+'.rx')
+
+        # foot bank: inner below 0, outer above, mirrored on the left
+        bank = cmds.shadingNode(
+            'setRange', asUtility=1, n='{}bank_range'.format(self.base))
+        tilt = -30 if self._side == Side.RIGHT else 30
+        for axis, old, new, target in (
+                ('X', (-20, 0), (tilt, 0), self.jnts[3]),
+                ('Y', (0, 20), (0, -tilt), self.jnts[4])):
+            cmds.connectAttr(self.ctrls[0]+'.fb', bank+'.value'+axis)
+            cmds.setAttr(bank+'.oldMin'+axis, old[0])
+            cmds.setAttr(bank+'.oldMax'+axis, old[1])
+            cmds.setAttr(bank+'.min'+axis, new[0])
+            cmds.setAttr(bank+'.max'+axis, new[1])
+            cmds.connectAttr(bank+'.outValue'+axis, target+'.rz')
+
+        # result foot: reverse targets follow the switch, FK ones its reverse
+        switch = self.ctrls[2]+'.sw'
+        reverse = cmds.shadingNode(
+            'reverse', asUtility=1, n='{}switch_reverse'.format(self.base))
+        cmds.connectAttr(switch, reverse+'.inputX')
+
+        for cons in (cons_p1, cons_o1, cons_o2):
+            cmds.connectAttr(reverse+'.outputX', '{}.w0'.format(cons))
+            cmds.connectAttr(switch, '{}.w1'.format(cons))
+        cmds.connectAttr(reverse+'.outputX', '{}.w0'.format(cons_o3))
+
+        # controller visibility
+        cmds.connectAttr(switch, self.ctrls[0]+'.v')
+        cmds.connectAttr(reverse+'.outputX', self.ctrls[1]+'.v')
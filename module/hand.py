@@ -1,6 +1,3 @@
-import maya.cmds as cmds
-
-from .. import util
 from ..base import bone, base
 from ..chain import finger
 from ..constant import Side
@@ -58,25 +55,26 @@ class Hand(bone.Bone):
         self._comps.append(self.wrist)
         self._comps.extend(self.fingers)
 
-    def create_locator(self):
+    def layout(self):
         """
-        Override: create wrist and fingers guide locators
+        Override: wrist and fingers guide locators
         """
-        super(Hand, self).create_locator()
+        result = super(Hand, self).layout()
         side_factor = 1
         if self._side == Side.RIGHT:
             side_factor = -1
 
-        util.move(self.thumb.locs[0], [0, 0, 2 * self.interval])
-        util.move(self.index.locs[0], [0, 0, 1 * self.interval])
-        util.move(self.ring.locs[0], [0, 0, -1 * self.interval])
-        util.move(self.pinky.locs[0], [0, 0, -2 * self.interval])
+        result.move(self.thumb.locs[0], [0, 0, 2 * self.interval])
+        result.move(self.index.locs[0], [0, 0, 1 * self.interval])
+        result.move(self.ring.locs[0], [0, 0, -1 * self.interval])
+        result.move(self.pinky.locs[0], [0, 0, -2 * self.interval])
 
-        util.move(self.wrist.locs[0], [-side_factor * self.distance, 0, 0])
-        cmds.rotate(0, 0, 90, self.wrist.locs[0])
+        result.move(self.wrist.locs[0], [-side_factor * self.distance, 0, 0])
+        result.rotate(self.wrist.locs[0], [0, 0, 90])
 
-        hierarchy.batch_parent(
-            [f.locs[0] for f in self.fingers], self.wrist.locs[0])
+        for obj in self.fingers:
+            result.attach(obj.locs[0], self.wrist.locs[0])
+        return result
 
     def create_joint(self):
         """
@@ -87,10 +85,16 @@ class Hand(bone.Bone):
         wrist = self.wrist.jnts[0]
         hierarchy.batch_parent(fingers, wrist)
 
+    def lod_nodes(self):
+        """
+        Override: the finger chains
+        """
+        return self.secondary_nodes([obj.base for obj in self.fingers])
+
     def add_constraint(self):
         """
         Override: connect wrist and fingers through constraints
         """
         super(Hand, self).add_constraint()
         for obj in self.fingers:
-            cmds.parentConstraint(self.wrist.jnts[0], obj.offsets[0], mo=1)
+            obj.follow_offset(self.wrist.jnts[0])
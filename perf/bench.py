@@ -0,0 +1,402 @@
+"""
+Scaling benchmark suite
+
+Builds the templates and every chain type against fresh in-memory scenes
+at growing segment counts, recording wall time, command counts and node
+counts, and counting dependency cycles. Results save as json baselines;
+comparing a run against a baseline fails when a builder turns
+super-linear, needs more commands than its budget or gains a cycle.
+
+    from autoRigger import backend
+    from autoRigger.perf import bench
+
+    # outside of maya, before any rig module gets imported
+    backend.use_memory()
+
+    results = bench.run()
+    bench.save(results, 'baseline.json')
+
+    # after a change
+    failures = bench.compare(bench.load('baseline.json'), bench.run())
+
+or from a shell, with the package on the python path:
+
+    python -m autoRigger.perf.bench record baseline.json
+    python -m autoRigger.perf.bench compare baseline.json
+"""
+
+import argparse
+import importlib
+import json
+import math
+import sys
+from timeit import default_timer
+
+from .. import backend
+from ..constant import Side, Falloff, CurveDriver, Blend, Offset
+
+
+# chain segment counts
+SIZES = (10, 50, 100, 500, 1000, 2000)
+
+# growth exponents above this count as super-linear
+LINEAR_LIMIT = 1.2
+
+# exponent growth over the baseline tolerated before failing
+EXPONENT_SLACK = 0.1
+
+
+class Case(object):
+    """
+    A builder benchmarked over a range of sizes
+    """
+
+    def __init__(self, name, module, factory, sizes=SIZES):
+        """
+        Initialization
+
+        :param name: str. case name, used as the baseline key
+        :param module: str. builder module path inside the package
+        :param factory: function. takes the builder module, the scene and
+                        a size, returns the rig object to build
+        :param sizes: list. sizes to build, a single one for fixed rigs
+        """
+        self.name = name
+        self.module = module
+        self.factory = factory
+        self.sizes = sizes
+
+    @property
+    def scales(self):
+        return len(self.sizes) > 1
+
+    def load(self):
+        """
+        Import the builder module, which has to happen before any scene
+        gets bound so that it picks up the rebinding
+
+        :return: module. the builder module
+        """
+        return importlib.import_module(
+            '{}.{}'.format(backend.PACKAGE, self.module))
+
+    def create(self, scene, size):
+        """
+        :param scene: memory.Scene. bound scene
+        :param size: int. segment count
+        :return: bone.Bone. the rig object to build
+        """
+        return self.factory(self.load(), scene, size)
+
+
+def _biped(module, scene, size):
+    return module.Biped(Side.MIDDLE, 'bench')
+
+
+def _biped_matrix(module, scene, size):
+    rig = _biped(module, scene, size)
+    rig.set_offset_mode(Offset.MATRIX)
+    return rig
+
+
+def _quadruped(module, scene, size):
+    return module.Quadruped(Side.MIDDLE, 'bench')
+
+
+def _hand(module, scene, size):
+    return module.Hand(Side.LEFT, 'bench')
+
+
+def _leg_quad(module, scene, size):
+    return module.LegQuad(Side.LEFT, 'bench', distance=5, height=1)
+
+
+def _chain_ep(module, scene, size, mode=Falloff.CONSTRAINT):
+    # a gentle s-curve, one unit of length per segment
+    points = [
+        [math.sin(index * math.pi / 5.0), index * size / 20.0, 0]
+        for index in range(21)]
+    curve = scene.curve(p=points, n='bench_guide_curve')
+    return module.ChainEP(
+        Side.MIDDLE, 'bench', size, curve, cv=min(10, size), mode=mode)
+
+
+def _chain_ep_matrix(module, scene, size):
+    return _chain_ep(module, scene, size, Falloff.MATRIX)
+
+
+def _chain_ik(module, scene, size, driver=CurveDriver.CLUSTER):
+    return module.ChainIK(
+        Side.MIDDLE, 'bench', size, float(size), [0, 1, 0], is_stretch=1,
+        driver=driver)
+
+
+def _chain_ik_matrix(module, scene, size):
+    return _chain_ik(module, scene, size, CurveDriver.MATRIX)
+
+
+def _chain_fk(module, scene, size):
+    return module.ChainFK(Side.MIDDLE, 'bench', size, float(size), [0, 1, 0])
+
+
+def _chain_fk_matrix(module, scene, size):
+    rig = _chain_fk(module, scene, size)
+    rig.set_offset_mode(Offset.MATRIX)
+    return rig
+
+
+def _chain_fkik(module, scene, size, blend=Blend.DRIVEN_KEY):
+    return module.ChainFKIK(
+        Side.MIDDLE, 'bench', size, float(size), [0, 1, 0], blend=blend)
+
+
+def _chain_fkik_utility(module, scene, size):
+    return _chain_fkik(module, scene, size, Blend.UTILITY)
+
+
+# templates and modules have a fixed size, only their budgets get checked
+CASES = (
+    Case('Biped', 'template.biped', _biped, sizes=(1,)),
+    Case('BipedMatrix', 'template.biped', _biped_matrix, sizes=(1,)),
+    Case('Quadruped', 'template.quadruped', _quadruped, sizes=(1,)),
+    Case('Hand', 'module.hand', _hand, sizes=(1,)),
+    Case('LegQuad', 'chain.limb.leg.legQuad', _leg_quad, sizes=(1,)),
+    Case('ChainEP', 'chain.chainEP', _chain_ep),
+    Case('ChainEPMatrix', 'chain.chainEP', _chain_ep_matrix),
+    Case('ChainIK', 'chain.chainIK', _chain_ik),
+    Case('ChainIKMatrix', 'chain.chainIK', _chain_ik_matrix),
+    Case('ChainFK', 'chain.chainFK', _chain_fk),
+    Case('ChainFKMatrix', 'chain.chainFK', _chain_fk_matrix),
+    Case('ChainFKIK', 'chain.chainFKIK', _chain_fkik),
+    Case('ChainFKIKUtility', 'chain.chainFKIK', _chain_fkik_utility),
+)
+
+
+def measure(case, size, repeat=3):
+    """
+    Build a case in fresh memory scenes: timed without instrumentation,
+    then once more under a command tracer
+
+    :param case: Case. builder to measure
+    :param size: int. segment count
+    :param repeat: int. number of timed builds, the fastest one is kept
+    :return: dict. seconds, commands, per-command counts, nodes and
+             dependency cycles
+    """
+    from . import tracer
+    from ..backend import memory
+    from ..base import graph
+
+    best = None
+    for _ in range(repeat):
+        scene = memory.Scene()
+        with backend.using(scene):
+            start = default_timer()
+            _build(case.create(scene, size))
+            elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # the timed builds warmed up the shape cache, so counts are stable
+    scene = memory.Scene()
+    with backend.using(scene):
+        rig = case.create(scene, size)
+        with tracer.trace() as calls:
+            _build(rig)
+
+        found = graph.cycles(rig.registry.nodes())
+
+    counts = dict((name, stat.calls) for name, stat in calls.stats.items())
+    return {
+        'seconds': best,
+        'commands': sum(counts.values()),
+        'calls': counts,
+        'nodes': len(scene.nodes),
+        'cycles': len(found),
+    }
+
+
+def _build(rig):
+    rig.build_guide()
+    rig.build_rig()
+
+
+def run(cases=CASES, sizes=None, repeat=3, log=None):
+    """
+    Measure every case at each of its sizes
+
+    :param cases: list. Case to run
+    :param sizes: list. override the sizes of the scaling cases
+    :param repeat: int. number of timed builds per size
+    :param log: file. stream receiving one progress line per build
+    :return: dict. case name to size (as str) to measurement
+    """
+    for case in cases:
+        case.load()
+
+    results = dict()
+    for case in cases:
+        results[case.name] = dict()
+        for size in (sizes if sizes and case.scales else case.sizes):
+            result = measure(case, size, repeat)
+            results[case.name][str(size)] = result
+            if log:
+                log.write('{:<12} {:>6} {:>10.3f} ms {:>8} cmds\n'.format(
+                    case.name, size, result['seconds'] * 1000,
+                    result['commands']))
+    return results
+
+
+def exponent(results, key='seconds'):
+    """
+    Estimate the growth exponent k of a measurement, as in O(n^k), by a
+    least-squares fit in log-log space over the larger half of the sizes,
+    where the fixed cost of a build no longer dominates
+
+    :param results: dict. size (as str) to measurement of one case
+    :param key: str. measured value, seconds, commands or nodes
+    :return: float. the exponent, None with less than two sizes
+    """
+    points = sorted((int(size), value[key]) for size, value in results.items())
+    if len(points) > 3:
+        points = points[len(points) // 2:]
+    points = [(math.log(n), math.log(v)) for n, v in points if n and v]
+    if len(points) < 2:
+        return None
+
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    num = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    den = sum((x - mean_x) ** 2 for x, _ in points)
+    return num / den if den else None
+
+
+def compare(baseline, results, limit=LINEAR_LIMIT, slack=EXPONENT_SLACK):
+    """
+    Check a run against a baseline
+
+    A case fails when one of its growth exponents goes over the linear
+    limit and over the baseline one by more than the slack, so builders
+    already super-linear in the baseline only fail when they get worse;
+    or when any size needs more commands or has more dependency cycles
+    than the baseline did
+
+    :param baseline: dict. results of the reference run
+    :param results: dict. results of the compared run
+    :param limit: float. highest exponent still considered linear
+    :param slack: float. tolerated exponent growth
+    :return: list. failure messages, empty when the run passes
+    """
+    failures = list()
+    for name, sizes in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+
+        for key in ('seconds', 'commands', 'nodes'):
+            before = exponent(reference, key)
+            after = exponent(sizes, key)
+            if after is None or after <= limit:
+                continue
+            if before is not None and after <= max(before, limit) + slack:
+                continue
+            failures.append('{}: {} grow as O(n^{:.2f}), was O(n^{})'.format(
+                name, key, after,
+                '?' if before is None else '{:.2f}'.format(before)))
+
+        for size, result in sorted(sizes.items(), key=lambda i: int(i[0])):
+            budget = reference.get(size, {}).get('commands')
+            if budget is not None and result['commands'] > budget:
+                failures.append('{} @ {}: {} commands over a budget of {}'
+                                .format(name, size, result['commands'], budget))
+            cycles = reference.get(size, {}).get('cycles', 0)
+            if result.get('cycles', 0) > cycles:
+                failures.append('{} @ {}: {} dependency cycles, was {}'
+                                .format(name, size, result['cycles'], cycles))
+    return failures
+
+
+def report(results):
+    """
+    Table of the measurements with the growth exponents of each case
+
+    :param results: dict. results of a run
+    :return: str. the table
+    """
+    lines = ['{:<12} {:>6} {:>10} {:>8} {:>8}'.format(
+        'case', 'size', 'ms', 'cmds', 'nodes')]
+    for name, sizes in sorted(results.items()):
+        for size, result in sorted(sizes.items(), key=lambda i: int(i[0])):
+            lines.append('{:<12} {:>6} {:>10.3f} {:>8} {:>8}'.format(
+                name, size, result['seconds'] * 1000,
+                result['commands'], result['nodes']))
+        if len(sizes) > 1:
+            lines.append('{:<12} {:>6} {:>10} {:>8} {:>8}'.format(
+                '', 'O(n^k)', *[_format(exponent(sizes, key))
+                                for key in ('seconds', 'commands', 'nodes')]))
+    return '\n'.join(lines)
+
+
+def save(results, path):
+    """
+    Write the results as json, sorted so baselines diff cleanly
+
+    :param results: dict. results of a run
+    :param path: str. output file path
+    """
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+
+
+def load(path):
+    """
+    :param path: str. json file written by save
+    :return: dict. the results
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def _format(value):
+    return '-' if value is None else '{:.2f}'.format(value)
+
+
+def main(argv=None):
+    """
+    Command line entry: record a baseline, or compare against one and
+    exit with 1 on failure
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('mode', choices=('record', 'compare'))
+    parser.add_argument('baseline', help='baseline json file')
+    parser.add_argument('--case', action='append',
+                        help='case name to run, all by default')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        help='segment counts of the chain cases')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='also save the compared run here')
+    args = parser.parse_args(argv)
+
+    try:
+        importlib.import_module('maya.cmds')
+    except ImportError:
+        # from a shell every build runs headless
+        backend.use_memory()
+
+    cases = [c for c in CASES if not args.case or c.name in args.case]
+    results = run(cases, args.sizes, args.repeat, log=sys.stderr)
+    print(report(results))
+
+    if args.mode == 'record':
+        save(results, args.baseline)
+        return 0
+
+    if args.output:
+        save(results, args.output)
+    failures = compare(load(args.baseline), results)
+    for failure in failures:
+        print('FAIL ' + failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
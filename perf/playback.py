@@ -0,0 +1,156 @@
+"""
+Playback timing of the EP chain fall-off modes
+
+Builds the benchmark rope once with constraint and once with matrix
+fall-off, each in a new maya scene, keys its controllers and times stepping
+through the frames under each evaluation manager mode, so the evaluation
+cost of the two networks compares on the same machine. Needs maya:
+
+    from autoRigger.perf import playback
+
+    results = playback.run(segment=500)
+    print(playback.report(results))
+
+or from a shell, with the package on the python path:
+
+    mayapy -m autoRigger.perf.playback --segment 500
+"""
+
+import argparse
+import sys
+from timeit import default_timer
+
+from . import bench
+from ..constant import Falloff
+
+
+# evaluation manager modes, dependency graph and parallel
+MODES = ('off', 'parallel')
+
+FALLOFFS = (Falloff.CONSTRAINT, Falloff.MATRIX)
+
+
+def rope(cmds, segment, falloff):
+    """
+    Build the ChainEP benchmark case in a new scene
+
+    :param cmds: module. maya.cmds
+    :param segment: int. joint count
+    :param falloff: Falloff enum. fall-off mode of the rope
+    :return: chainEP.ChainEP. the built rope
+    """
+    cmds.file(new=1, force=1)
+    case = next(c for c in bench.CASES if c.name == 'ChainEP')
+    rig = bench._chain_ep(case.load(), cmds, segment, falloff)
+    bench._build(rig)
+    return rig
+
+
+def animate(cmds, rig, frames):
+    """
+    Key every edit point controller with a travelling wave, so that every
+    joint moves on every frame
+
+    :param cmds: module. maya.cmds
+    :param rig: chainEP.ChainEP. built rope
+    :param frames: int. animation length
+    """
+    ctrls = [rig.ctrls[index] for index in rig.cvs]
+    for frame in range(frames + 1):
+        for index, ctrl in enumerate(ctrls):
+            phase = (frame + index * 3) % 12 - 6
+            cmds.setKeyframe(ctrl, at='translateX', t=frame, v=phase)
+            cmds.setKeyframe(ctrl, at='rotateZ', t=frame, v=phase * 5)
+    cmds.playbackOptions(minTime=0, maxTime=frames)
+
+
+def step(cmds, rig, frames, repeat=3):
+    """
+    Time stepping through every frame, pulling each joint's world matrix
+    so that the whole rope evaluates even without a viewport
+
+    :param cmds: module. maya.cmds
+    :param rig: chainEP.ChainEP. animated rope
+    :param frames: int. animation length
+    :param repeat: int. number of passes, the fastest one is kept
+    :return: float. seconds per frame
+    """
+    plugs = ['{}.worldMatrix'.format(jnt) for jnt in rig.jnts]
+    best = None
+    for _ in range(repeat):
+        start = default_timer()
+        for frame in range(frames + 1):
+            cmds.currentTime(frame, update=True)
+            for plug in plugs:
+                cmds.getAttr(plug)
+        elapsed = (default_timer() - start) / (frames + 1)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(segment=500, frames=100, repeat=3, modes=MODES):
+    """
+    Measure the playback of both fall-off modes under each evaluation mode,
+    restoring the evaluation mode afterwards
+
+    :param segment: int. joint count of the rope
+    :param frames: int. animation length
+    :param repeat: int. number of timed passes per measurement
+    :param modes: list. evaluation manager modes to measure
+    :return: dict. fall-off name to evaluation mode to seconds per frame
+    """
+    import maya.cmds as cmds
+
+    previous = cmds.evaluationManager(query=True, mode=True)[0]
+    results = dict()
+    try:
+        for falloff in FALLOFFS:
+            rig = rope(cmds, segment, falloff)
+            animate(cmds, rig, frames)
+            results[falloff.value] = dict()
+            for mode in modes:
+                cmds.evaluationManager(mode=mode)
+                # the first pass builds the evaluation graph, left untimed
+                step(cmds, rig, frames, repeat=1)
+                results[falloff.value][mode] = step(cmds, rig, frames, repeat)
+    finally:
+        cmds.evaluationManager(mode=previous)
+    return results
+
+
+def report(results):
+    """
+    :param results: dict. results of a run
+    :return: str. milliseconds per frame, one row per fall-off mode
+    """
+    modes = sorted(set(m for row in results.values() for m in row))
+    lines = ['{:<12}'.format('falloff') + ''.join(
+        '{:>12}'.format(mode) for mode in modes)]
+    for name, row in sorted(results.items()):
+        lines.append('{:<12}'.format(name) + ''.join(
+            '{:>12.3f}'.format(row[mode] * 1000) for mode in modes))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry, runs maya standalone
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--segment', type=int, default=500)
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--mode', action='append', choices=MODES,
+                        help='evaluation manager mode, all by default')
+    args = parser.parse_args(argv)
+
+    import maya.standalone
+    maya.standalone.initialize()
+    results = run(args.segment, args.frames, args.repeat,
+                  args.mode or MODES)
+    print(report(results))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Per-phase, per-component build profiler
+
+Times every phase method of every component in a rig object tree, so a
+slow build can be traced down to e.g. Biped > Arm > Hand > Finger's
+place_controller. Instrumentation is opt-in and only lives on the
+profiled instances:
+
+    from autoRigger.perf import profiler
+
+    with profiler.profile(rig) as prof:
+        rig.build_guide()
+        rig.build_rig()
+
+    prof.save_trace('build.json')   # chrome://tracing or ui.perfetto.dev
+    print(prof.summary())
+
+A profiler keeps collecting across builds until cleared, so hotspots can
+be compared over many of them.
+"""
+
+import json
+import os
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from timeit import default_timer
+
+
+# Bone phase methods, in build order
+PHASES = (
+    'create_namespace',
+    'create_locator',
+    'color_locator',
+    'snapshot_guide',
+    'create_joint',
+    'set_shape',
+    'place_controller',
+    'delete_guide',
+    'delete_shape',
+    'color_controller',
+    'add_constraint',
+    'lock_controller',
+)
+
+SEPARATOR = ' > '
+
+
+class Event(object):
+    """
+    One timed phase call of one component
+    """
+
+    def __init__(self, path, phase, start, depth):
+        """
+        Initialization
+
+        :param path: tuple. component class names from the root down
+        :param phase: str. phase method name
+        :param start: float. start time in seconds
+        :param depth: int. nesting level of the call
+        """
+        self.path = path
+        self.phase = phase
+        self.start = start
+        self.depth = depth
+        self.end = None
+        self.child = 0.0
+
+    @property
+    def name(self):
+        """
+        :return: str. component path and phase, like Arm > Hand.create_joint
+        """
+        return '{}.{}'.format(SEPARATOR.join(self.path), self.phase)
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    @property
+    def self_time(self):
+        """
+        :return: float. duration minus the time spent in nested phases
+        """
+        return self.duration - self.child
+
+
+class Profiler(object):
+    """
+    Phase timer attached to the instances of a rig object tree
+    """
+
+    def __init__(self, phases=PHASES):
+        """
+        Initialization
+
+        :param phases: list. phase method names to time
+        """
+        self.phases = phases
+        self.events = list()
+        self._origin = default_timer()
+        self._stack = list()
+        self._attached = list()
+
+    def attach(self, bone):
+        """
+        Instrument the phase methods of a rig object and its sub-components
+
+        :param bone: bone.Bone. root rig object
+        """
+        self._attach(bone, (type(bone).__name__,))
+
+    def _attach(self, comp, path):
+        if any(comp is attached for attached, _ in self._attached):
+            return
+
+        for phase in self.phases:
+            method = getattr(comp, phase, None)
+            if method is not None:
+                setattr(comp, phase, self._timed(method, path, phase))
+        self._attached.append((comp, path))
+
+        for sub in comp.sub_components():
+            self._attach(sub, path + (type(sub).__name__,))
+
+    def detach(self):
+        """
+        Remove the instrumentation, keeping the collected events
+        """
+        for comp, _ in self._attached:
+            for phase in self.phases:
+                comp.__dict__.pop(phase, None)
+        self._attached = list()
+
+    def clear(self):
+        """
+        Forget the collected events
+        """
+        self.events = list()
+
+    def _timed(self, method, path, phase):
+        @wraps(method)
+        def wrap(*args, **kwargs):
+            event = Event(path, phase, default_timer(), len(self._stack))
+            self._stack.append(event)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                event.end = default_timer()
+                self._stack.pop()
+                if self._stack:
+                    self._stack[-1].child += event.duration
+                self.events.append(event)
+        return wrap
+
+    def summary_rows(self):
+        """
+        Aggregate the events per component path and phase
+
+        :return: list. (name, calls, total, self time) sorted by self time
+        """
+        rows = OrderedDict()
+        for event in self.events:
+            calls, total, own = rows.get(event.name, (0, 0.0, 0.0))
+            rows[event.name] = (
+                calls + 1, total + event.duration, own + event.self_time)
+        return sorted(
+            [(name,) + values for name, values in rows.items()],
+            key=lambda row: row[3], reverse=True)
+
+    def summary(self, limit=None):
+        """
+        Flat table of the phases, most expensive self time first
+
+        :param limit: int. number of rows, all by default
+        :return: str. the table
+        """
+        rows = self.summary_rows()[:limit]
+        width = max([len(row[0]) for row in rows] + [len('phase')])
+        lines = ['{:<{w}}  {:>6}  {:>10}  {:>10}'.format(
+            'phase', 'calls', 'total ms', 'self ms', w=width)]
+        for name, calls, total, own in rows:
+            lines.append('{:<{w}}  {:>6}  {:>10.3f}  {:>10.3f}'.format(
+                name, calls, total * 1000, own * 1000, w=width))
+        return '\n'.join(lines)
+
+    def trace(self):
+        """
+        Chrome trace event format, one complete event per phase call
+
+        :return: dict. trace document
+        """
+        pid = os.getpid()
+        events = list()
+        for event in sorted(self.events, key=lambda e: e.start):
+            events.append({
+                'name': event.name,
+                'cat': event.phase,
+                'ph': 'X',
+                'ts': (event.start - self._origin) * 1e6,
+                'dur': event.duration * 1e6,
+                'pid': pid,
+                'tid': 0,
+                'args': {
+                    'component': event.path[-1],
+                    'path': SEPARATOR.join(event.path),
+                    'self_ms': event.self_time * 1000,
+                },
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save_trace(self, path):
+        """
+        Write the chrome trace json file
+
+        :param path: str. output file path
+        """
+        with open(path, 'w') as f:
+            json.dump(self.trace(), f)
+
+
+@contextmanager
+def profile(bone, profiler=None):
+    """
+    Profile the phases of a rig object tree for the enclosed builds
+
+    :param bone: bone.Bone. root rig object
+    :param profiler: Profiler. keep collecting into an existing profiler
+    """
+    profiler = profiler or Profiler()
+    profiler.attach(bone)
+    try:
+        yield profiler
+    finally:
+        profiler.detach()
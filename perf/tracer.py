@@ -0,0 +1,243 @@
+"""
+Command tracer
+
+A backend wrapper bound in place of ``cmds`` in every autoRigger module,
+counting and timing every command called during a build. Each call gets
+attributed to the rig object class and method that issued it, and its
+latency lands in a per-command log2 histogram.
+
+    from autoRigger.perf import tracer
+
+    with tracer.trace() as calls:
+        rig.build_rig()
+
+    print(calls.report())
+    calls.save('biped.json')
+
+    # between two versions
+    print(tracer.diff(tracer.load('old.json'), tracer.load('new.json')))
+"""
+
+import json
+import sys
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from timeit import default_timer
+
+from .. import backend
+from ..base import bone
+
+
+# histogram bucket upper bounds in microseconds, the last one is open
+BUCKETS = [2 ** exponent for exponent in range(21)]
+
+UNATTRIBUTED = ('-', '-')
+
+
+class Stat(object):
+    """
+    Call count, total time and latency histogram of one command
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.histogram = [0] * (len(BUCKETS) + 1)
+
+    def add(self, seconds):
+        """
+        :param seconds: float. duration of one call
+        """
+        self.calls += 1
+        self.total += seconds
+        micro = seconds * 1e6
+        index = 0
+        while index < len(BUCKETS) and micro > BUCKETS[index]:
+            index += 1
+        self.histogram[index] += 1
+
+    def percentile(self, fraction):
+        """
+        :param fraction: float. 0 to 1
+        :return: int. upper bound in microseconds of the bucket holding
+                 the percentile, None for the open bucket
+        """
+        target = fraction * self.calls
+        count = 0
+        for index, bucket in enumerate(self.histogram):
+            count += bucket
+            if count >= target and bucket:
+                return BUCKETS[index] if index < len(BUCKETS) else None
+        return None
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'total': self.total,
+            'histogram': self.histogram,
+        }
+
+
+class Tracer(object):
+    """
+    Command backend wrapper timing every command call
+    """
+
+    def __init__(self, commands):
+        """
+        Initialization
+
+        :param commands: module or object. wrapped command backend
+        """
+        self.commands = commands
+        self.stats = defaultdict(Stat)
+        # (command, class, method) to call count and total time
+        self.callers = defaultdict(lambda: [0, 0.0])
+
+    def __getattr__(self, name):
+        command = getattr(self.commands, name)
+        if not callable(command):
+            return command
+        wrapper = self._timed(name, command)
+        # cache, so the lookup only happens once per command
+        setattr(self, name, wrapper)
+        return wrapper
+
+    def _timed(self, name, command):
+        @wraps(command)
+        def wrap(*args, **kwargs):
+            start = default_timer()
+            try:
+                return command(*args, **kwargs)
+            finally:
+                elapsed = default_timer() - start
+                self.stats[name].add(elapsed)
+                caller = self.callers[(name,) + attribute(sys._getframe(1))]
+                caller[0] += 1
+                caller[1] += elapsed
+        return wrap
+
+    def ranked(self):
+        """
+        :return: list. (command, Stat) sorted by total time, then name
+        """
+        return sorted(self.stats.items(), key=lambda i: (-i[1].total, i[0]))
+
+    def report(self, limit=None, callers=3):
+        """
+        Ranked table of the commands, each followed by its top callers
+
+        :param limit: int. number of commands, all by default
+        :param callers: int. number of callers listed per command
+        :return: str. the report
+        """
+        lines = ['{:<32} {:>8} {:>10} {:>9} {:>9} {:>9}'.format(
+            'command', 'calls', 'total ms', 'mean us', 'p50 us', 'p95 us')]
+        row = '{:<32} {:>8} {:>10.3f} {:>9.1f} {:>9} {:>9}'
+        for name, stat in self.ranked()[:limit]:
+            lines.append(row.format(
+                name,
+                stat.calls,
+                stat.total * 1000,
+                stat.total * 1e6 / stat.calls,
+                _bound(stat.percentile(0.5)),
+                _bound(stat.percentile(0.95))))
+
+            ranked = sorted(
+                [(key[1:], value) for key, value in self.callers.items()
+                 if key[0] == name],
+                key=lambda i: (-i[1][1], i[0]))
+            for (cls, method), (calls, total) in ranked[:callers]:
+                lines.append('    {:<28} {:>8} {:>10.3f}'.format(
+                    '{}.{}'.format(cls, method), calls, total * 1000))
+        return '\n'.join(lines)
+
+    def to_dict(self):
+        """
+        :return: dict. json serializable statistics
+        """
+        callers = defaultdict(dict)
+        for (name, cls, method), (calls, total) in self.callers.items():
+            callers[name]['{}.{}'.format(cls, method)] = {
+                'calls': calls, 'total': total}
+        return {
+            'buckets': BUCKETS,
+            'commands': dict(
+                (name, dict(stat.to_dict(), callers=callers[name]))
+                for name, stat in self.stats.items()),
+        }
+
+    def save(self, path):
+        """
+        Write the statistics as json, sorted so files diff cleanly
+
+        :param path: str. output file path
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1, sort_keys=True)
+
+
+@contextmanager
+def trace(tracer=None):
+    """
+    Trace the commands called by the enclosed code
+
+    :param tracer: Tracer. keep collecting into an existing tracer
+    """
+    tracer = tracer or Tracer(backend.current())
+    with backend.using(tracer):
+        yield tracer
+
+
+def attribute(frame):
+    """
+    Find the rig object method a command was called from
+
+    :param frame: frame. frame of the command caller
+    :return: tuple. rig object class name and method name
+    """
+    while frame is not None:
+        owner = frame.f_locals.get('self')
+        if isinstance(owner, bone.Bone):
+            return type(owner).__name__, frame.f_code.co_name
+        frame = frame.f_back
+    return UNATTRIBUTED
+
+
+def load(path):
+    """
+    :param path: str. json file written by Tracer.save
+    :return: dict. the statistics
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def diff(old, new):
+    """
+    Compare two saved statistics, largest time change first
+
+    :param old: dict. statistics of the reference run
+    :param new: dict. statistics of the compared run
+    :return: str. table of call count and time deltas
+    """
+    rows = list()
+    empty = {'calls': 0, 'total': 0.0}
+    for name in set(old['commands']) | set(new['commands']):
+        before = old['commands'].get(name, empty)
+        after = new['commands'].get(name, empty)
+        rows.append((
+            name,
+            after['calls'] - before['calls'],
+            (after['total'] - before['total']) * 1000))
+    rows.sort(key=lambda row: (-abs(row[2]), row[0]))
+
+    lines = ['{:<24} {:>8} {:>10}'.format('command', 'calls', 'ms')]
+    for name, calls, total in rows:
+        lines.append('{:<24} {:>+8} {:>+10.3f}'.format(name, calls, total))
+    return '\n'.join(lines)
+
+
+def _bound(micro):
+    return '>{}'.format(BUCKETS[-1]) if micro is None else micro
@@ -1,84 +1,244 @@
+"""
+Controller shape library
+
+Every shape is stored once per session as unit nurbs curve data, then
+each controller gets created directly from the cached control points at
+its own scale, without building, duplicating or deleting temp curves.
+"""
+
+import math
+
 import maya.cmds as cmds
+import numpy as np
 
-from . import util
+from .solver import curve, frame
 from .utility import nurbs
 from .utility.useful import strGenerator
 
 
 NAMER = strGenerator.StrGenerator(prefix='tmp_')
 
+# cached template curves, loaded once per session
+_TEMPLATES = dict()
+
+# circle control points match maya's 8 sections circle
+CIRCLE_SECTIONS = 8
+
+ARROW_POINTS = [
+    [2.0, 0.0, 2.0], [2.0, 0.0, 1.0], [3.0, 0.0, 1.0], [3.0, 0.0, 2.0],
+    [5.0, 0.0, 0.0], [3.0, 0.0, -2.0], [3.0, 0.0, -1.0],
+    [2.0, 0.0, -1.0],
+    [2.0, 0.0, -2.0], [1.0, 0.0, -2.0], [1.0, 0.0, -3.0],
+    [2.0, 0.0, -3.0], [0.0, 0.0, -5.0], [-2.0, 0.0, -3.0],
+    [-1.0, 0.0, -3.0], [-1.0, 0.0, -2.0],
+    [-2.0, 0.0, -2.0], [-2.0, 0.0, -1.0], [-3.0, 0.0, -1.0],
+    [-3.0, 0.0, -2.0], [-5.0, 0.0, 0.0], [-3.0, 0.0, 2.0],
+    [-3.0, 0.0, 1.0], [-2.0, 0.0, 1.0],
+    [-2.0, 0.0, 2.0], [-1.0, 0.0, 2.0], [-1.0, 0.0, 3.0],
+    [-2.0, 0.0, 3.0], [0.0, 0.0, 5.0], [2.0, 0.0, 3.0],
+    [1.0, 0.0, 3.0], [1.0, 0.0, 2.0], [2.0, 0.0, 2.0]
+]
+
+
+class Shape(object):
+    """
+    A controller shape: template curves at a given scale and orientation
+    """
+
+    def __init__(self, curves, scale=1, rotate=None):
+        """
+        Initialization
+
+        :param curves: list. template curve.NurbsCurve at unit scale
+        :param scale: float. uniform scale baked into the control points
+        :param rotate: list. euler rotation baked into the control points
+        """
+        self.curves = curves
+        self.scale = scale
+        self.rotate = rotate
+
+    def points(self, template):
+        """
+        Get the control points of a template curve in controller space
+
+        :param template: curve.NurbsCurve. template curve
+        :return: np.ndarray. (n, 3) control points
+        """
+        points = template.cvs * self.scale
+        if self.rotate:
+            points = points.dot(frame.euler_to_matrix([self.rotate])[0])
+        return points
+
+    def create(self, name):
+        """
+        Create a controller of this shape, the first curve with a single
+        curve call and any other one as an extra shape node under it
+
+        :param name: str. controller transform name
+        :return: str. controller transform name
+        """
+        first = self.curves[0]
+        ctrl = cmds.curve(
+            p=self.points(first).tolist(),
+            k=first.maya_knots,
+            d=first.degree,
+            per=first.form == curve.PERIODIC,
+            n=name)
+
+        for index, template in enumerate(self.curves[1:]):
+            shape = cmds.createNode(
+                'nurbsCurve', n='{}Shape{}'.format(ctrl, index+1), p=ctrl)
+            points = self.points(template)
+            knots = template.maya_knots
+            cmds.setAttr(
+                shape + '.cc',
+                template.degree,
+                len(points) - template.degree,
+                template.form,
+                False,
+                3,
+                knots,
+                len(knots),
+                len(points),
+                *[tuple(point) for point in points.tolist()],
+                type='nurbsCurve')
+        return ctrl
+
+
+def template(key, loader):
+    """
+    Get a template from the session cache, loading it on first use
+
+    :param key: str. template identifier
+    :param loader: function. returns the template curves
+    :return: list. template curve.NurbsCurve
+    """
+    if key not in _TEMPLATES:
+        _TEMPLATES[key] = loader()
+    return _TEMPLATES[key]
+
+
+def circle(scale=1, rotate=None):
+    """
+    Circle shape on the ground plane
+
+    :param scale: float. radius
+    :param rotate: list. euler rotation of the shape
+    :return: Shape. controller shape
+    """
+    return Shape(template('circle', _circle_curves), scale, rotate)
+
+
+def arrow(scale=1, rotate=None):
+    """
+    Four-directional arrow shape on the ground plane
+
+    :param scale: float. uniform scale
+    :param rotate: list. euler rotation of the shape
+    :return: Shape. controller shape
+    """
+    return Shape(template('arrow', _arrow_curves), scale, rotate)
+
+
+def sphere(scale=1, rotate=None):
+    """
+    Sphere shape made of three perpendicular circles
+
+    :param scale: float. radius
+    :param rotate: list. euler rotation of the shape
+    :return: Shape. controller shape
+    """
+    return Shape(template('sphere', _sphere_curves), scale, rotate)
+
+
+def text(label, scale=1, rotate=None):
+    """
+    Text shape lying on the ground plane
+
+    :param label: str. text for display
+    :param scale: float. uniform scale
+    :param rotate: list. euler rotation of the shape
+    :return: Shape. controller shape
+    """
+    curves = template(
+        'text:{}'.format(label), lambda: _text_curves(label))
+    return Shape(curves, scale, rotate)
+
 
 def make_circle(scale=1, name=None):
     """
     Make a circle nurbs curve
     """
-    if not name:
-        name = NAMER.tmp
-
-    return cmds.circle(
-        nr=(0, 1, 0),
-        c=(0, 0, 0),
-        s=8,
-        radius=scale,
-        name=name)[0]
+    return circle(scale).create(name or NAMER.tmp)
 
 
 def make_arrow(scale=1, name=None):
     """
     Make a four-directional arrow nurbs curve
     """
-    if not name:
-        name = NAMER.tmp
-
-    arrow_pts = [
-        [2.0, 0.0, 2.0], [2.0, 0.0, 1.0], [3.0, 0.0, 1.0], [3.0, 0.0, 2.0],
-        [5.0, 0.0, 0.0], [3.0, 0.0, -2.0], [3.0, 0.0, -1.0],
-        [2.0, 0.0, -1.0],
-        [2.0, 0.0, -2.0], [1.0, 0.0, -2.0], [1.0, 0.0, -3.0],
-        [2.0, 0.0, -3.0], [0.0, 0.0, -5.0], [-2.0, 0.0, -3.0],
-        [-1.0, 0.0, -3.0], [-1.0, 0.0, -2.0],
-        [-2.0, 0.0, -2.0], [-2.0, 0.0, -1.0], [-3.0, 0.0, -1.0],
-        [-3.0, 0.0, -2.0], [-5.0, 0.0, 0.0], [-3.0, 0.0, 2.0],
-        [-3.0, 0.0, 1.0], [-2.0, 0.0, 1.0],
-        [-2.0, 0.0, 2.0], [-1.0, 0.0, 2.0], [-1.0, 0.0, 3.0],
-        [-2.0, 0.0, 3.0], [0.0, 0.0, 5.0], [2.0, 0.0, 3.0],
-        [1.0, 0.0, 3.0], [1.0, 0.0, 2.0], [2.0, 0.0, 2.0]
-    ]
-
-    arrow = cmds.curve(p=arrow_pts, degree=1, name=name)
-    util.uniform_scale(arrow, scale * 0.5)
-    cmds.makeIdentity(arrow, apply=1, s=1)
-    return arrow
+    return arrow(scale).create(name or NAMER.tmp)
 
 
 def make_sphere(scale=1, name=None):
     """
     Make a sphere nurbs curve
     """
-    if not name:
-        name = NAMER.tmp
+    return sphere(scale).create(name or NAMER.tmp)
 
-    c1 = cmds.circle(nr=(0, 1, 0), c=(0, 0, 0), s=8, radius=scale)[0]
-    c2 = cmds.circle(nr=(1, 0, 0), c=(0, 0, 0), s=8, radius=scale)[0]
-    c3 = cmds.circle(nr=(0, 0, 1), c=(0, 0, 0), s=8, radius=scale)[0]
 
-    sphere = nurbs.util.merge_curves(name=name, curves=[c1, c2, c3])
-    return sphere
-
-
-def make_text(text, scale=1, name=None):
+def make_text(label, scale=1, name=None):
     """
     Make a nurbs curve with text
 
-    :param text: str. text for display
+    :param label: str. text for display
     :return: str. transform node of the shape curve
     """
-    if not name:
-        name = NAMER.tmp
+    return text(label, scale).create(name or NAMER.tmp)
+
+
+def _circle_points(axes):
+    # periodic cubic circle of unit radius, repeating its first 3 points
+    radius = 6.0 / (4.0 + 2.0 * math.cos(2 * math.pi / CIRCLE_SECTIONS))
+    angles = 2 * np.pi * np.arange(1, CIRCLE_SECTIONS + 1) / CIRCLE_SECTIONS
+    u, v = np.asarray(axes, dtype=np.float64)
+    points = radius * (np.cos(angles)[:, None] * u -
+                       np.sin(angles)[:, None] * v)
+    return np.concatenate([points, points[:3]])
+
+
+def _circle_curve(axes):
+    points = _circle_points(axes)
+    knots = curve.uniform_knots(len(points), 3, periodic=True)
+    return curve.NurbsCurve(points, knots, 3, curve.PERIODIC)
+
+
+def _circle_curves():
+    return [_circle_curve([[1, 0, 0], [0, 0, 1]])]
+
+
+def _sphere_curves():
+    return [
+        _circle_curve([[1, 0, 0], [0, 0, 1]]),
+        _circle_curve([[0, 1, 0], [0, 0, -1]]),
+        _circle_curve([[1, 0, 0], [0, -1, 0]]),
+    ]
+
+
+def _arrow_curves():
+    points = np.asarray(ARROW_POINTS) * 0.5
+    knots = [float(k) for k in range(len(points))]
+    return [curve.NurbsCurve(points, knots, 1)]
+
+
+def _text_curves(label):
+    # text glyphs are only available from maya, read them back once
+    grp = nurbs.util.make_curve_by_text(text=label, name=NAMER.tmp)
+    shapes = cmds.listRelatives(grp, ad=1, type='nurbsCurve') or list()
+    curves = [curve.NurbsCurve.from_scene(shape) for shape in shapes]
+    cmds.delete(grp)
 
-    curve = nurbs.util.make_curve_by_text(text=text, name=name)
-    util.uniform_scale(curve, scale)
-    cmds.makeIdentity(curve, apply=1, r=1, t=1, s=1)
     # make it align on the ground plane
-    cmds.rotate(-90, 0, 0, curve, r=1)
-    return curve
+    rotation = frame.euler_to_matrix([[-90, 0, 0]])[0]
+    for glyph in curves:
+        glyph.cvs = glyph.cvs.dot(rotation)
+    return curves
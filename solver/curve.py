@@ -0,0 +1,205 @@
+"""
+Vectorized NURBS curve evaluation
+
+Evaluates non-rational B-spline curves for whole arrays of parameters at
+once with de Boor's algorithm, and resamples them by arc length through a
+dense lookup table, so sampling cost doesn't grow with scene mutations.
+"""
+
+import maya.cmds as cmds
+import numpy as np
+
+try:
+    from maya.api import OpenMaya
+except ImportError:
+    # headless backends can't read knots, curves are assumed uniform
+    OpenMaya = None
+
+
+# maya form attribute values
+OPEN = 0
+CLOSED = 1
+PERIODIC = 2
+
+# arc length lookup resolution, in samples per knot span
+SPAN_SAMPLES = 64
+
+
+class NurbsCurve(object):
+    """
+    A B-spline curve defined by control points, knots and degree
+    """
+
+    def __init__(self, cvs, knots, degree, form=OPEN):
+        """
+        Initialization
+
+        :param cvs: np.ndarray. (n, 3) control points
+        :param knots: list. maya style knot vector of n + degree - 1 knots
+        :param degree: int. curve degree
+        :param form: int. maya form, OPEN, CLOSED or PERIODIC
+        """
+        self.cvs = np.asarray(cvs, dtype=np.float64)
+        self.degree = int(degree)
+        self.form = int(form)
+
+        # pad maya's knot vector with the two implicit end knots
+        knots = np.asarray(knots, dtype=np.float64)
+        self.knots = np.concatenate([
+            [2 * knots[0] - knots[1]], knots, [2 * knots[-1] - knots[-2]]])
+        self._lut = None
+
+    @property
+    def maya_knots(self):
+        """
+        :return: list. knot vector without the two implicit end knots
+        """
+        return self.knots[1:-1].tolist()
+
+    @property
+    def domain(self):
+        """
+        :return: tuple. minimum and maximum parameter of the curve
+        """
+        count = len(self.cvs)
+        return self.knots[self.degree], self.knots[count]
+
+    @classmethod
+    def from_scene(cls, curve):
+        """
+        Read a nurbsCurve from the scene in world space
+
+        :param curve: str. curve transform or shape name
+        :return: NurbsCurve. the curve data
+        """
+        shapes = cmds.listRelatives(curve, s=1) or [curve]
+        shape = shapes[0]
+        degree = cmds.getAttr(shape + '.degree')
+        form = cmds.getAttr(shape + '.form')
+
+        cvs = np.reshape(
+            cmds.xform('{}.cv[*]'.format(curve), q=1, t=1, ws=1), (-1, 3))
+        knots = None
+        if OpenMaya:
+            selection = OpenMaya.MSelectionList()
+            try:
+                selection.add(shape)
+                knots = list(OpenMaya.MFnNurbsCurve(
+                    selection.getDagPath(0)).knots())
+            except RuntimeError:
+                # shape lives in a non-maya backend
+                pass
+        if knots is None:
+            knots = uniform_knots(len(cvs), degree, form == PERIODIC)
+        return cls(cvs, knots, degree, form)
+
+    def evaluate(self, params):
+        """
+        Evaluate positions for an array of parameters
+
+        :param params: np.ndarray. (m,) curve parameters
+        :return: np.ndarray. (m, 3) positions
+        """
+        return _de_boor(self.cvs, self.knots, self.degree, params)
+
+    def derivative(self, params):
+        """
+        Evaluate first derivatives for an array of parameters
+
+        :param params: np.ndarray. (m,) curve parameters
+        :return: np.ndarray. (m, 3) derivative vectors
+        """
+        d = self.degree
+        if d < 1:
+            return np.zeros((len(params), 3))
+        t = self.knots
+        spans = (t[d+1:d+len(self.cvs)] - t[1:len(self.cvs)])[:, None]
+        spans[spans == 0] = 1.0
+        cvs = d * (self.cvs[1:] - self.cvs[:-1]) / spans
+        return _de_boor(cvs, t[1:-1], d - 1, params)
+
+    def lookup(self):
+        """
+        Build, once, the arc length lookup table of the curve
+
+        :return: tuple. (k,) parameters and (k,) cumulative lengths
+        """
+        if self._lut is None:
+            start, end = self.domain
+            count = max(len(self.cvs) - self.degree, 1) * SPAN_SAMPLES + 1
+            params = np.linspace(start, end, count)
+            points = self.evaluate(params)
+            lengths = np.concatenate([[0.0], np.cumsum(
+                np.linalg.norm(np.diff(points, axis=0), axis=1))])
+            self._lut = (params, lengths)
+        return self._lut
+
+    @property
+    def length(self):
+        """
+        :return: float. approximated arc length
+        """
+        return float(self.lookup()[1][-1])
+
+    def params_at_lengths(self, lengths):
+        """
+        Map arc lengths to curve parameters through the lookup table
+
+        :param lengths: np.ndarray. (m,) arc lengths from the curve start
+        :return: np.ndarray. (m,) parameters
+        """
+        params, table = self.lookup()
+        return np.interp(lengths, table, params)
+
+    def sample(self, count):
+        """
+        Sample points evenly spread by arc length, ends included
+
+        :param count: int. number of samples
+        :return: tuple. (count, 3) positions and (count, 3) unit tangents
+        """
+        lengths = np.linspace(0.0, self.length, count)
+        params = self.params_at_lengths(lengths)
+        tangents = self.derivative(params)
+        norms = np.linalg.norm(tangents, axis=1)[:, None]
+        norms[norms == 0] = 1.0
+        return self.evaluate(params), tangents / norms
+
+
+def uniform_knots(count, degree, periodic=False):
+    """
+    Build a maya style uniform knot vector
+
+    :param count: int. number of control points
+    :param degree: int. curve degree
+    :param periodic: bool. whether the curve is periodic
+    :return: list. knot vector of count + degree - 1 knots
+    """
+    if periodic:
+        return [float(k) for k in range(-degree + 1, count)]
+    spans = count - degree
+    return [0.0] * degree + [float(k) for k in range(1, spans)] + \
+        [float(spans)] * degree
+
+
+def _de_boor(cvs, knots, degree, params):
+    params = np.atleast_1d(np.asarray(params, dtype=np.float64))
+    count = len(cvs)
+
+    # knot span of every parameter, clamped to the valid domain
+    spans = np.searchsorted(knots, params, side='right') - 1
+    spans = np.clip(spans, degree, count - 1)
+
+    offsets = np.arange(degree + 1)
+    points = cvs[spans[:, None] - degree + offsets[None, :]].copy()
+    for r in range(1, degree + 1):
+        for j in range(degree, r - 1, -1):
+            left = knots[spans + j - degree]
+            right = knots[spans + j + 1 - r]
+            span = right - left
+            span[span == 0] = 1.0
+            alpha = ((params - left) / span)[:, None]
+            points[:, j] = (1.0 - alpha) * points[:, j - 1] + \
+                alpha * points[:, j]
+    return points[:, degree]
+
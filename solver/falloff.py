@@ -0,0 +1,89 @@
+"""
+Edit point fall-off weights
+
+Solves which pair of edit point controllers drives every joint of a chain
+and how much each one weighs, for the whole chain at once in NumPy, along
+with the rest matrices the matrix blend network needs.
+
+Matrices follow maya's row-vector layout, translation is the last row.
+"""
+
+import numpy as np
+
+
+def spans(segment, cvs):
+    """
+    Head and tail controller of every joint and the weight of the tail,
+    falling off linearly between consecutive edit points
+
+    :param segment: int. number of joints
+    :param cvs: list. ascending joint indices of the edit points, the first
+                and last joints included
+    :return: tuple. (n,) head indices, (n,) tail indices into cvs and (n,)
+             tail weights
+    """
+    cvs = np.asarray(cvs)
+    joints = np.arange(segment)
+    heads = np.clip(
+        np.searchsorted(cvs, joints, side='right') - 1, 0, len(cvs) - 2)
+    tails = heads + 1
+
+    start = cvs[heads]
+    gap = (cvs[tails] - start).astype(np.float64)
+    gap[gap == 0] = 1.0
+    weights = np.clip((joints - start) / gap, 0.0, 1.0)
+    return heads, tails, weights
+
+
+def rest_matrices(frames, positions):
+    """
+    World matrices from frames and positions
+
+    :param frames: np.ndarray. (n, 3, 3) world rotation frames
+    :param positions: np.ndarray. (n, 3) world positions
+    :return: np.ndarray. (n, 4, 4) world matrices
+    """
+    matrices = np.zeros((len(frames), 4, 4))
+    matrices[:, :3, :3] = frames
+    matrices[:, 3, :3] = positions
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def inverse_rigid(matrices):
+    """
+    Invert rotation and translation only matrices without a general solve
+
+    :param matrices: np.ndarray. (n, 4, 4) rigid world matrices
+    :return: np.ndarray. (n, 4, 4) inverse matrices
+    """
+    inverse = np.zeros_like(matrices)
+    rotation = np.transpose(matrices[:, :3, :3], (0, 2, 1))
+    inverse[:, :3, :3] = rotation
+    inverse[:, 3, :3] = -np.einsum('ni,nij->nj', matrices[:, 3, :3], rotation)
+    inverse[:, 3, 3] = 1.0
+    return inverse
+
+
+def rotations(matrices):
+    """
+    Rotation part of matrices, translation zeroed
+
+    :param matrices: np.ndarray. (n, 4, 4) world matrices
+    :return: np.ndarray. (n, 4, 4) rotation only matrices
+    """
+    result = np.array(matrices, dtype=np.float64)
+    result[:, 3, :3] = 0.0
+    return result
+
+
+def translations(positions):
+    """
+    Translation matrices
+
+    :param positions: np.ndarray. (n, 3) translations
+    :return: np.ndarray. (n, 4, 4) translation only matrices
+    """
+    result = np.tile(np.eye(4), (len(positions), 1, 1))
+    result[:, 3, :3] = positions
+    return result
@@ -0,0 +1,197 @@
+"""
+Batch joint frame solver
+
+Solves the world orientation of whole joint chains from guide positions
+in NumPy, so joints get created with their final jointOrient instead of
+being re-oriented hierarchy walk by hierarchy walk inside maya.
+
+Frames are (n, 3, 3) arrays of row-vector rotation matrices whose rows are
+the x, y and z axes, x aiming down the chain like joint -oj xyz.
+"""
+
+import numpy as np
+
+
+WORLD_UP = (0, 1, 0)
+
+
+def aim_matrices(aims, up=WORLD_UP):
+    """
+    Rotation matrices aiming x along each vector with y towards up
+
+    :param aims: np.ndarray. (m, 3) aim directions
+    :param up: list. world up vector
+    :return: np.ndarray. (m, 3, 3) rotation matrices
+    """
+    x = _normalize(np.asarray(aims, dtype=np.float64))
+    up = np.broadcast_to(np.asarray(up, dtype=np.float64), x.shape)
+
+    z = np.cross(x, up)
+    # aim parallel to up, fall back to the world z axis
+    parallel = np.linalg.norm(z, axis=1) < 1e-8
+    z[parallel] = np.cross(x[parallel], [0.0, 0.0, 1.0])
+    z = _normalize(z)
+    y = np.cross(z, x)
+    return np.stack([x, y, z], axis=1)
+
+
+def aim_rotations(aims, up=WORLD_UP):
+    """
+    Euler rotations (xyz order, degrees) pointing the x axis along each
+    aim vector with y towards the up vector, like a default aimConstraint
+
+    :param aims: np.ndarray. (m, 3) aim directions
+    :param up: list. world up vector
+    :return: np.ndarray. (m, 3) rotations
+    """
+    return matrix_to_euler(aim_matrices(aims, up))
+
+
+def matrix_to_euler(matrices):
+    """
+    Convert row-vector rotation matrices into xyz euler angles
+
+    :param matrices: np.ndarray. (m, 3, 3) or (m, 4, 4) rotation matrices
+    :return: np.ndarray. (m, 3) rotations in degrees
+    """
+    m = np.asarray(matrices, dtype=np.float64)
+    sy = np.clip(-m[:, 0, 2], -1.0, 1.0)
+    y = np.arcsin(sy)
+    x = np.arctan2(m[:, 1, 2], m[:, 2, 2])
+    z = np.arctan2(m[:, 0, 1], m[:, 0, 0])
+
+    # gimbal lock, fold z into x
+    locked = np.abs(m[:, 0, 2]) >= 0.999999
+    x[locked] = np.arctan2(-m[locked, 2, 1], m[locked, 1, 1])
+    z[locked] = 0.0
+    return np.degrees(np.stack([x, y, z], axis=1))
+
+
+def euler_to_matrix(rotations):
+    """
+    Convert xyz euler angles into row-vector rotation matrices
+
+    :param rotations: np.ndarray. (m, 3) rotations in degrees
+    :return: np.ndarray. (m, 3, 3) rotation matrices
+    """
+    x, y, z = np.radians(np.asarray(rotations, dtype=np.float64)).T
+    cx, sx, cy, sy, cz, sz = \
+        np.cos(x), np.sin(x), np.cos(y), np.sin(y), np.cos(z), np.sin(z)
+
+    # Rx * Ry * Rz
+    return np.stack([
+        np.stack([cy*cz, cy*sz, -sy], axis=-1),
+        np.stack([sx*sy*cz - cx*sz, sx*sy*sz + cx*cz, sx*cy], axis=-1),
+        np.stack([cx*sy*cz + sx*sz, cx*sy*sz - sx*cz, cx*cy], axis=-1),
+    ], axis=1)
+
+
+def aim_frames(points, up=WORLD_UP):
+    """
+    Frames of joint -oj xyz -sao yup: every joint aims at the next one
+    with y towards world up, the end joint aligns with its parent
+
+    :param points: np.ndarray. (n, 3) joint world positions
+    :param up: list. world up vector
+    :return: np.ndarray. (n, 3, 3) world frames
+    """
+    return aim_matrices(_segments(points), up)
+
+
+def rotation_minimizing_frames(points, up=WORLD_UP):
+    """
+    Rotation minimizing frames by double reflection (Wang et al. 2008),
+    seeded with the aim frame at the root so planar chains match
+    aim_frames while twisting curves don't flip
+
+    :param points: np.ndarray. (n, 3) joint world positions
+    :param up: list. world up vector seeding the root frame
+    :return: np.ndarray. (n, 3, 3) world frames
+    """
+    points = np.asarray(points, dtype=np.float64)
+    tangents = _normalize(_segments(points))
+    frames = np.empty((len(points), 3, 3))
+    frames[0] = aim_matrices(tangents[:1], up)[0]
+
+    normal = frames[0, 1]
+    for i in range(len(points) - 1):
+        v1 = points[i+1] - points[i]
+        c1 = v1.dot(v1)
+        if c1 > 1e-12:
+            reflected = normal - (2.0 / c1) * v1.dot(normal) * v1
+            tangent = tangents[i] - (2.0 / c1) * v1.dot(tangents[i]) * v1
+            v2 = tangents[i+1] - tangent
+            c2 = v2.dot(v2)
+            if c2 > 1e-12:
+                reflected = reflected - (2.0 / c2) * v2.dot(reflected) * v2
+            normal = reflected
+
+        x = tangents[i+1]
+        z = _normalize(np.cross(x, normal)[None])[0]
+        normal = np.cross(z, x)
+        frames[i+1] = [x, normal, z]
+    return frames
+
+
+def pole_frames(points, up=WORLD_UP):
+    """
+    Frames sharing the plane of the first three joints, z being the bend
+    axis, as used by limbs solved with a rotate plane IK
+
+    The bend axis keeps the side of the aim frame's z axis so that
+    preferred angles stay valid, straight limbs fall back to aim_frames
+
+    :param points: np.ndarray. (n >= 3, 3) joint world positions
+    :param up: list. world up vector of the fall back
+    :return: np.ndarray. (n, 3, 3) world frames
+    """
+    points = np.asarray(points, dtype=np.float64)
+    frames = aim_frames(points, up)
+    if len(points) < 3:
+        return frames
+
+    upper, lower = points[1] - points[0], points[2] - points[1]
+    bend = np.cross(upper, lower)
+    norm = np.linalg.norm(bend)
+    if norm <= 1e-6 * np.linalg.norm(upper) * np.linalg.norm(lower):
+        return frames
+    bend /= norm
+    if bend.dot(frames[0, 2]) < 0:
+        bend = -bend
+
+    x = frames[:, 0]
+    z = _normalize(bend - np.einsum('ij,j->i', x, bend)[:, None] * x)
+    y = np.cross(z, x)
+    return np.stack([x, y, z], axis=1)
+
+
+def joint_orients(frames, parent=None):
+    """
+    Local jointOrient of each joint of a chain from its world frames
+
+    :param frames: np.ndarray. (n, 3, 3) world frames, root first
+    :param parent: np.ndarray. (3, 3) world rotation above the root
+    :return: np.ndarray. (n, 3) joint orients in degrees
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    parents = np.empty_like(frames)
+    parents[0] = np.eye(3) if parent is None else parent
+    parents[1:] = frames[:-1]
+
+    # row-vector convention: world = local * parent
+    local = np.einsum('nij,nkj->nik', frames, parents)
+    return matrix_to_euler(local)
+
+
+def _segments(points):
+    # aim of every joint, the end joint reuses its parent's
+    points = np.asarray(points, dtype=np.float64)
+    aims = np.diff(points, axis=0)
+    return np.concatenate([aims, aims[-1:]]) if len(aims) else \
+        np.array([[1.0, 0.0, 0.0]])
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1)[:, None]
+    norms[norms == 0] = 1.0
+    return vectors / norms
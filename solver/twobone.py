@@ -0,0 +1,136 @@
+"""
+Analytic two-bone IK
+
+Solves a root, mid and end joint chain reaching for a target in the plane
+of a pole, with the law of cosines, the way maya's rotate plane solver
+poses it. solve() is the NumPy reference of the utility node network
+LimbIK builds in its analytic mode, and parity() checks a built limb
+against the RP solver on sampled poses.
+
+Frames follow solver.frame: row-vector rotation matrices whose rows are
+the x, y and z axes, x aiming down the bone and z being the bend axis.
+"""
+
+import maya.cmds as cmds
+import numpy as np
+
+
+def bend_sign(start, target, pole, bend):
+    """
+    Side of the rest bend axis relative to the pole plane normal, so that
+    the solved frames keep the orientation of the rest ones
+
+    :param start: np.ndarray. (3,) rest root position
+    :param target: np.ndarray. (3,) rest end position
+    :param pole: np.ndarray. (3,) rest pole position
+    :param bend: np.ndarray. (3,) rest bend axis of the root joint
+    :return: float. 1.0 or -1.0
+    """
+    normal = np.cross(target - start, pole - start)
+    return -1.0 if normal.dot(bend) < 0 else 1.0
+
+
+def solve(start, target, pole, upper, lower, sign=1.0):
+    """
+    Pose two-bone chains for arrays of root, target and pole positions
+
+    Out of reach targets straighten the chain towards them, too close
+    ones fold it to the shortest reach, like the RP solver
+
+    :param start: np.ndarray. (m, 3) root positions
+    :param target: np.ndarray. (m, 3) target positions
+    :param pole: np.ndarray. (m, 3) pole positions
+    :param upper: float. root to mid bone length
+    :param lower: float. mid to end bone length
+    :param sign: float. bend_sign of the rest chain
+    :return: tuple. (m, 3, 3) root, mid and end positions and (m, 2, 3, 3)
+             root and mid joint world frames
+    """
+    start, target, pole = [np.atleast_2d(np.asarray(v, dtype=np.float64))
+                           for v in (start, target, pole)]
+    reach = target - start
+    distance = np.clip(np.linalg.norm(reach, axis=1),
+                       abs(upper - lower), upper + lower)
+
+    # law of cosines, as the projection and height of the mid joint
+    along = (distance ** 2 + upper ** 2 - lower ** 2) / (2 * distance)
+    height = np.sqrt(np.clip(upper ** 2 - along ** 2, 0.0, None))
+
+    x = _normalize(reach)
+    z = sign * _normalize(np.cross(x, pole - start))
+    y = sign * np.cross(z, x)
+
+    upper_vec = along[:, None] * x + height[:, None] * y
+    lower_vec = distance[:, None] * x - upper_vec
+    positions = np.stack(
+        [start, start + upper_vec, start + distance[:, None] * x], axis=1)
+
+    frames = np.empty((len(start), 2, 3, 3))
+    for index, bone in enumerate((upper_vec, lower_vec)):
+        aim = _normalize(bone)
+        frames[:, index] = np.stack([aim, np.cross(z, aim), z], axis=1)
+    return positions, frames
+
+
+def parity(limb, poses):
+    """
+    Pose a limb built with the analytic solver, and a duplicate of its
+    joints driven by an RP solver handle, through sampled controller
+    positions, and measure how far apart their joints end up
+
+    :param limb: limbIK.LimbIK. built limb, root, pole and end controllers
+                 in that order
+    :param poses: list. (root, pole, end) world translations per pose
+    :return: float. largest joint position difference over the poses
+    """
+    reference = cmds.duplicate(limb.jnts[0], rr=1)
+    constraints = cmds.listRelatives(reference[0], ad=1, type='constraint')
+    if constraints:
+        cmds.delete(constraints)
+    chain = [reference[0]] + list(reversed(cmds.listRelatives(
+        reference[0], ad=1, type='joint') or list()))
+    handle = cmds.ikHandle(sj=chain[0], ee=chain[-1], sol='ikRPsolver')[0]
+    temps = [reference[0], handle]
+    temps.extend(cmds.pointConstraint(limb.ctrls[0], chain[0], mo=1))
+    temps.extend(cmds.pointConstraint(limb.ctrls[-1], handle, mo=1))
+    temps.extend(cmds.poleVectorConstraint(limb.ctrls[1], handle))
+
+    rest = [cmds.xform(ctrl, q=1, t=1, ws=1) for ctrl in limb.ctrls]
+    error = 0.0
+    try:
+        for pose in poses:
+            for ctrl, position in zip(limb.ctrls, pose):
+                cmds.xform(ctrl, t=list(position), ws=1)
+            for solved, expected in zip(limb.jnts, chain):
+                delta = np.subtract(cmds.xform(solved, q=1, t=1, ws=1),
+                                    cmds.xform(expected, q=1, t=1, ws=1))
+                error = max(error, float(np.linalg.norm(delta)))
+    finally:
+        for ctrl, position in zip(limb.ctrls, rest):
+            cmds.xform(ctrl, t=position, ws=1)
+        cmds.delete([node for node in temps if cmds.objExists(node)])
+    return error
+
+
+def sample_poses(limb, count=32, spread=0.5, seed=0):
+    """
+    Random controller positions around the rest pose of a built limb
+
+    :param limb: limbIK.LimbIK. built limb
+    :param count: int. number of poses
+    :param spread: float. offset range as a fraction of the limb length
+    :param seed: int. random seed, so runs compare
+    :return: list. (root, pole, end) world translations per pose
+    """
+    rest = np.array([cmds.xform(ctrl, q=1, t=1, ws=1)
+                     for ctrl in limb.ctrls])
+    length = np.linalg.norm(np.diff(rest, axis=0), axis=1).sum()
+    offsets = np.random.RandomState(seed).uniform(
+        -spread * length, spread * length, (count, 3, 3))
+    return (rest + offsets).tolist()
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1)[:, None]
+    norms[norms == 0] = 1.0
+    return vectors / norms
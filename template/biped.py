@@ -1,6 +1,4 @@
-import maya.cmds as cmds
 
-from .. import util
 from ..base import base, bone
 from ..chain.limb.arm import arm
 from ..chain.limb.leg import leg
@@ -56,70 +54,83 @@ class Biped(bone.Bone):
             self.tip
         ]
 
-    def create_locator(self):
+    def layout(self):
         """
-        Extend: create and then move all locators
+        Extend: move all the roots of locators accordingly
         """
-        super(Biped, self).create_locator()
-        self.move_locator()
+        result = super(Biped, self).layout()
+        x, y, z = self.pos
+        top = y + self.s_len
+        roots = [
+            (self.l_arm.limb.locs[0], [x+2, top, z]),
+            (self.r_arm.limb.locs[0], [x-2, top, z]),
+            (self.l_leg.limb.locs[0], [x+1, y, z]),
+            (self.r_leg.limb.locs[0], [x-1, y, z]),
+            (self.spine.locs[0], [x, y, z]),
+            (self.neck.locs[0], [x, top+1, z]),
+            (self.head.locs[0], [x, top+1.5, z]),
+            (self.tip.locs[0], [x, top+2, z])
+        ]
+        for loc, pos in roots:
+            result.move(loc, pos)
+        return result
 
-    def move_locator(self):
+    def joint_links(self):
         """
-        Move all the roots of locators accordingly
+        Override: legs to spine root, arms, neck, head and tip to the top
         """
-        util.move(self.l_arm.limb.locs[0],
-                  pos=[self.pos[0]+2, self.pos[1]+self.s_len, self.pos[2]])
-        util.move(self.r_arm.limb.locs[0],
-                  pos=[self.pos[0]-2, self.pos[1]+self.s_len, self.pos[2]])
-
-        util.move(self.l_leg.limb.locs[0],
-                  pos=[self.pos[0]+1, self.pos[1], self.pos[2]])
-        util.move(self.r_leg.limb.locs[0],
-                  pos=[self.pos[0]-1, self.pos[1], self.pos[2]])
-
-        util.move(self.spine.locs[0], pos=self.pos)
-
-        util.move(self.neck.locs[0],
-                  pos=[self.pos[0], self.pos[1]+self.s_len+1, self.pos[2]])
-        util.move(self.head.locs[0],
-                  pos=[self.pos[0], self.pos[1]+self.s_len+1.5, self.pos[2]])
-        util.move(self.tip.locs[0],
-                  pos=[self.pos[0], self.pos[1]+self.s_len+2, self.pos[2]])
-
-    def create_joint(self):
+        return [
+            # leg root to spine root
+            (self.l_leg.limb.jnts[0], self.spine.jnts[0]),
+            (self.r_leg.limb.jnts[0], self.spine.jnts[0]),
+
+            # arm root to spine top
+            (self.l_arm.limb.jnts[0], self.spine.jnts[-1]),
+            (self.r_arm.limb.jnts[0], self.spine.jnts[-1]),
+
+            # neck to spine top, head to neck
+            (self.neck.jnts[0], self.spine.jnts[-1]),
+            (self.head.jnts[0], self.neck.jnts[0]),
+            (self.tip.jnts[0], self.head.jnts[0])
+        ]
+
+    def controller_links(self):
         """
-        Create all the joints from all the rig components
+        Override: limbs and head driven by spine controls, the head and tip
+        offsets sit in the offsets of the neck and head, not under their
+        controllers
         """
-        super(Biped, self).create_joint()
-
-        # leg root to spine root
-        cmds.parent(self.l_leg.limb.jnts[0], self.spine.jnts[0])
-        cmds.parent(self.r_leg.limb.jnts[0], self.spine.jnts[0])
-
-        # arm root to spine top
-        cmds.parent(self.l_arm.limb.jnts[0], self.spine.jnts[-1])
-        cmds.parent(self.r_arm.limb.jnts[0], self.spine.jnts[-1])
-
-        # neck to spine top, head to neck
-        cmds.parent(self.neck.jnts[0], self.spine.jnts[-1])
-        cmds.parent(self.head.jnts[0], self.neck.jnts[0])
-        cmds.parent(self.tip.jnts[0], self.head.jnts[0])
+        top = self.spine.ctrls[-1]
+        neck = self.neck.offset_parent(0, top)
+        head = self.head.offset_parent(0, neck)
+        return [
+            # leg driven by root spine control #
+            (self.l_leg.limb.offsets[0], self.spine.ctrls[0]),
+            (self.r_leg.limb.offsets[0], self.spine.ctrls[0]),
+
+            # arm driven by top spine control #
+            (self.l_arm.limb.offsets[0], self.spine.ctrls[-1]),
+            (self.r_arm.limb.offsets[0], self.spine.ctrls[-1]),
+
+            # neck to head chain #
+            (self.tip.offsets[0], head),
+            (self.head.offsets[0], neck),
+            (self.neck.offsets[0], top)
+        ]
 
-    def add_constraint(self):
+    def dependents(self, comp):
         """
-        Add constraints to connect all the rig components
+        Override: the components only connect through parent links
         """
-        super(Biped, self).add_constraint()
-
-        # leg driven by root spine control #
-        cmds.parent(self.l_leg.limb.offsets[0], self.spine.ctrls[0])
-        cmds.parent(self.r_leg.limb.offsets[0], self.spine.ctrls[0])
-
-        # arm driven by top spine control #
-        cmds.parent(self.l_arm.limb.offsets[0], self.spine.ctrls[-1])
-        cmds.parent(self.r_arm.limb.offsets[0], self.spine.ctrls[-1])
+        return list()
 
-        # neck to head chain #
-        cmds.parent(self.tip.offsets[0], self.head.offsets[0])
-        cmds.parent(self.head.offsets[0], self.neck.offsets[0])
-        cmds.parent(self.neck.offsets[0], self.spine.ctrls[-1])
+    def connect_components(self, comps):
+        """
+        Extend: level of detail switch for the secondary systems
+        """
+        super(Biped, self).connect_components(comps)
+        self.add_lod(self.spine.ctrls[0], [
+            self.spine,
+            self.l_arm.hand,
+            self.r_arm.hand
+        ], comps)
@@ -1,13 +1,11 @@
 import maya.cmds as cmds
 
-from .. import util
 from ..base import base, bone
 from ..chain import tail
 from ..chain.limb.leg import legFront
 from ..chain.limb.leg import legBack
 from ..chain.spine import spineQuad
 from ..constant import Side, ATTRS
-from ..utility.common import hierarchy
 
 
 class QuadrupedItem(base.BaseItem):
@@ -59,89 +57,105 @@ class Quadruped(bone.Bone):
             self.tip
         ]
 
-    def create_locator(self):
+    def layout(self):
         """
-        Extend: create and then move all locators
+        Extend: move all the roots of locators accordingly
         """
-        super(Quadruped, self).create_locator()
-        self.move_locator()
+        result = super(Quadruped, self).layout()
+        x, y, z = [0, 0, 0]
+        roots = [
+            (self.l_arm.locs[0], [1+x, 5+y, 3+z]),
+            (self.r_arm.locs[0], [-1+x, 5+y, 3+z]),
+            (self.l_leg.locs[0], [1+x, 5+y, -3+z]),
+            (self.r_leg.locs[0], [-1+x, 5+y, -3+z]),
+            (self.spine.locs[0], [x, 6+y, -3+z]),
+            (self.tail.locs[0], [x, 6+y, -4+z]),
+            (self.neck.locs[0], [x, 6.5+y, 3.5+z]),
+            (self.head.locs[0], [x, 7.5+y, 4+z]),
+            (self.tip.locs[0], [x, 7.5+y, 6+z])
+        ]
+        for loc, pos in roots:
+            result.move(loc, pos)
+
+        result.rotate(self.head.locs[0], [90, 0, 0])
+        result.rotate(self.tip.locs[0], [90, 0, 0])
+        return result
 
-    def move_locator(self):
+    def joint_links(self):
         """
-        Move all the roots of locators accordingly
+        Override: legs, tail, neck, head and tip to the spine
         """
-        pos = [0, 0, 0]
-
-        util.move(self.l_arm.locs[0], pos=[1+pos[0], 5+pos[1], 3+pos[2]])
-        util.move(self.r_arm.locs[0], pos=[-1+pos[0], 5+pos[1], 3+pos[2]])
-        util.move(self.l_leg.locs[0], pos=[1+pos[0], 5+pos[1], -3+pos[2]])
-        util.move(self.r_leg.locs[0], pos=[-1+pos[0], 5+pos[1], -3+pos[2]])
-
-        util.move(self.spine.locs[0], pos=[pos[0], 6+pos[1], -3+pos[2]])
-        util.move(self.tail.locs[0], pos=[pos[0], 6+pos[1], -4+pos[2]])
-
-        util.move(self.neck.locs[0], pos=[pos[0], 6.5+pos[1], 3.5+pos[2]])
-        util.move(self.head.locs[0], pos=[pos[0], 7.5+pos[1], 4+pos[2]])
-        util.move(self.tip.locs[0], pos=[pos[0], 7.5+pos[1], 6+pos[2]])
-
-        cmds.rotate(90, 0, 0, self.head.locs[0])
-        cmds.rotate(90, 0, 0, self.tip.locs[0])
+        return [
+            # parent leg root joints to root spline joint
+            (self.l_arm.jnts[0], self.spine.jnts[-1]),
+            (self.r_arm.jnts[0], self.spine.jnts[-1]),
+
+            # parent arm root joints to top spline joint
+            (self.l_leg.jnts[0], self.spine.jnts[0]),
+            (self.r_leg.jnts[0], self.spine.jnts[0]),
+
+            # parent tail to spine
+            (self.tail.jnts[0], self.spine.jnts[0]),
+
+            # parent neck, head, tip
+            (self.neck.jnts[0], self.spine.jnts[-1]),
+            (self.head.jnts[0], self.neck.jnts[0]),
+            (self.tip.jnts[0], self.head.jnts[0])
+        ]
 
-    def create_joint(self):
+    def controller_links(self):
         """
-        Create all the joints from all the rig components
+        Override: legs and head under spine controls
         """
-        super(Quadruped, self).create_joint()
-
-        # parent leg root joints to root spline joint
-        hierarchy.batch_parent(
-            [self.l_arm.jnts[0], self.r_arm.jnts[0]],
-            self.spine.jnts[-1])
-
-        # parent arm root joints to top spline joint
-        hierarchy.batch_parent(
-            [self.l_leg.jnts[0], self.r_leg.jnts[0]],
-            self.spine.jnts[0])
-
-        # parent tail to spine
-        cmds.parent(self.tail.jnts[0], self.spine.jnts[0])
-
-        # parent neck, head, tip
-        cmds.parent(self.neck.jnts[0], self.spine.jnts[-1])
-        cmds.parent(self.head.jnts[0], self.neck.jnts[0])
-        cmds.parent(self.tip.jnts[0], self.head.jnts[0])
+        return [
+            # parenting the front and back leg under spine ctrl
+            (self.l_arm.offsets[0], self.spine.ctrls[-1]),
+            (self.r_arm.offsets[0], self.spine.ctrls[-1]),
+            (self.l_leg.offsets[0], self.spine.ctrls[0]),
+            (self.r_leg.offsets[0], self.spine.ctrls[0]),
+
+            # parent head up
+            (self.neck.offsets[0], self.spine.ctrls[-1]),
+            (self.head.offsets[0], self.neck.ctrls[0]),
+            (self.tip.offsets[0], self.head.ctrls[0])
+        ]
 
-    def place_controller(self):
+    def dependents(self, comp):
         """
-        Create and place all the joints from all the rig components
-        add switch controller for spine root to tail connection
+        Override: the tail follows the spine root control
         """
-        super(Quadruped, self).place_controller()
-        cmds.addAttr(
-            self.spine.ctrls[0],
-            sn='sw', ln=ATTRS['sw'], at='double',
-            dv=1, min=0, max=1,
-            k=1)
-
-    def add_constraint(self):
+        if comp is self.spine:
+            return [self.tail]
+        return list()
+
+    def connect_components(self, comps):
         """
-        Add constraints to connect all the rig components
+        Extend: tail driven by the spine, with a switch controller on the
+        spine root, and level of detail switch for the secondary systems
         """
-        super(Quadruped, self).add_constraint()
-
-        # parenting the front and back leg and tail under spine ctrl
-        hierarchy.batch_parent(
-            [self.l_arm.offsets[0], self.r_arm.offsets[0]],
-            self.spine.ctrls[-1])
-        hierarchy.batch_parent(
-            [self.l_leg.offsets[0], self.r_leg.offsets[0]],
-            self.spine.ctrls[0])
-        cmds.parentConstraint(self.spine.ctrls[0], self.tail.ctrls[0], mo=1)
-
-        # hide tail ctrl and connect ik/fk switch to spine master ctrl
-        cmds.connectAttr(self.spine.ctrls[0]+'.sw', self.tail.ctrls[0]+'.sw')
-
-        # parent head up
-        cmds.parent(self.neck.offsets[0], self.spine.ctrls[-1])
-        cmds.parent(self.head.offsets[0], self.neck.ctrls[0])
-        cmds.parent(self.tip.offsets[0], self.head.ctrls[0])
+        super(Quadruped, self).connect_components(comps)
+
+        if self.tail in comps:
+            cmds.parentConstraint(
+                self.spine.ctrls[0], self.tail.ctrls[0], mo=1)
+
+            # hide tail ctrl and connect ik/fk switch to spine master ctrl
+            if not cmds.attributeQuery(
+                    ATTRS['sw'], node=self.spine.ctrls[0], exists=1):
+                cmds.addAttr(
+                    self.spine.ctrls[0],
+                    sn='sw', ln=ATTRS['sw'], at='double',
+                    dv=1, min=0, max=1,
+                    k=1)
+            cmds.connectAttr(
+                self.spine.ctrls[0]+'.sw', self.tail.ctrls[0]+'.sw')
+
+        # level of detail switch for the secondary systems
+        self.add_lod(self.spine.ctrls[0], [
+            self.spine,
+            self.l_arm,
+            self.r_arm,
+            self.l_leg,
+            self.r_leg,
+            self.tail
+        ], comps)
@@ -0,0 +1,55 @@
+"""
+Test fixtures
+
+Rigs build headless against the in-memory scene backend, installed here
+before any rig module gets imported; the rig modules still need the
+utility submodule and a Qt binding. Under mayapy, maya's own cmds is kept
+aside first for the tests that check a rig against maya itself.
+"""
+
+import pytest
+
+from .. import backend
+from ..backend import memory
+
+try:
+    import maya.cmds as maya_cmds
+except ImportError:
+    maya_cmds = None
+
+backend.use_memory()
+
+
+@pytest.fixture
+def scene():
+    """
+    A fresh in-memory scene with the outliner groups, bound to the package
+    for the duration of a test
+    """
+    from .. import util
+
+    scene = memory.Scene()
+    with backend.using(scene):
+        util.create_outliner_grp()
+        yield scene
+
+
+@pytest.fixture
+def maya_scene():
+    """
+    A new maya scene with the outliner groups, bound to the package for the
+    duration of a test; skips the test outside of maya
+    """
+    if maya_cmds is None:
+        pytest.skip('needs maya')
+    if not hasattr(maya_cmds, 'file'):
+        # mayapy only fills maya.cmds in once standalone is up
+        import maya.standalone
+        maya.standalone.initialize()
+
+    from .. import util
+
+    maya_cmds.file(new=1, force=1)
+    with backend.using(maya_cmds):
+        util.create_outliner_grp()
+        yield maya_cmds
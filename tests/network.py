@@ -0,0 +1,242 @@
+"""
+Utility node network evaluation
+
+The memory backend records the node graph without evaluating it. This
+pulls plug values through the recorded connections for the math nodes the
+builders wire, so that a network can be checked against its NumPy
+reference. Matrices follow maya's row-vector layout.
+"""
+
+import re
+
+import numpy as np
+
+from ..backend import memory
+
+
+CHANNELS = ('XYZ', 'RGB')
+
+# values of unset inputs, per node type and attribute
+DEFAULTS = {
+    'multiplyDivide': {'operation': 1, 'input2': [1.0, 1.0, 1.0]},
+    'plusMinusAverage': {'operation': 1},
+    'vectorProduct': {'operation': 1, 'normalizeOutput': 0},
+}
+
+ELEMENT = re.compile(r'^(\w+)\[(\d+)\]$')
+
+
+class Network(object):
+    """
+    Plug values of an in-memory scene
+    """
+
+    def __init__(self, scene):
+        """
+        Initialization
+
+        :param scene: memory.Scene. scene holding the network
+        """
+        self.scene = scene
+        self.outputs = {
+            'multMatrix': self._mult_matrix,
+            'decomposeMatrix': self._decompose_matrix,
+            'distanceBetween': self._distance_between,
+            'clamp': self._clamp,
+            'multiplyDivide': self._multiply_divide,
+            'plusMinusAverage': self._plus_minus_average,
+            'vectorProduct': self._vector_product,
+            'fourByFourMatrix': self._four_by_four,
+        }
+
+    def value(self, plug):
+        """
+        :param plug: str. node.attribute
+        :return: float or np.ndarray. scalar, (3,) vector or (4, 4) matrix
+        """
+        name, attr = plug.split('.', 1)
+        return self.get(self.scene._node(name), attr)
+
+    def get(self, node, attr, default=None):
+        """
+        Value of an attribute: from its source when connected, computed
+        for a node output, else as set, taken from its parent compound or
+        assembled from its children, else defaulted
+
+        :param node: memory.Node. node
+        :param attr: str. attribute name
+        :param default: object. value of an unset input
+        :return: float or np.ndarray. the value
+        """
+        value = self._own(node, attr)
+        if value is not None:
+            return value
+
+        for channels in CHANNELS:
+            if len(attr) > 1 and attr[-1] in channels:
+                parent = self._own(node, attr[:-1])
+                if parent is not None:
+                    return parent[channels.index(attr[-1])]
+
+            children = [attr + channel for channel in channels]
+            if any(child in node.attrs or (node, child) in
+                   self.scene.connections for child in children):
+                base = _array(DEFAULTS.get(node.type, {}).get(
+                    attr, [0.0, 0.0, 0.0]))
+                return np.array([
+                    self.get(node, child, base[index])
+                    for index, child in enumerate(children)])
+
+        if default is None:
+            default = DEFAULTS.get(node.type, {}).get(attr, 0.0)
+        return _array(default)
+
+    def elements(self, node, attr):
+        """
+        :param node: memory.Node. node
+        :param attr: str. multi attribute name
+        :return: list. values of the set or connected elements, by index
+        """
+        indices = set()
+        keys = list(node.attrs) + [
+            key[1] for key in self.scene.connections if key[0] is node]
+        for key in keys:
+            match = ELEMENT.match(key)
+            if match and match.group(1) == attr:
+                indices.add(int(match.group(2)))
+        return [self.get(node, '{}[{}]'.format(attr, index))
+                for index in sorted(indices)]
+
+    def _own(self, node, attr):
+        # the attribute itself: connected, computed or set, None otherwise
+        source = self.scene.connections.get((node, attr))
+        if source:
+            return self.get(source[0], source[1])
+
+        compute = self.outputs.get(node.type)
+        value = compute(node, attr) if compute else None
+        if value is None and node.is_transform:
+            value = self._transform_matrix(node, attr)
+        if value is None and attr in node.attrs:
+            value = _array(node.attrs[attr])
+        return value
+
+    def _transform_matrix(self, node, attr):
+        attr = re.sub(r'\[\d+\]$', '', node.resolve(attr))
+        scene = self.scene
+        if attr == 'worldMatrix':
+            return _matrix(scene._world(node))
+        if attr == 'worldInverseMatrix':
+            return np.linalg.inv(_matrix(scene._world(node)))
+        if attr == 'parentMatrix':
+            return _matrix(scene._parent_world(node))
+        if attr == 'parentInverseMatrix':
+            return np.linalg.inv(_matrix(scene._parent_world(node)))
+        return None
+
+    # ------------------------------------------------------------------
+    # node outputs
+    # ------------------------------------------------------------------
+
+    def _mult_matrix(self, node, attr):
+        if attr != 'matrixSum':
+            return None
+        result = np.eye(4)
+        for matrix in self.elements(node, 'matrixIn'):
+            result = result.dot(_matrix(matrix))
+        return result
+
+    def _decompose_matrix(self, node, attr):
+        if attr not in ('outputTranslate', 'outputRotate'):
+            return None
+        matrix = _matrix(self.get(node, 'inputMatrix', np.eye(4)))
+        if attr == 'outputTranslate':
+            return matrix[3, :3].copy()
+        rotation = matrix[:3, :3] / np.linalg.norm(
+            matrix[:3, :3], axis=1)[:, None]
+        flat = np.eye(4)
+        flat[:3, :3] = rotation
+        return np.array(memory._euler(flat.ravel().tolist()))
+
+    def _distance_between(self, node, attr):
+        if attr != 'distance':
+            return None
+        first = self._point(node, '1')
+        second = self._point(node, '2')
+        return float(np.linalg.norm(second - first))
+
+    def _point(self, node, index):
+        point = self.get(node, 'point' + index, [0.0, 0.0, 0.0])
+        matrix = _matrix(self.get(node, 'inMatrix' + index, np.eye(4)))
+        return np.append(point, 1.0).dot(matrix)[:3]
+
+    def _clamp(self, node, attr):
+        if attr != 'output':
+            return None
+        values = [self.get(node, 'input' + channel)
+                  for channel in CHANNELS[1]]
+        low = [self.get(node, 'min' + channel) for channel in CHANNELS[1]]
+        high = [self.get(node, 'max' + channel) for channel in CHANNELS[1]]
+        return np.clip(values, low, high)
+
+    def _multiply_divide(self, node, attr):
+        if attr != 'output':
+            return None
+        first = self.get(node, 'input1', [0.0, 0.0, 0.0])
+        second = self.get(node, 'input2', [1.0, 1.0, 1.0])
+        operation = int(self.get(node, 'operation'))
+        if operation == 2:
+            return first / second
+        if operation == 3:
+            return first ** second
+        return first * second
+
+    def _plus_minus_average(self, node, attr):
+        if attr not in ('output1D', 'output3D'):
+            return None
+        values = self.elements(node, 'input' + attr[-2:])
+        if not values:
+            return 0.0 if attr == 'output1D' else np.zeros(3)
+        operation = int(self.get(node, 'operation'))
+        if operation == 2:
+            return values[0] - sum(values[1:])
+        if operation == 3:
+            return sum(values) / float(len(values))
+        return sum(values)
+
+    def _vector_product(self, node, attr):
+        if attr != 'output':
+            return None
+        first = self.get(node, 'input1', [0.0, 0.0, 0.0])
+        second = self.get(node, 'input2', [0.0, 0.0, 0.0])
+        operation = int(self.get(node, 'operation'))
+        if operation == 1:
+            result = np.array([first.dot(second)] * 3)
+        elif operation == 2:
+            result = np.cross(first, second)
+        else:
+            result = first
+        if self.get(node, 'normalizeOutput'):
+            norm = np.linalg.norm(result)
+            result = result / norm if norm else result
+        return result
+
+    def _four_by_four(self, node, attr):
+        if attr != 'output':
+            return None
+        matrix = np.eye(4)
+        for row in range(4):
+            for column in range(4):
+                matrix[row, column] = self.get(
+                    node, 'in{}{}'.format(row, column), matrix[row, column])
+        return matrix
+
+
+def _array(value):
+    if isinstance(value, (list, tuple)):
+        return np.array(value, dtype=np.float64)
+    return value
+
+
+def _matrix(value):
+    return np.reshape(np.asarray(value, dtype=np.float64), (4, 4))
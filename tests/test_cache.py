@@ -0,0 +1,144 @@
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+from .. import util
+from ..base import cache, guide
+from ..chain import chainEP, chainFKIK, chainIK
+from ..chain.limb import limbIK
+from ..chain.limb.leg import legQuad
+from ..chain.spine import spine
+from ..constant import (Side, Offset, Blend, IKSolver, Falloff,
+                        CurveDriver, VERSION)
+
+
+def chain_ik(**kwargs):
+    return chainIK.ChainIK(Side.LEFT, 'chain', 4, 6.0, [0, 1, 0], **kwargs)
+
+
+def offset_mode(mode):
+    def create():
+        rig = chain_ik()
+        rig.set_offset_mode(mode)
+        return rig
+    return create
+
+
+# (default build, build with one option changed)
+CASES = [
+    (chain_ik, lambda: chain_ik(is_stretch=1)),
+    (chain_ik, lambda: chain_ik(driver=CurveDriver.MATRIX)),
+    (lambda: spine.Spine(Side.MIDDLE, 'spine'),
+     lambda: spine.Spine(Side.MIDDLE, 'spine', driver=CurveDriver.MATRIX)),
+    (offset_mode(Offset.GROUP), offset_mode(Offset.MATRIX)),
+    (lambda: chainFKIK.ChainFKIK(Side.LEFT, 'tail', 4, 6.0, [0, 0, -1]),
+     lambda: chainFKIK.ChainFKIK(Side.LEFT, 'tail', 4, 6.0, [0, 0, -1],
+                                 blend=Blend.UTILITY)),
+    (lambda: limbIK.LimbIK(Side.LEFT, 'arm', 6, ltype='arm'),
+     lambda: limbIK.LimbIK(Side.LEFT, 'arm', 6, ltype='arm',
+                           solver=IKSolver.ANALYTIC)),
+    (lambda: chainEP.ChainEP(Side.LEFT, 'rope', 6, 'curve1'),
+     lambda: chainEP.ChainEP(Side.LEFT, 'rope', 6, 'curve1',
+                             mode=Falloff.MATRIX)),
+    (lambda: legQuad.LegQuad(Side.LEFT, 'leg', 6, 1),
+     lambda: legQuad.LegQuad(Side.LEFT, 'leg', 6, 1, is_front=1)),
+]
+
+
+def key(rig, folder):
+    rig.create_namespace()
+    snapshot = guide.Snapshot(list(), np.empty((0, 4, 4)))
+    return cache.Cache(root=folder).key(rig, snapshot)
+
+
+@pytest.mark.parametrize('default, changed', CASES)
+def test_key_changes_with_each_option(scene, tmp_path, default, changed):
+    folder = str(tmp_path)
+    assert key(default(), folder) == key(default(), folder)
+    assert key(changed(), folder) != key(default(), folder)
+
+
+def entry(store, key, size, age):
+    """
+    Write a cache entry of a given size, last used some seconds ago
+
+    :return: str. file path of the entry
+    """
+    if not os.path.isdir(store.folder):
+        os.makedirs(store.folder)
+    path = store.path(key)
+    with open(path, 'w') as f:
+        f.write('x' * size)
+    with open(cache._roots(path), 'w') as f:
+        f.write('{}')
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_evict_drops_least_recently_used(tmp_path):
+    store = cache.Cache(root=str(tmp_path), limit=250)
+    old, used, new = [entry(store, key, 100, age)
+                      for key, age in (('old', 30), ('used', 20), ('new', 10))]
+
+    # a fetch makes an entry the most recently used one
+    assert store.fetch('used') == used
+    assert store.evict() == [old]
+    assert store.entries() == [new, used]
+
+    store.limit = 0
+    assert store.evict() == [new]
+    assert store.entries() == [used]
+
+
+def test_evict_keeps_the_newest_entry_over_the_limit(tmp_path):
+    store = cache.Cache(root=str(tmp_path), limit=10)
+    path = entry(store, 'big', 100, 0)
+
+    assert store.evict() == list()
+    assert store.fetch('big') == path
+
+
+def test_invalidate_drops_other_versions(tmp_path):
+    store = cache.Cache(root=str(tmp_path))
+    current = entry(store, 'current', 10, 0)
+    stale = str(tmp_path / '0.1')
+    os.makedirs(stale)
+
+    assert store.invalidate() == [stale]
+    assert not os.path.exists(stale)
+    assert store.entries() == [current]
+    assert os.path.basename(store.folder) == VERSION
+
+
+def test_store_fetch_and_load(scene, tmp_path):
+    root = scene.joint(p=[0, 0, 0], n='root')
+    scene.joint(p=[0, 2, 0], n='end')
+    scene.parent(root, util.G_JNT_GRP)
+    exported = list()
+
+    # memory scenes have no files, export the selection and import it back
+    def file(path, **kwargs):
+        if kwargs.get('exportSelected'):
+            exported.extend(scene.ls(sl=1))
+            with open(path, 'w') as f:
+                f.write(' '.join(exported))
+            return path
+        scene.joint(p=[0, 0, 0], n='root')
+        return ['|root']
+    scene.file = file
+
+    store = cache.Cache(root=str(tmp_path), limit=0)
+    path = store.store('key', [root, 'missing'])
+    assert exported == [root]
+    assert store.fetch('key') == path
+    assert store.fetch('other') is None
+    with open(cache._roots(path)) as f:
+        assert json.load(f) == {root: util.G_JNT_GRP}
+
+    scene.delete(root)
+    assert store.load(path) == [root]
+    assert scene.listRelatives(root, p=1) == [util.G_JNT_GRP]
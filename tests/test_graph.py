@@ -0,0 +1,29 @@
+import pytest
+
+from ..base import graph
+from ..chain import chainIK
+from ..constant import Side, CurveDriver, Offset
+
+
+@pytest.mark.parametrize('driver', [CurveDriver.CLUSTER, CurveDriver.MATRIX])
+@pytest.mark.parametrize('mode', [Offset.GROUP, Offset.MATRIX])
+def test_chain_ik_stretch_is_acyclic(scene, driver, mode):
+    rig = chainIK.ChainIK(Side.MIDDLE, 'stretch', 6, 10.0, [0, 1, 0],
+                          is_stretch=1, driver=driver)
+    rig.set_offset_mode(mode)
+    rig.build_guide()
+    rig.build_rig()
+
+    assert graph.cycles(rig.registry.nodes()) == list()
+
+
+def test_cycles_finds_a_loop(scene):
+    first = scene.createNode('transform', n='first')
+    second = scene.createNode('transform', n='second')
+    scene.connectAttr(first+'.tx', second+'.tx')
+    scene.connectAttr(second+'.ty', first+'.ty')
+
+    assert [sorted(cycle) for cycle in graph.cycles([first, second])] == \
+        [['first', 'second']]
+    with pytest.raises(RuntimeError):
+        graph.assert_acyclic([first, second])
@@ -0,0 +1,142 @@
+"""
+The guide layouts against the locator placement they replaced, replayed
+below command by command
+"""
+
+import numpy as np
+import pytest
+
+from .. import backend, util
+from ..backend import memory
+from ..chain import chainFK, finger
+from ..chain.limb.arm import arm
+from ..chain.limb.leg import leg, legQuad
+from ..constant import Side
+from ..module import hand
+
+
+def base_locators(cmds, rig):
+    cmds.spaceLocator(n=rig.locs[0])
+    util.uniform_scale(rig.locs[0], rig._scale)
+    cmds.parent(rig.locs[0], util.G_LOC_GRP)
+
+
+def chain_locators(cmds, rig):
+    for index in range(rig.segment):
+        cmds.spaceLocator(n=rig.locs[index])
+        if not index:
+            util.uniform_scale(rig.locs[index], rig._scale)
+        else:
+            cmds.parent(rig.locs[index], rig.locs[index-1], r=1)
+            util.move(rig.locs[index], (rig.interval * rig.dir).as_list)
+    cmds.parent(rig.locs[0], util.G_LOC_GRP)
+
+
+def leg_quad_locators(cmds, rig):
+    for loc in rig.locs:
+        cmds.spaceLocator(n=loc)
+
+    cmds.parent(rig.locs[1], rig.locs[0], r=1)
+    cmds.move(0, -rig.distance, 0, rig.locs[1], r=1)
+    if rig.is_front:
+        cmds.move(0, 0, -0.5 * rig.distance, rig.locs[1], r=1)
+
+    cmds.parent(rig.locs[2], rig.locs[1], r=1)
+    cmds.move(0, -rig.distance, 0, rig.locs[2], r=1)
+    if not rig.is_front:
+        cmds.move(0, 0, -0.5 * rig.distance, rig.locs[2], r=1)
+
+    cmds.parent(rig.locs[3], rig.locs[2], r=1)
+    cmds.move(0, -rig.distance+rig.height, 0, rig.locs[3], r=1)
+    if rig.is_front:
+        cmds.move(0, 0, 0.5 * rig.distance, rig.locs[3], r=1)
+
+    cmds.parent(rig.locs[4], rig.locs[3], r=1)
+    cmds.move(0, 0, 0.5 * rig.distance, rig.locs[4], r=1)
+    cmds.parent(rig.locs[0], util.G_LOC_GRP)
+
+
+def foot_locators(cmds, rig):
+    side = 1 if rig.side == Side.LEFT else -1
+    cmds.spaceLocator(n=rig.locs[0])
+    for index, parent, offset in (
+            (1, 0, [0, -rig.height, rig.interval]),
+            (2, 1, [0, 0, 2 * rig.interval]),
+            (3, 1, [-side * rig.interval, 0, 0]),
+            (4, 1, [side * rig.interval, 0, 0]),
+            (5, 1, [0, 0, -1.5 * rig.interval])):
+        cmds.spaceLocator(n=rig.locs[index])
+        cmds.parent(rig.locs[index], rig.locs[parent], r=1)
+        cmds.move(offset[0], offset[1], offset[2], rig.locs[index], r=1)
+    cmds.parent(rig.locs[0], util.G_LOC_GRP)
+
+
+def hand_locators(cmds, rig):
+    base_locators(cmds, rig.wrist)
+    for obj in rig.fingers:
+        chain_locators(cmds, obj)
+    side = -1 if rig.side == Side.RIGHT else 1
+
+    util.move(rig.thumb.locs[0], [0, 0, 2 * rig.interval])
+    util.move(rig.index.locs[0], [0, 0, 1 * rig.interval])
+    util.move(rig.ring.locs[0], [0, 0, -1 * rig.interval])
+    util.move(rig.pinky.locs[0], [0, 0, -2 * rig.interval])
+
+    util.move(rig.wrist.locs[0], [-side * rig.distance, 0, 0])
+    cmds.rotate(0, 0, 90, rig.wrist.locs[0])
+    cmds.parent([obj.locs[0] for obj in rig.fingers], rig.wrist.locs[0])
+
+
+def arm_locators(cmds, rig):
+    hand_locators(cmds, rig.hand)
+    chain_locators(cmds, rig.limb)
+    side = 1 if rig.side == Side.LEFT else -1
+    util.move(rig.hand.wrist.locs[0],
+              [side * (rig.distance+rig.gap), 0, 0])
+    cmds.parent(rig.hand.wrist.locs[0], rig.limb.locs[-1])
+
+
+def leg_locators(cmds, rig):
+    chain_locators(cmds, rig.limb)
+    foot_locators(cmds, rig.foot)
+    util.move(rig.foot.locs[0], [0, -rig.distance, 0])
+    cmds.parent(rig.foot.locs[0], rig.limb.locs[-1])
+
+
+def worlds(build, rig):
+    scene = memory.Scene()
+    with backend.using(scene):
+        util.create_outliner_grp()
+        build(scene)
+        names = [loc for comp in rig.walk() for loc in comp.locs
+                 if scene.objExists(loc)]
+        return dict((name, np.reshape(scene.xform(name, q=1, m=1, ws=1),
+                                      (4, 4))) for name in names)
+
+
+CASES = [
+    (lambda: chainFK.ChainFK(Side.LEFT, 'chain', 4, 2.0, [1, 0, 0]),
+     chain_locators),
+    (lambda: finger.Finger(Side.LEFT, 'finger'), chain_locators),
+    (lambda: legQuad.LegQuad(Side.LEFT, 'back', 6, 1), leg_quad_locators),
+    (lambda: legQuad.LegQuad(Side.LEFT, 'front', 6, 1, is_front=1),
+     leg_quad_locators),
+    (lambda: hand.Hand(Side.LEFT, 'hand'), hand_locators),
+    (lambda: hand.Hand(Side.RIGHT, 'hand'), hand_locators),
+    (lambda: leg.Leg(Side.LEFT, 'leg'), leg_locators),
+    (lambda: arm.Arm(Side.LEFT, 'arm'), arm_locators),
+    (lambda: arm.Arm(Side.RIGHT, 'arm'), arm_locators),
+]
+
+
+@pytest.mark.parametrize('create, baseline', CASES)
+def test_layout_matches_baseline(scene, create, baseline):
+    rig = create()
+    rig.create_namespace()
+
+    expected = worlds(lambda cmds: baseline(cmds, rig), rig)
+    laid_out = worlds(lambda cmds: rig.create_locator(), rig)
+
+    assert sorted(laid_out) == sorted(expected)
+    for name, matrix in expected.items():
+        assert np.allclose(laid_out[name], matrix, atol=1e-6), name
@@ -0,0 +1,49 @@
+from ..base import lod
+from ..chain import chainFKIK
+from ..constant import Side
+from ..template import biped
+
+
+def test_dag_nodes_are_kept(scene):
+    root = scene.joint(p=[0, 0, 0], n='root')
+    end = scene.joint(p=[0, 2, 0], n='end')
+    handle, effector = scene.ikHandle(sj=root, ee=end, n='handle')
+    curve = scene.curve(p=[[0, 0, 0], [0, 2, 0]], d=1, n='curve')
+    cluster = scene.cluster(curve+'.cv[0]', n='cluster')[-1]
+    shape = scene.listRelatives(cluster, s=1)[0]
+    constraint = scene.parentConstraint(root, cluster)[0]
+    blend = scene.createNode('blendColors', n='blend')
+
+    assert lod.is_kept(root)
+    assert lod.is_kept(effector)
+    assert lod.is_kept(shape)
+    assert not lod.is_kept(handle)
+    assert not lod.is_kept(constraint)
+    assert not lod.is_kept(blend)
+
+
+def test_chain_fkik_keeps_result_joints(scene):
+    rig = chainFKIK.ChainFKIK(Side.MIDDLE, 'tail', 5, 8.0, [0, 0, -1])
+    rig.build_guide()
+    rig.build_rig()
+
+    nodes = rig.lod_nodes()
+    assert nodes
+    for jnt in rig.jnts:
+        assert not [name for name in nodes if name.startswith(jnt)]
+    assert rig.ik_chain.ik in nodes
+
+
+def test_biped_lod_blocks_hand_systems(scene):
+    rig = biped.Biped(Side.MIDDLE, 'hero')
+    rig.build_guide()
+    rig.build_rig()
+
+    attr = rig.spine.ctrls[0] + '.lod'
+    nodes = scene.listConnections(attr, s=0, d=1) or list()
+    hands = rig.l_arm.hand.lod_nodes() + rig.r_arm.hand.lod_nodes()
+    assert hands
+    assert set(hands) <= set(nodes)
+    assert scene.ls(nodes) == nodes
+    for node in nodes:
+        assert not lod.is_kept(node)
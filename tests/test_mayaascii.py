@@ -0,0 +1,120 @@
+import re
+
+import pytest
+
+from ..backend import mayaascii
+from ..chain import chainFKIK, chainIK
+from ..constant import Side, Blend
+
+
+CREATE = re.compile(r'^createNode (\w+) -n "([^"]+)"(?: -p "([^"]+)")?;$')
+CONNECT = re.compile(r'^connectAttr "([^".]+)\.[^"]+" "([^".]+)\.[^"]+"')
+
+
+def check(scene, lines):
+    """
+    Every node of the scene is created once, after its parent, and every
+    connection joins created nodes
+
+    :return: set. (source, destination) node pairs of the connections
+    """
+    created = list()
+    for line in lines:
+        match = CREATE.match(line)
+        if match:
+            ntype, name, parent = match.groups()
+            assert parent is None or parent in created, line
+            created.append(name)
+    assert len(created) == len(set(created))
+    assert set(scene.nodes) <= set(created)
+
+    links = set()
+    for line in lines:
+        match = CONNECT.match(line)
+        if match:
+            source, destination = match.groups()
+            assert source in created, line
+            assert destination in created or destination == ':ikSystem', line
+            links.add((source, destination))
+    return links
+
+
+def test_small_scene_statements(scene):
+    root = scene.joint(p=[0, 0, 0], n='root')
+    end = scene.joint(p=[0, 2, 0], n='end')
+    handle, effector = scene.ikHandle(sj=root, ee=end, n='handle')
+    target = scene.spaceLocator(n='target')[0]
+    scene.move(0, 2, 0, target)
+    constraint = scene.parentConstraint(target, handle)[0]
+
+    lines = mayaascii.Writer(scene).lines()
+    check(scene, lines)
+
+    for line in (
+            'createNode joint -n "root";',
+            'createNode joint -n "end" -p "root";',
+            'createNode parentConstraint -n "{}" -p "handle";'.format(
+                constraint),
+            'createNode ikRPsolver -n "ikRPsolver";',
+            'connectAttr "root.scale" "end.inverseScale";',
+            'connectAttr "ikRPsolver.message" "handle.ikSolver";',
+            'connectAttr "ikRPsolver.message" ":ikSystem.sol" -na;',
+            'connectAttr "end.translate" "{}.translate";'.format(effector),
+            'connectAttr "target.translate" '
+            '"{}.target[0].targetTranslate";'.format(constraint),
+            'connectAttr "handle.parentInverseMatrix" '
+            '"{}.constraintParentInverseMatrix";'.format(constraint)):
+        assert line in lines
+
+
+def test_clustered_curve_statements(scene):
+    curve = scene.curve(p=[[0, 0, 0], [0, 1, 0], [0, 2, 0], [0, 3, 0]],
+                        n='curve')
+    scene.cluster(curve+'.cv[0]', n='first')
+    scene.cluster(curve+'.cv[1]', n='second')
+
+    lines = mayaascii.Writer(scene).lines()
+    check(scene, lines)
+
+    assert 'createNode nurbsCurve -n "curveShapeOrig" -p "curve";' in lines
+    assert 'connectAttr "curveShapeOrig.worldSpace" ' \
+        '"firstGroupParts.inputGeometry";' in lines
+    assert 'connectAttr "first.outputGeometry[0]" ' \
+        '"secondGroupParts.inputGeometry";' in lines
+    assert 'connectAttr "second.outputGeometry[0]" ' \
+        '"curveShape.create";' in lines
+    assert 'connectAttr "firstHandleShape.clusterTransforms[0]" ' \
+        '"first.clusterXforms";' in lines
+
+
+@pytest.mark.parametrize('stretch', [0, 1])
+def test_chain_ik_file(scene, stretch):
+    rig = chainIK.ChainIK(Side.LEFT, 'chain', 4, 6.0, [0, 1, 0],
+                          is_stretch=stretch)
+    rig.build_guide()
+    rig.build_rig()
+
+    lines = mayaascii.Writer(scene).lines()
+    links = check(scene, lines)
+
+    assert 'createNode ikSplineSolver -n "ikSplineSolver";' in lines
+    assert ('ikSplineSolver', rig.ik) in links
+    for jnt, parent in zip(rig.jnts[1:], rig.jnts):
+        assert (parent, jnt) in links
+
+
+@pytest.mark.parametrize('blend', [Blend.DRIVEN_KEY, Blend.UTILITY])
+def test_chain_fkik_file(scene, blend):
+    rig = chainFKIK.ChainFKIK(Side.LEFT, 'tail', 4, 6.0, [0, 0, -1],
+                              blend=blend)
+    rig.build_guide()
+    rig.build_rig()
+
+    lines = mayaascii.Writer(scene).lines()
+    links = check(scene, lines)
+
+    for jnt, ik, fk in zip(rig.jnts, rig.ik_chain.jnts, rig.fk_chain.jnts):
+        constraint = scene.listRelatives(jnt, type='parentConstraint')[0]
+        assert (ik, constraint) in links
+        assert (fk, constraint) in links
+        assert (constraint, jnt) in links
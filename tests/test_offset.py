@@ -0,0 +1,38 @@
+from .. import backend, util
+from ..backend import memory
+from ..constant import Side, Offset
+from ..template import biped
+
+
+def build(mode):
+    scene = memory.Scene()
+    with backend.using(scene):
+        util.create_outliner_grp()
+        rig = biped.Biped(Side.MIDDLE, 'hero')
+        rig.set_offset_mode(mode)
+        rig.build_guide()
+        rig.build_rig()
+    return scene, rig
+
+
+def drivers(scene, rig):
+    """
+    :return: dict. closest controller above each controller, by name
+    """
+    # composite components also name the controllers of their parts
+    # they never build themselves
+    ctrls = set(scene.ls([ctrl for comp in rig.walk() for ctrl in comp.ctrls]))
+    result = dict()
+    for ctrl in ctrls:
+        parent = scene.listRelatives(ctrl, p=1)
+        while parent and parent[0] not in ctrls:
+            parent = scene.listRelatives(parent[0], p=1)
+        result[ctrl] = parent[0] if parent else None
+    return result
+
+
+def test_biped_matrix_mode_keeps_controller_hierarchy():
+    group = drivers(*build(Offset.GROUP))
+    matrix = drivers(*build(Offset.MATRIX))
+
+    assert matrix == group
@@ -0,0 +1,47 @@
+import numpy as np
+
+from .. import backend, util
+from ..backend import memory
+from ..chain import chainEP
+from ..constant import Side
+
+
+def rope():
+    return chainEP.ChainEP(Side.LEFT, 'rope', 6, 'curve1', cv=3)
+
+
+def guides(scene, rig):
+    return np.array([np.reshape(scene.xform(loc, q=1, m=1, ws=1), (4, 4))
+                     for loc in rig.locs])
+
+
+def test_load_guide_in_a_new_scene(scene, tmp_path):
+    path = str(tmp_path / 'rope.npz')
+    scene.curve(p=[[0, 0, 0], [2, 1, 0], [4, 0, 1], [6, 2, 0]], n='curve1')
+    rig = rope()
+    rig.build_guide()
+    scene.move(0, 0.5, 0, rig.locs[2], r=1)
+    saved = rig.save_guide(path)
+
+    other = memory.Scene()
+    with backend.using(other):
+        util.create_outliner_grp()
+        loaded = rope()
+        loaded.load_guide(path)
+        assert np.allclose(guides(other, loaded), saved.matrices)
+
+
+def test_load_guide_onto_a_partial_scene(scene, tmp_path):
+    path = str(tmp_path / 'rope.npz')
+    scene.curve(p=[[0, 0, 0], [2, 1, 0], [4, 0, 1], [6, 2, 0]], n='curve1')
+    rig = rope()
+    rig.build_guide()
+    saved = rig.save_guide(path)
+
+    scene.delete(rig.locs[3])
+    scene.move(1, 0, 0, rig.locs[1], r=1)
+    rig.load_guide(path)
+
+    assert np.allclose(guides(scene, rig), saved.matrices)
+    for parent, child in zip(rig.locs, rig.locs[1:]):
+        assert scene.listRelatives(child, p=1) == [parent]
@@ -0,0 +1,79 @@
+from ..constant import Side
+from ..template import biped
+
+
+def build(scene):
+    rig = biped.Biped(Side.MIDDLE, 'hero')
+    rig.build_guide()
+    rig.build_rig()
+    return rig
+
+
+def nodes(scene, comp):
+    """
+    :return: dict. node objects of the built joints and controllers of a
+             component tree, by name
+    """
+    names = [name for sub in comp.walk() for name in sub.jnts + sub.ctrls]
+    return dict((name, scene.nodes[name]) for name in scene.ls(names))
+
+
+def nudge(scene, loc):
+    position = scene.xform(loc, q=1, t=1, ws=1)
+    scene.xform(loc, t=[position[0], position[1], position[2] + 0.5], ws=1)
+
+
+def lod_targets(scene, rig):
+    attr = rig.spine.ctrls[0] + '.lod'
+    return set(scene.listConnections(attr, s=0, d=1) or list())
+
+
+def test_moved_guide_rebuilds_its_component_only(scene):
+    rig = build(scene)
+    kept = [rig.r_arm, rig.l_leg, rig.r_leg, rig.spine, rig.neck, rig.head,
+            rig.tip]
+    before = dict((comp.base, nodes(scene, comp)) for comp in kept)
+    arm = nodes(scene, rig.l_arm)
+    targets = lod_targets(scene, rig)
+
+    deleted = list()
+    delete_attr = scene.deleteAttr
+
+    def spy(*args, **kwargs):
+        deleted.append(args)
+        return delete_attr(*args, **kwargs)
+    scene.deleteAttr = spy
+
+    rig.restore_guide()
+    nudge(scene, rig.l_arm.limb.locs[1])
+    assert rig.rebuild_rig() == [rig.l_arm]
+
+    # the other components keep their nodes, the arm gets new ones
+    for comp in kept:
+        assert nodes(scene, comp) == before[comp.base]
+    rebuilt = nodes(scene, rig.l_arm)
+    assert set(rebuilt) == set(arm)
+    assert not [name for name in arm if rebuilt[name] is arm[name]]
+
+    # linked back under the spine, and back on the same lod attribute
+    assert scene.listRelatives(rig.l_arm.limb.offsets[0], p=1) == \
+        [rig.spine.ctrls[-1]]
+    assert scene.listRelatives(rig.l_arm.limb.jnts[0], p=1) == \
+        scene.listRelatives(rig.r_arm.limb.jnts[0], p=1)
+    assert not deleted
+    assert lod_targets(scene, rig) == targets
+
+
+def test_moved_spine_guide_adds_lod_again(scene):
+    rig = build(scene)
+    targets = lod_targets(scene, rig)
+
+    rig.restore_guide()
+    nudge(scene, rig.spine.locs[-1])
+    assert rig.rebuild_rig() == [rig.spine]
+
+    # the new spine root controller drives the untouched hands again
+    assert lod_targets(scene, rig) == targets
+    for arm in (rig.l_arm, rig.r_arm):
+        assert scene.listRelatives(arm.limb.offsets[0], p=1) == \
+            [rig.spine.ctrls[-1]]
@@ -0,0 +1,29 @@
+import pytest
+
+from .. import backend
+from ..base import registry
+
+
+def test_delete_forgets_the_descendants(scene):
+    nodes = registry.Registry()
+    with nodes.recording():
+        root = backend.current().group(em=1, n='root')
+        child = backend.current().spaceLocator(n='child')[0]
+        backend.current().parent(child, root)
+        backend.current().delete(root)
+
+    assert len(nodes) == 0
+
+
+def test_failing_delete_forgets_the_nodes_gone(scene):
+    nodes = registry.Registry()
+    with nodes.recording():
+        kept = backend.current().spaceLocator(n='kept')[0]
+        gone = backend.current().spaceLocator(n='gone')[0]
+    scene.delete(gone)
+
+    with nodes.recording():
+        with pytest.raises(ValueError):
+            backend.current().delete([kept, gone])
+
+    assert nodes.nodes() == [kept]
@@ -0,0 +1,12 @@
+from ..base import session
+
+
+def test_savings_are_estimated_within_the_session(scene):
+    with session.Session('probe') as build:
+        scene.createNode('transform', n='built')
+
+    savings = build.savings()
+    assert set(savings) == set(session.TOGGLES)
+    assert all(saved is not None for saved in savings.values())
+    assert 'n/a' not in build.report()
+    assert not scene.ls(session.PROBE_NODE + '*')
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from . import network
+from ..chain.limb import limbIK
+from ..constant import Side, IKSolver
+from ..solver import frame, twobone
+
+
+TOLERANCE = 1e-6
+
+# scene units the analytic joints may drift from the RP solver ones
+PARITY_TOLERANCE = 1e-3
+
+
+def evaluate(scene, rig):
+    """
+    Pose the joints the way maya would evaluate the limb: the root joint
+    follows its controller, the network rotates the upper joints
+
+    :return: tuple. (3, 3) joint world positions and (2, 3, 3) frames
+    """
+    values = network.Network(scene)
+    prefix = '{}ik'.format(rig.base)
+    root = scene.xform(rig.ctrls[0], q=1, t=1, ws=1)
+    scene.xform(rig.jnts[0], t=root, ws=1)
+    for jnt, suffix in zip(rig.jnts, ('Upper', 'Lower')):
+        rotate = values.value(prefix+suffix+'Rotate.outputRotate')
+        scene.setAttr(jnt+'.rotate', *rotate.tolist())
+
+    worlds = [np.reshape(scene.xform(jnt, q=1, m=1, ws=1), (4, 4))
+              for jnt in rig.jnts]
+    positions = np.array([world[3, :3] for world in worlds])
+    frames = np.array([world[:3, :3] for world in worlds[:2]])
+    return positions, frames
+
+
+@pytest.mark.parametrize('ltype', ['arm', 'leg'])
+@pytest.mark.parametrize('bend', [0.0, 0.5])
+def test_analytic_network_matches_solve(scene, ltype, bend):
+    rig = limbIK.LimbIK(Side.LEFT, ltype, 5, ltype=ltype,
+                        solver=IKSolver.ANALYTIC)
+    rig.build_guide()
+    if bend:
+        mid = scene.xform(rig.locs[1], q=1, t=1, ws=1)
+        scene.xform(rig.locs[1], t=[mid[0], mid[1], mid[2] + bend], ws=1)
+    rig.build_rig()
+
+    rest = rig.guide.positions(rig.locs)
+    upper, lower = np.linalg.norm(np.diff(rest, axis=0), axis=1)
+    pole = network.Network(scene).value(
+        '{}ikPole.outputTranslate'.format(rig.base))
+    sign = twobone.bend_sign(
+        rest[0], rest[2], pole, frame.pole_frames(rest)[0, 2])
+
+    positions, _ = evaluate(scene, rig)
+    assert np.allclose(positions, rest, atol=TOLERANCE)
+
+    for pose in twobone.sample_poses(rig, count=16):
+        for ctrl, position in zip(rig.ctrls, pose):
+            scene.xform(ctrl, t=position, ws=1)
+        pole = network.Network(scene).value(
+            '{}ikPole.outputTranslate'.format(rig.base))
+        expected, frames = twobone.solve(
+            pose[0], pose[2], pole, upper, lower, sign)
+
+        positions, solved = evaluate(scene, rig)
+        assert np.allclose(positions, expected[0], atol=TOLERANCE)
+        assert np.allclose(solved, frames[0], atol=TOLERANCE)
+
+
+@pytest.mark.parametrize('ltype', ['arm', 'leg'])
+@pytest.mark.parametrize('bend', [0.0, 0.5])
+def test_analytic_limb_matches_rp_solver(maya_scene, ltype, bend):
+    rig = limbIK.LimbIK(Side.LEFT, ltype, 5, ltype=ltype,
+                        solver=IKSolver.ANALYTIC)
+    rig.build_guide()
+    if bend:
+        mid = maya_scene.xform(rig.locs[1], q=1, t=1, ws=1)
+        maya_scene.xform(rig.locs[1], t=[mid[0], mid[1], mid[2] + bend],
+                         ws=1)
+    rig.build_rig()
+
+    poses = twobone.sample_poses(rig, count=32)
+    assert twobone.parity(rig, poses) < PARITY_TOLERANCE
@@ -1,6 +1,7 @@
 import maya.cmds as cmds
 
-from .utility.nurbs import util
+from .solver import curve as solver_curve
+from .solver import frame
 
 
 G_LOC_GRP = '_Locators'
@@ -9,31 +10,33 @@ G_JNT_GRP = '_Joints'
 G_MESH_GRP = '_Meshes'
 
 
-def create_locators_on_curve(curve, sample):
+def create_locators_on_curve(curve, sample, names=None):
     """
-    Create locators uniformly spread on curve
+    Create locators uniformly spread on curve, aimed along its tangent
+
+    Sample positions and orientations are solved in one vectorized pass,
+    each locator is then created once with its final transform
 
     :param curve: str. single nurbsCurve node
     :param sample: int. number of sample points
+    :param names: list. optional locator names, one per sample
     :return: list. list of locators created
     """
-    locs = list()
-    points, tangents = util.get_point_on_curve(curve, sample)
-    for index in range(len(points)):
-        point = points[index]
-        tangent = tangents[index]
-
-        loc = cmds.spaceLocator()
-        locs.append(loc)
-        temp_node = cmds.createNode('transform')
+    points, tangents = solver_curve.NurbsCurve.from_scene(curve).sample(sample)
+    rotations = frame.aim_rotations(tangents)
 
+    locs = list()
+    for index in range(sample):
+        if names:
+            loc = cmds.spaceLocator(n=names[index])[0]
+        else:
+            loc = cmds.spaceLocator()[0]
         cmds.xform(
-            temp_node,
-            t=[point.x+tangent.x, point.y+tangent.y, point.z+tangent.z]
+            loc,
+            t=points[index].tolist(),
+            ro=rotations[index].tolist()
         )
-        cmds.xform(loc, t=[point.x, point.y, point.z])
-        constraint = cmds.aimConstraint(temp_node, loc)[0]
-        cmds.delete([temp_node, constraint])
+        locs.append(loc)
 
     return locs
 